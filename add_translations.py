@@ -1,6 +1,17 @@
 """
 Script to add missing translation keys to all languages in Translations.ts
+
+With --seed-content it instead translates the seed data (disease descriptions, symptoms,
+prevention steps, pesticide dosage/frequency/warnings) into every supported language and
+stores the results in database/seed/*.json, so the server never translates them live.
+Re-run the seeder afterwards to load them into the database.
+
+With --glossary it fills backend/database/seed/glossary.json (crop disease, pesticide and
+pesticide type names) for the offline dictionary translator (TRANSLATOR_BACKEND=dictionary).
 """
+import argparse
+import os
+import sys
 
 
 translations_to_add = {
@@ -186,6 +197,43 @@ translations_to_add = {
     }
 }
 
-print("Translation keys to add:")
-for lang, keys in translations_to_add.items():
-    print(f"\n{lang}: {len([k for k in keys if not k.startswith('//')])} keys")
+
+def print_ui_keys():
+    print("Translation keys to add:")
+    for lang, keys in translations_to_add.items():
+        print(f"\n{lang}: {len([k for k in keys if not k.startswith('//')])} keys")
+
+
+def translate_seed(languages=None, refresh=False):
+    # The translation code lives in the backend
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+    from database.seeding import translate_seed_content
+
+    added = translate_seed_content(languages=languages, refresh=refresh)
+    for filename, count in added.items():
+        print(f"{filename}: {count} translations stored")
+
+
+def translate_glossary(languages=None, refresh=False):
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+    from database.seeding import build_glossary
+
+    added = build_glossary(languages=languages, refresh=refresh)
+    for language, count in added.items():
+        print(f"{language}: {count} glossary terms stored")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Translation helpers')
+    parser.add_argument('--seed-content', action='store_true', help='Pre-translate the seed data into every language')
+    parser.add_argument('--glossary', action='store_true', help='Fill the offline translator glossary from the seed data')
+    parser.add_argument('--languages', nargs='*', help='Only these languages (default: all supported)')
+    parser.add_argument('--refresh', action='store_true', help='Translate again even if a translation is stored')
+    args = parser.parse_args()
+
+    if args.seed_content:
+        translate_seed(args.languages, args.refresh)
+    elif args.glossary:
+        translate_glossary(args.languages, args.refresh)
+    else:
+        print_ui_keys()
@@ -0,0 +1,105 @@
+from flask import g, request
+import threading
+import time
+import sys
+import os
+from collections import OrderedDict
+from typing import Dict, Optional
+
+# Add the project root to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from database.db_connection import db
+from config.settings import settings
+
+# A small memory of each user's preferred language: user_id -> (language, expires_at)
+# Almost every logged-in request needs it, and it almost never changes,
+# so we avoid a trip to the 'users' collection each time.
+_language_cache = OrderedDict()
+_language_cache_lock = threading.Lock()
+
+
+def user_lookup_query(user_id: str) -> Dict:
+    """Build the query that finds a user by id (MongoDB ObjectId or a plain id)"""
+    from bson.objectid import ObjectId
+    from bson.errors import InvalidId
+    try:
+        return {'_id': ObjectId(user_id)}
+    except (InvalidId, TypeError):
+        return {'id': user_id}
+
+
+def remember_user_language(user_id: str, language: Optional[str]) -> None:
+    """Store (or refresh) a user's language in the cache, e.g. right after they change it"""
+    if not user_id:
+        return
+    expires_at = time.monotonic() + settings.USER_CONTEXT_CACHE_TTL
+    with _language_cache_lock:
+        _language_cache[user_id] = (language, expires_at)
+        _language_cache.move_to_end(user_id)
+        # Keep the cache small: forget the least recently stored users first
+        while len(_language_cache) > settings.USER_CONTEXT_CACHE_SIZE:
+            _language_cache.popitem(last=False)
+
+
+def forget_user_language(user_id: str) -> None:
+    """Drop a user from the cache so the next request reads the database again"""
+    with _language_cache_lock:
+        _language_cache.pop(user_id, None)
+
+
+def get_cached_user_language(user_id: str, default: str = 'en') -> str:
+    """Get a user's preferred language, only asking the database when the cache has no fresh answer"""
+    with _language_cache_lock:
+        entry = _language_cache.get(user_id)
+    if entry and entry[1] > time.monotonic():
+        return entry[0] or default
+
+    try:
+        user = db.execute_query(collection='users', mongo_query=user_lookup_query(user_id))
+    except Exception as e:
+        print(f"Could not read the language of user {user_id}: {e}")
+        return default
+    if not user:
+        return default  # Not found (or the database is down): ask again next time, don't remember it
+    language = user[0].get('preferred_language')
+    remember_user_language(user_id, language)
+    return language or default
+
+
+def get_user_context() -> Dict:
+    """
+    Who is calling? Checks the 'Bearer' token once per request and keeps the answer
+    on flask.g, so every blueprint (and helper) in the same request shares it.
+
+    Returns a dict with 'valid', 'user_id' and 'error' (the same shape as verify_token).
+    """
+    context = g.get('user_context')
+    if context is not None:
+        return context
+
+    auth_header = request.headers.get('Authorization')
+    if not auth_header or not auth_header.startswith('Bearer '):
+        context = {'valid': False, 'user_id': None, 'error': 'No token provided'}
+    else:
+        # Imported here because the user routes import this module too
+        from api.routes.user import verify_token
+        token_data = verify_token(auth_header.split(' ')[1])
+        context = {
+            'valid': token_data['valid'],
+            'user_id': token_data.get('user_id'),
+            'error': token_data.get('error')
+        }
+
+    g.user_context = context
+    return context
+
+
+def get_user_language(default: str = 'en') -> str:
+    """The logged-in user's preferred language (or the default for guests)"""
+    context = get_user_context()
+    if not context['valid']:
+        return default
+    if 'language' not in context:
+        context['language'] = get_cached_user_language(context['user_id'], default)
+    return context['language']
@@ -0,0 +1,86 @@
+from flask import Blueprint, request, jsonify
+import datetime
+from config.settings import settings
+from services.rollup_service import get_prevalence
+from services.outbreak_detector import get_recent_alerts, get_detector_stats
+from utils import geohash
+
+analytics_bp = Blueprint('analytics', __name__)
+
+@analytics_bp.route('/prevalence', methods=['GET'])
+def get_disease_prevalence():
+    """
+    Disease counts per area and day/week for extension officers' dashboards.
+    Reads the pre-computed rollups, so the cost grows with the number of map cells, not diagnoses.
+
+    Query: ?geohash=tfch&precision=4&period=week&from=2024-06-01&to=2024-06-30&crop=tomato&disease=...
+    """
+    try:
+        cell_prefix = request.args.get('geohash', '').lower()
+        if cell_prefix and not geohash.is_valid(cell_prefix):
+            return jsonify({'error': 'Invalid geohash'}), 400
+
+        period = request.args.get('period', 'week')
+        if period not in ('day', 'week'):
+            return jsonify({'error': "period must be 'day' or 'week'"}), 400
+
+        precision = request.args.get('precision', type=int)
+        if precision is not None and precision < 1:
+            return jsonify({'error': 'precision must be at least 1'}), 400
+
+        try:
+            today = datetime.datetime.utcnow().date()
+            end = datetime.datetime.strptime(request.args['to'], '%Y-%m-%d').date() if 'to' in request.args else today
+            start = datetime.datetime.strptime(request.args['from'], '%Y-%m-%d').date() if 'from' in request.args else end - datetime.timedelta(days=27)
+        except ValueError:
+            return jsonify({'error': 'Dates must look like YYYY-MM-DD'}), 400
+        if start > end:
+            return jsonify({'error': "'from' must not be after 'to'"}), 400
+        if (end - start).days >= settings.ROLLUP_MAX_RANGE_DAYS:
+            return jsonify({'error': f'Date range is limited to {settings.ROLLUP_MAX_RANGE_DAYS} days'}), 400
+
+        rows = get_prevalence(
+            cell_prefix,
+            start.isoformat(),
+            end.isoformat(),
+            precision=precision,
+            period=period,
+            crop=request.args.get('crop'),
+            disease=request.args.get('disease')
+        )
+
+        return jsonify({
+            'prevalence': rows,
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            'period': period
+        }), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@analytics_bp.route('/alerts', methods=['GET'])
+def get_outbreak_alerts():
+    """
+    Recent disease spikes raised by the live outbreak detector, newest first.
+
+    Query: ?geohash=tfc&hours=72
+    """
+    try:
+        region_prefix = request.args.get('geohash', '').lower()
+        if region_prefix and not geohash.is_valid(region_prefix):
+            return jsonify({'error': 'Invalid geohash'}), 400
+
+        hours = request.args.get('hours', 72, type=int)
+        if hours <= 0:
+            return jsonify({'error': 'hours must be positive'}), 400
+        since = datetime.datetime.utcnow() - datetime.timedelta(hours=hours)
+
+        alerts = get_recent_alerts(region_prefix, since)
+        for alert in alerts:
+            alert['detected_at'] = alert['detected_at'].isoformat()
+
+        return jsonify({'alerts': alerts, 'detector': get_detector_stats()}), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -9,7 +9,7 @@ from database.db_connection import db
 from config.settings import settings
 from services.language_service import translate_text
 from services.crop_id_service import identify_crop_from_image, log_debug
-from api.routes.user import verify_token
+from api.request_context import get_user_context, get_user_language
 
 
 # Try to import the Google Gemini AI library
@@ -593,25 +593,11 @@ def send_message():
         language = 'en'  
         
         # Check if the user is logged in via their token
-        auth_header = request.headers.get('Authorization')
-        if auth_header and auth_header.startswith('Bearer '):
-            token = auth_header.split(' ')[1]
-            token_data = verify_token(token)
-            
-            if token_data['valid']:
-                user_id = token_data['user_id']
-                
-                from bson.objectid import ObjectId
-                from bson.errors import InvalidId
-                try:
-                    query = {'_id': ObjectId(user_id)}
-                except InvalidId:
-                    query = {'id': user_id}
-
-                # If logged in, use their preferred language
-                user = db.execute_query(collection='users', mongo_query=query)
-                if user:
-                    language = user[0].get('preferred_language', 'en')
+        user_context = get_user_context()
+        if user_context['valid']:
+            user_id = user_context['user_id']
+            # If logged in, use their preferred language
+            language = get_user_language()
         
         data = request.get_json()
         message = data.get('message', '').strip()
@@ -795,17 +781,11 @@ def get_chat_history():
     """Retrieve past chat messages for a logged-in user"""
     try:
         
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
-            return jsonify({'error': 'No token provided'}), 401
-        
-        token = auth_header.split(' ')[1]
-        token_data = verify_token(token)
-        
-        if not token_data['valid']:
-            return jsonify({'error': token_data['error']}), 401
+        user_context = get_user_context()
+        if not user_context['valid']:
+            return jsonify({'error': user_context['error']}), 401
         
-        user_id = token_data['user_id']
+        user_id = user_context['user_id']
         
         
         limit = request.args.get('limit', 50, type=int)
@@ -1,13 +1,14 @@
 from flask import Blueprint, request, jsonify
 import sys
 import os
+import datetime
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 from database.db_connection import db
 from services.cost_service import calculate_total_cost, generate_cost_report
 from services.language_service import translate_text
-from api.routes.user import verify_token
+from api.request_context import get_user_context, get_user_language
 
 cost_bp = Blueprint('cost', __name__)
 
@@ -16,22 +17,19 @@ def calculate_cost():
     """Calculate treatment and prevention costs"""
     try:
         
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
-            return jsonify({'error': 'No token provided'}), 401
+        user_context = get_user_context()
+        if not user_context['valid']:
+            return jsonify({'error': user_context['error']}), 401
         
-        token = auth_header.split(' ')[1]
-        token_data = verify_token(token)
-        
-        if not token_data['valid']:
-            return jsonify({'error': token_data['error']}), 401
-        
-        user_id = token_data['user_id']
+        user_id = user_context['user_id']
         data = request.get_json()
         
         
         diagnosis_id = data.get('diagnosis_id')
-        land_area = data.get('land_area', type=float)
+        try:
+            land_area = float(data.get('land_area') or 0)
+        except (TypeError, ValueError):
+            land_area = 0
         
         if not diagnosis_id or not land_area:
             return jsonify({'error': 'diagnosis_id and land_area required'}), 400
@@ -78,16 +76,23 @@ def calculate_cost():
             }
         )
         
+        # Keep a copy on the diagnosis itself so the details screen needs no extra query
+        db.execute_update(
+            collection='diagnosis_history',
+            mongo_query=query,
+            update={
+                'cost': {
+                    'land_area': land_area,
+                    'treatment_cost': cost_data['comparison']['treatment_cost'],
+                    'prevention_cost': cost_data['comparison']['prevention_cost'],
+                    'total_cost': cost_data['comparison']['total_cost']
+                },
+                'updated_at': datetime.datetime.utcnow()  # So synced devices pick up the cost
+            }
+        )
         
-        from bson.objectid import ObjectId
-        from bson.errors import InvalidId
-        try:
-            query = {'_id': ObjectId(user_id)}
-        except InvalidId:
-            query = {'id': user_id}
-
-        user = db.execute_query(collection='users', mongo_query=query)
-        language = user[0].get('preferred_language', 'en') if user else 'en'
+        
+        language = get_user_language()
         
         
         if language != 'en':
@@ -112,17 +117,11 @@ def get_cost_report(diagnosis_id):
     """Get downloadable cost report"""
     try:
         
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
-            return jsonify({'error': 'No token provided'}), 401
-        
-        token = auth_header.split(' ')[1]
-        token_data = verify_token(token)
-        
-        if not token_data['valid']:
-            return jsonify({'error': token_data['error']}), 401
+        user_context = get_user_context()
+        if not user_context['valid']:
+            return jsonify({'error': user_context['error']}), 401
         
-        user_id = token_data['user_id']
+        user_id = user_context['user_id']
         
         
         from bson.objectid import ObjectId
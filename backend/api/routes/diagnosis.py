@@ -1,4 +1,4 @@
-from flask import Blueprint, request, jsonify, send_file
+from flask import Blueprint, Response, request, jsonify, send_file
 import os
 import sys
 from werkzeug.utils import secure_filename
@@ -11,14 +11,22 @@ from database.db_connection import db
 from config.settings import settings
 from utils.image_quality_check import check_image_quality, check_content_validity
 from utils.preprocess import preprocess_image
-from utils.validators import validate_diagnosis_request
-from services.language_service import translate_diagnosis_result, translate_disease_info, translate_pesticide_info, translate_text, get_translated_ui_labels
-from services.voice_service import generate_diagnosis_voice
+from utils.validators import validate_diagnosis_request, validate_coordinates
+from utils.geo import make_point
+from services.language_service import TranslationPlan, translate_text
+from services.ui_bundle_service import get_bundle_version
+from services.voice_service import generate_diagnosis_voice, get_voice_stats, voice_file_path, voice_status
 from services.pesticide_service import get_severity_based_recommendations
 from services.cost_service import calculate_total_cost
 from services.weather_service import get_weather_data, get_weather_based_advice
 from services.crop_id_service import identify_crop_from_image
-from api.routes.user import verify_token
+from services.geo_service import get_nearby_outbreaks
+from services.rollup_service import record_diagnosis
+from services.outbreak_detector import observe_diagnosis
+from services.user_stats_service import record_user_diagnosis
+from services.archive_service import month_key
+from services.sync_service import get_changes
+from api.request_context import get_user_context, get_user_language
 
 
 # Ensure we can find the ML models
@@ -32,6 +40,67 @@ def allowed_file(filename):
     """Check if the uploaded file has a valid extension (like .jpg or .png)"""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in settings.ALLOWED_EXTENSIONS
 
+def get_disease_info(crop, disease_name):
+    """Look up the (English) description, symptoms and prevention steps for a disease"""
+    disease_info = db.execute_query(
+        collection='diseases',
+        mongo_query={'crop': crop, 'disease_name': disease_name}
+    )
+    if not disease_info:
+        return {}
+    return {
+        'description': disease_info[0]['description'],
+        'symptoms': disease_info[0]['symptoms'],
+        'prevention_steps': disease_info[0]['prevention_steps']
+    }
+
+def translate_snapshot(snapshot, plan):
+    """
+    Add the English results-screen snapshot to `plan`; the copy returned is in the plan's
+    language once plan.run() is done (so several snapshots share one batched translation)
+    """
+    if plan.target_language == 'en':
+        return snapshot
+    return {
+        'prediction': plan.diagnosis_result(snapshot.get('prediction', {})),
+        'disease_info': plan.disease_info(snapshot['disease_info']) if snapshot.get('disease_info') else {},
+        'pesticide_recommendations': plan.recommendations(snapshot.get('pesticide_recommendations', {}))
+    }
+
+def build_legacy_snapshot(diagnosis):
+    """
+    Older diagnoses were saved without a snapshot, so rebuild the English one
+    from the disease and pesticide catalogs (the way this screen always used to).
+    """
+    disease_data = {}
+    try:
+        disease_data = get_disease_info(diagnosis.get('crop'), diagnosis.get('disease'))
+    except Exception as e:
+        print(f"DEBUG: Error getting disease info: {e}")
+    
+    pesticide_recommendations = {}
+    try:
+        pesticide_recommendations = get_severity_based_recommendations(
+            diagnosis.get('disease'),
+            diagnosis.get('severity_percent'),
+            diagnosis.get('crop')
+        )
+    except Exception as e:
+        print(f"DEBUG: Error compiling pesticide recommendations for history: {e}")
+        pesticide_recommendations = {'recommended_pesticides': []}
+    
+    return {
+        'prediction': {
+            'crop': diagnosis.get('crop'),
+            'disease': diagnosis.get('disease'),
+            'confidence': diagnosis.get('confidence'),
+            'severity_percent': diagnosis.get('severity_percent'),
+            'stage': diagnosis.get('stage')
+        },
+        'disease_info': disease_data,
+        'pesticide_recommendations': pesticide_recommendations
+    }
+
 @diagnosis_bp.route('/detect', methods=['POST'])
 def detect_disease():
     """
@@ -51,25 +120,11 @@ def detect_disease():
         print(f"DEBUG: Request headers: {dict(request.headers)}")
         
         # Check if the user is logged in
-        auth_header = request.headers.get('Authorization')
-        if auth_header and auth_header.startswith('Bearer '):
-            token = auth_header.split(' ')[1]
-            token_data = verify_token(token)
-            
-            if token_data['valid']:
-                user_id = token_data['user_id']
-                
-                from bson.objectid import ObjectId
-                from bson.errors import InvalidId
-                try:
-                    query = {'_id': ObjectId(user_id)}
-                except InvalidId:
-                    query = {'id': user_id}
-
-                # Use their preferred language if found
-                user = db.execute_query(collection='users', mongo_query=query)
-                if user:
-                    language = user[0].get('preferred_language', 'en')
+        user_context = get_user_context()
+        if user_context['valid']:
+            user_id = user_context['user_id']
+            # Use their preferred language if found
+            language = get_user_language()
         
         
         # If the app explicitly sets a language (e.g., user switched it temporarily), use that
@@ -223,56 +278,37 @@ def detect_disease():
         
         
         # --- GATHER INFORMATION ---
+        # Everything that needs translating is collected into one plan and translated
+        # in a single batch further down (instead of one call per field)
+        plan = TranslationPlan(language)
+        
         # 1. Get detailed info about the disease from our database
+        disease_info_en = {}
         disease_data = {}
         try:
-            disease_info = db.execute_query(
-                collection='diseases',
-                mongo_query={'crop': crop, 'disease_name': prediction_result['disease']}
-            )
-            
-            if disease_info:
-                disease_data = {
-                    'description': disease_info[0]['description'],
-                    'symptoms': disease_info[0]['symptoms'],
-                    'prevention_steps': disease_info[0]['prevention_steps']
-                }
-                
-                # Translate it
-                disease_data = translate_disease_info(disease_data, language)
+            disease_info_en = get_disease_info(crop, prediction_result['disease'])
+            if disease_info_en:
+                disease_data = plan.disease_info(disease_info_en)
         except Exception as e:
             print(f"DEBUG: Error getting disease info: {e}")
             disease_data = {}
         
         
         # 2. Get pesticide recommendations based on severity
+        recommendations_en = {}
         pesticide_recommendations = {}
         try:
-            pesticide_recommendations = get_severity_based_recommendations(
+            recommendations_en = get_severity_based_recommendations(
                 prediction_result['disease'],
                 prediction_result['severity_percent'],
                 crop
             )
             
-            
-            # Translate recommendations if needed
-            if language != 'en' and pesticide_recommendations:
-                if 'treatment_approach' in pesticide_recommendations:
-                    pesticide_recommendations['treatment_approach'] = translate_text(
-                        pesticide_recommendations['treatment_approach'], language
-                    )
-                if 'application_note' in pesticide_recommendations:
-                    pesticide_recommendations['application_note'] = translate_text(
-                        pesticide_recommendations['application_note'], language
-                    )
-                
-                new_pests = []
-                for pest in pesticide_recommendations.get('recommended_pesticides', []):
-                    new_pests.append(translate_pesticide_info(pest, language))
-                pesticide_recommendations['recommended_pesticides'] = new_pests
+            pesticide_recommendations = plan.recommendations(recommendations_en)
 
         except Exception as e:
             print(f"DEBUG: Error getting pesticide recommendations: {e}")
+            recommendations_en = {'recommended_pesticides': []}
             pesticide_recommendations = {'recommended_pesticides': []}
         
         
@@ -288,25 +324,68 @@ def detect_disease():
             weather_advice = None
         
         
+        # The prediction labels (like "Healthy" or "Early Blight")
+        translated_result = plan.diagnosis_result(prediction_result)
+        
+        # Now translate all of it in one go
+        translated_count = plan.run()
+        print(f"DEBUG: Translated {translated_count} distinct strings in one batch")
+        
+        
         # --- SAVE HISTORY ---
         diagnosis_id = None
         try:
             if user_id:
-                diagnosis_id = db.execute_insert(
-                    collection='diagnosis_history',
-                    document={
-                        'user_id': user_id,
-                        'crop': crop,
-                        'disease': prediction_result['disease'],
-                        'confidence': prediction_result['confidence'],
-                        'severity_percent': prediction_result['severity_percent'],
-                        'stage': prediction_result['stage'],
-                        'image_path': filepath,
-                        'latitude': latitude,
-                        'longitude': longitude,
-                        'created_at': datetime.datetime.utcnow()
+                # Keep a ready-made copy of the results screen with the record,
+                # so opening it from history later is a single database read
+                snapshots = {
+                    'en': {
+                        'prediction': prediction_result,
+                        'disease_info': disease_info_en,
+                        'pesticide_recommendations': recommendations_en
                     }
-                )
+                }
+                # Only a complete translation is kept: English stand-ins would never be retried
+                if language != 'en' and plan.complete:
+                    snapshots[language] = {
+                        'prediction': translated_result,
+                        'disease_info': disease_data,
+                        'pesticide_recommendations': pesticide_recommendations
+                    }
+                
+                created_at = datetime.datetime.utcnow()
+                diagnosis_record = {
+                    'user_id': user_id,
+                    'crop': crop,
+                    'disease': prediction_result['disease'],
+                    'confidence': prediction_result['confidence'],
+                    'severity_percent': prediction_result['severity_percent'],
+                    'stage': prediction_result['stage'],
+                    'image_path': filepath,
+                    'latitude': latitude,
+                    'longitude': longitude,
+                    'location': make_point(latitude, longitude),
+                    'snapshots': snapshots,
+                    'cost': None,
+                    'month': month_key(created_at),  # Partition key: old months get archived
+                    'created_at': created_at,
+                    'updated_at': created_at  # Moves forward on every change, drives /sync
+                }
+                diagnosis_id = db.execute_insert(collection='diagnosis_history', document=diagnosis_record)
+                
+                # Keep the regional numbers up to date (one small upsert, never a rescan)
+                try:
+                    record_diagnosis(diagnosis_record)
+                except Exception as rollup_err:
+                    print(f"DEBUG: Error updating disease rollup: {rollup_err}")
+                try:
+                    observe_diagnosis(diagnosis_record)
+                except Exception as outbreak_err:
+                    print(f"DEBUG: Error updating outbreak detector: {outbreak_err}")
+                try:
+                    record_user_diagnosis(diagnosis_record)
+                except Exception as stats_err:
+                    print(f"DEBUG: Error updating user stats: {stats_err}")
                 
                 # Also save the recommended pesticides for future reference
                 for pesticide in pesticide_recommendations.get('recommended_pesticides', [])[:3]:
@@ -328,15 +407,7 @@ def detect_disease():
             diagnosis_id = None
         
         
-        # Translate the prediction labels (like "Healthy" or "Early Blight")
-        translated_result = translate_diagnosis_result(prediction_result, language)
-        
-        
-        # Get UI text (buttons, labels)
-        ui_labels = get_translated_ui_labels(language)
-        
-        
-        # Generate an audio file reading out the result
+        # Queue an audio file reading out the result (made in the background, the URL works right away)
         voice_file = generate_diagnosis_voice(translated_result, language)
         
         
@@ -351,7 +422,8 @@ def detect_disease():
             'image_quality': quality_result,
             'quality_warning': quality_warning,  
             'language': language,
-            'ui_translations': ui_labels
+            # The app's labels come from /api/translations (cached on the phone); this says which version
+            'ui_bundle_version': get_bundle_version(language)
         }
         
         return jsonify(response), 200
@@ -367,17 +439,11 @@ def get_history():
     """Get the user's past diagnoses (so they can track progress)"""
     try:
         
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
-            return jsonify({'error': 'No token provided'}), 401
+        user_context = get_user_context()
+        if not user_context['valid']:
+            return jsonify({'error': user_context['error']}), 401
         
-        token = auth_header.split(' ')[1]
-        token_data = verify_token(token)
-        
-        if not token_data['valid']:
-            return jsonify({'error': token_data['error']}), 401
-        
-        user_id = token_data['user_id']
+        user_id = user_context['user_id']
         
         
         page = request.args.get('page', 1, type=int)
@@ -396,19 +462,12 @@ def get_history():
         history = history[offset : offset + per_page]
         
         
-        language = 'en'
-        from bson.objectid import ObjectId
-        from bson.errors import InvalidId
-        try:
-            query = {'_id': ObjectId(user_id)}
-        except InvalidId:
-            query = {'id': user_id}
-
-        user = db.execute_query(collection='users', mongo_query=query)
-        if user:
-            language = user[0].get('preferred_language', 'en')
+        language = get_user_language()
 
+        # The whole page is translated in one batch (repeated diseases and stages only once)
+        plan = TranslationPlan(language)
         history_list = []
+        translated_items = []
         for record in history:
             item = {
                 'id': str(record.get('_id') or record.get('id')),
@@ -423,40 +482,140 @@ def get_history():
             # Translate each record so it shows up in the user's language
             if language != 'en':
                 try:
-                    translated = translate_diagnosis_result(item, language)
-                    
-                    if 'disease_local' in translated:
-                        item['disease'] = translated['disease_local']
-                    if 'crop_local' in translated:
-                        item['crop'] = translated['crop_local']
-                    if 'stage_local' in translated:
-                        item['stage'] = translated['stage_local']
+                    translated_items.append((item, plan.diagnosis_result(item)))
                 except Exception as translate_err:
                     print(f"DEBUG: Translation failed for history item: {translate_err}")
             
             history_list.append(item)
         
+        plan.run()
+        for item, translated in translated_items:
+            if 'disease_local' in translated:
+                item['disease'] = translated['disease_local']
+            if 'crop_local' in translated:
+                item['crop'] = translated['crop_local']
+            if 'stage_local' in translated:
+                item['stage'] = translated['stage_local']
+        
         return jsonify({'history': history_list, 'page': page, 'per_page': per_page}), 200
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@diagnosis_bp.route('/sync', methods=['GET'])
+def sync_history():
+    """
+    Everything that changed in the user's history since the last sync, in one ordered batch.
+    The app keeps the 'next' token and sends it back as ?since= to get only newer changes.
+    """
+    try:
+
+        user_context = get_user_context()
+        if not user_context['valid']:
+            return jsonify({'error': user_context['error']}), 401
+
+        try:
+            changes = get_changes(
+                user_context['user_id'],
+                since=request.args.get('since') or None,
+                limit=request.args.get('limit', type=int)
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        language = get_user_language()
+
+        # The saved results screen in the user's language, so the app can open any synced record
+        # without another request. Records without one (older ones, or saved before the user
+        # switched language) are translated together in one batch and remembered if complete.
+        plan = TranslationPlan(language)
+        views = {}
+        new_views = []
+        for record in changes['records']:
+            snapshots = record.get('snapshots') or {}
+            if language in snapshots:
+                views[record['_id']] = snapshots[language]
+            else:
+                english = snapshots.get('en') or build_legacy_snapshot(record)
+                new_views.append((record, snapshots, english, translate_snapshot(english, plan)))
+        plan.run()
+        for record, snapshots, english, view in new_views:
+            update = {}
+            if 'en' not in snapshots:
+                update['snapshots.en'] = english
+            if plan.complete:
+                views[record['_id']] = view
+                if language != 'en':
+                    update[f'snapshots.{language}'] = view
+            # Otherwise no view: the app opens /diagnosis/<id> for this one, which tries again
+            if update:
+                try:
+                    db.execute_update(collection='diagnosis_history', mongo_query={'_id': record['_id']},
+                                      update=update)
+                except Exception as e:
+                    print(f"DEBUG: Could not store diagnosis snapshot: {e}")
+
+        records = []
+        for record in changes['records']:
+            view = views.get(record['_id']) or {}
+            records.append({
+                'id': str(record['_id']),
+                'crop': record.get('crop'),
+                'disease': record.get('disease'),
+                'confidence': record.get('confidence'),
+                'severity_percent': record.get('severity_percent'),
+                'stage': record.get('stage'),
+                'created_at': record.get('created_at'),
+                'updated_at': record.get('updated_at'),
+                'prediction': view.get('prediction'),
+                'disease_info': view.get('disease_info'),
+                'pesticide_recommendations': view.get('pesticide_recommendations'),
+                'cost': record.get('cost')
+            })
+
+        return jsonify({'records': records, 'next': changes['next'], 'has_more': changes['has_more']}), 200
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@diagnosis_bp.route('/nearby', methods=['GET'])
+def get_nearby():
+    """What diseases have been found near this farm recently? (counts by crop and disease)"""
+    try:
+        latitude = request.args.get('latitude', type=float)
+        longitude = request.args.get('longitude', type=float)
+        if latitude is None or longitude is None or not validate_coordinates(latitude, longitude):
+            return jsonify({'error': 'Valid latitude and longitude required'}), 400
+        
+        radius_km = request.args.get('radius_km', settings.NEARBY_DEFAULT_RADIUS_KM, type=float)
+        days = request.args.get('days', settings.NEARBY_DEFAULT_DAYS, type=int)
+        if radius_km <= 0 or days <= 0:
+            return jsonify({'error': 'radius_km and days must be positive'}), 400
+        radius_km = min(radius_km, settings.NEARBY_MAX_RADIUS_KM)
+        days = min(days, settings.NEARBY_MAX_DAYS)
+        
+        outbreaks = get_nearby_outbreaks(latitude, longitude, radius_km, days, request.args.get('crop'))
+        
+        return jsonify({
+            'outbreaks': outbreaks,
+            'total_detections': sum(o['count'] for o in outbreaks),
+            'radius_km': radius_km,
+            'days': days
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @diagnosis_bp.route('/<diagnosis_id>', methods=['GET'])
 def get_diagnosis_details(diagnosis_id):
     """Get the full details of a specific diagnosis"""
     try:
         
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
-            return jsonify({'error': 'No token provided'}), 401
-        
-        token = auth_header.split(' ')[1]
-        token_data = verify_token(token)
+        user_context = get_user_context()
+        if not user_context['valid']:
+            return jsonify({'error': user_context['error']}), 401
         
-        if not token_data['valid']:
-            return jsonify({'error': token_data['error']}), 401
-        
-        user_id = token_data['user_id']
+        user_id = user_context['user_id']
         
         
         from bson.objectid import ObjectId
@@ -476,125 +635,57 @@ def get_diagnosis_details(diagnosis_id):
         
         diagnosis = diagnosis[0]
         
+        language = get_user_language()
         
-        # Fetch the pesticides we recommended back then
-        pesticides = db.execute_query(
-            collection='pesticide_recommendations',
-            mongo_query={'diagnosis_id': str(diagnosis_id)}
-        )
-        
-        pesticide_list = []
-        for p in pesticides:
-            pesticide_list.append({
-                'name': p['pesticide_name'],
-                'dosage': p['dosage'],
-                'frequency': p['frequency'],
-                'cost_per_unit': p['cost_per_unit'],
-                'is_organic': bool(p['is_organic']),
-                'warnings': p['warnings']
-            })
-        
-        
-        # Fetch cost calculations if they were made
-        cost_data = db.execute_query(
-            collection='cost_calculations',
-            mongo_query={'diagnosis_id': str(diagnosis_id)}
-        )
-        
-        cost_info = None
-        if cost_data:
-            cost_info = {
-                'land_area': cost_data[0]['land_area'],
-                'treatment_cost': cost_data[0]['treatment_cost'],
-                'prevention_cost': cost_data[0]['prevention_cost'],
-                'total_cost': cost_data[0]['total_cost']
-            }
-        
-        # Format the response exactly like /detect so results.tsx parses it cleanly
-        
-        # 1. Structure the prediction object
-        prediction = {
-            'crop': diagnosis.get('crop'),
-            'disease': diagnosis.get('disease'),
-            'confidence': diagnosis.get('confidence'),
-            'severity_percent': diagnosis.get('severity_percent'),
-            'stage': diagnosis.get('stage')
-        }
-        
-        # Translate the prediction labels if needed based on the user language
-        language = 'en'
-        try:
-            user_query = {'_id': ObjectId(user_id)}
-        except InvalidId:
-            user_query = {'id': user_id}
+        # The results screen was saved with the diagnosis, so normally this is the only read.
+        snapshots = diagnosis.get('snapshots') or {}
+        view = snapshots.get(language)
+        if view is None:
+            english = snapshots.get('en') or build_legacy_snapshot(diagnosis)
+            plan = TranslationPlan(language)
+            view = translate_snapshot(english, plan)
+            plan.run()
             
-        user = db.execute_query(collection='users', mongo_query=user_query)
-        if user:
-             language = user[0].get('preferred_language', 'en')
-             
-        translated_result = translate_diagnosis_result(prediction, language)
-        
-        # 2. Re-fetch disease_info using the original logic
-        disease_data = {}
-        try:
-            disease_info_db = db.execute_query(
-                collection='diseases',
-                mongo_query={'crop': diagnosis.get('crop'), 'disease_name': diagnosis.get('disease')}
+            # Remember this language (and the English base for old records) for next time,
+            # unless some of it is still English: then the next read translates it again
+            update = {}
+            if 'en' not in snapshots:
+                update['snapshots.en'] = english
+            if language != 'en' and plan.complete:
+                update[f'snapshots.{language}'] = view
+            if update:
+                try:
+                    db.execute_update(collection='diagnosis_history', mongo_query=query, update=update)
+                except Exception as e:
+                    print(f"DEBUG: Could not store diagnosis snapshot: {e}")
+        
+        # Cost calculations are copied onto the diagnosis; only very old records need the extra query
+        if 'cost' in diagnosis:
+            cost_info = diagnosis.get('cost')
+        else:
+            cost_data = db.execute_query(
+                collection='cost_calculations',
+                mongo_query={'diagnosis_id': str(diagnosis_id)}
             )
             
-            if disease_info_db:
-                disease_data = {
-                    'description': disease_info_db[0]['description'],
-                    'symptoms': disease_info_db[0]['symptoms'],
-                    'prevention_steps': disease_info_db[0]['prevention_steps']
+            cost_info = None
+            if cost_data:
+                cost_info = {
+                    'land_area': cost_data[0]['land_area'],
+                    'treatment_cost': cost_data[0]['treatment_cost'],
+                    'prevention_cost': cost_data[0]['prevention_cost'],
+                    'total_cost': cost_data[0]['total_cost']
                 }
-                
-                # Translate it
-                disease_data = translate_disease_info(disease_data, language)
-        except Exception as e:
-            print(f"DEBUG: Error getting disease info: {e}")
-            
-        # 3. Structure Pesticide Recommendations
-        # Re-fetch from the pesticides collection using the service (same as /detect)
-        # This gives us the correctly-structured data with dosage_per_acre, cost_per_liter
-        pesticide_recommendations = {}
-        try:
-            pesticide_recommendations = get_severity_based_recommendations(
-                diagnosis.get('disease'),
-                diagnosis.get('severity_percent'),
-                diagnosis.get('crop')
-            )
-            
-            # Translate recommendations if needed
-            if language != 'en' and pesticide_recommendations:
-                if 'treatment_approach' in pesticide_recommendations:
-                    pesticide_recommendations['treatment_approach'] = translate_text(
-                        pesticide_recommendations['treatment_approach'], language
-                    )
-                if 'application_note' in pesticide_recommendations:
-                    pesticide_recommendations['application_note'] = translate_text(
-                        pesticide_recommendations['application_note'], language
-                    )
-                
-                new_pests = []
-                for pest in pesticide_recommendations.get('recommended_pesticides', []):
-                    new_pests.append(translate_pesticide_info(pest, language))
-                pesticide_recommendations['recommended_pesticides'] = new_pests
-                
-        except Exception as e:
-            print(f"DEBUG: Error compiling pesticide recommendations for history: {e}")
-            pesticide_recommendations = {'recommended_pesticides': []}
-            
-        ui_labels = get_translated_ui_labels(language)
         
+        # Format the response exactly like /detect so results.tsx parses it cleanly
         response = {
             'diagnosis_id': str(diagnosis.get('_id') or diagnosis.get('id')),
-            'prediction': translated_result,
-            'disease_info': disease_data,
-            'pesticide_recommendations': pesticide_recommendations,
+            'prediction': view.get('prediction'),
+            'disease_info': view.get('disease_info', {}),
+            'pesticide_recommendations': view.get('pesticide_recommendations', {}),
             'weather_advice': None, # We don't save weather advice to history
             'language': language,
-            'ui_translations': ui_labels,
+            'ui_bundle_version': get_bundle_version(language),
             'cost': cost_info
         }
         
@@ -603,13 +694,54 @@ def get_diagnosis_details(diagnosis_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def voice_response(filename, filepath):
+    """
+    Send a finished voice file. Its name is a hash of what it says, so it never changes:
+    the hash is the ETag, the app may cache it forever, a matching If-None-Match gets a 304
+    and Range requests get just the part asked for. With VOICE_SENDFILE_MODE the front proxy
+    (nginx X-Accel-Redirect or Apache/lighttpd X-Sendfile) sends the bytes instead of us.
+    """
+    etag = filename[len('voice_'):-len('.mp3')]
+    mode = (settings.VOICE_SENDFILE_MODE or '').lower()
+    if mode == 'x-accel':
+        relative = os.path.relpath(filepath, settings.VOICE_OUTPUT_FOLDER).replace(os.sep, '/')
+        response = Response(mimetype='audio/mpeg')
+        response.headers['X-Accel-Redirect'] = f"{settings.VOICE_ACCEL_PREFIX.rstrip('/')}/{relative}"
+    elif mode == 'x-sendfile':
+        response = Response(mimetype='audio/mpeg')
+        response.headers['X-Sendfile'] = os.path.abspath(filepath)
+    else:
+        # conditional=True: Werkzeug answers If-None-Match with 304 and Range with 206
+        response = send_file(filepath, mimetype='audio/mpeg', conditional=True, etag=etag,
+                             max_age=settings.VOICE_CACHE_MAX_AGE)
+        response.headers['Accept-Ranges'] = 'bytes'  # Tell players they may seek
+    response.set_etag(etag)
+    response.last_modified = os.path.getmtime(filepath)
+    response.headers['Cache-Control'] = f'public, max-age={settings.VOICE_CACHE_MAX_AGE}, immutable'
+    if mode in ('x-accel', 'x-sendfile'):
+        response = response.make_conditional(request)  # The proxy does ranges; a 304 we can do here
+    return response
+
+@diagnosis_bp.route('/voice-stats', methods=['GET'])
+def voice_stats():
+    """How the voice jobs, segment cache and voice store are doing"""
+    return jsonify(get_voice_stats()), 200
+
 @diagnosis_bp.route('/voice/<filename>', methods=['GET'])
 def get_voice_file(filename):
-    """Serve the audio file so the app can play it"""
+    """Serve the audio file so the app can play it (202 while it's still being made)"""
     try:
-        filepath = os.path.join(settings.VOICE_OUTPUT_FOLDER, filename)
-        if os.path.exists(filepath):
-            return send_file(filepath, mimetype='audio/mpeg')
+        filepath = voice_file_path(filename)
+        if filepath and os.path.exists(filepath):
+            return voice_response(filename, filepath)
+        status = voice_status(filename)
+        if status == 'pending':
+            response = jsonify({'status': 'pending'})
+            response.headers['Retry-After'] = str(settings.VOICE_RETRY_AFTER)
+            response.headers['Cache-Control'] = 'no-store'  # Nobody may cache "not ready yet"
+            return response, 202
+        if status == 'failed':
+            return jsonify({'error': 'Voice could not be generated', 'status': 'failed'}), 404
         return jsonify({'error': 'File not found'}), 404
     except Exception as e:
         return jsonify({'error': str(e)}), 500
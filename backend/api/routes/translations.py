@@ -1,18 +1,38 @@
 from flask import Blueprint, request, jsonify
-from services.language_service import get_all_translations, translate_batch
+from config.settings import settings
+from services.language_service import translate_batch, get_translation_stats
+from services.ui_bundle_service import get_bundle
 
 translations_bp = Blueprint('translations', __name__)
 
+def bundle_response(language):
+    """
+    Send a compiled label bundle with its version as the ETag.
+    The app gets a 304 (no body) when it already has this version; asking for
+    ?version=<current version> makes the response cacheable forever (once it's complete).
+    """
+    bundle = get_bundle(language)
+    if bundle is None:
+        return jsonify({'error': f'Unsupported language: {language}'}), 400
+
+    response = jsonify(bundle['labels'])
+    response.set_etag(bundle['version'])
+    response.headers['X-Bundle-Version'] = bundle['version']
+    if bundle.get('missing'):
+        response.headers['Cache-Control'] = 'no-cache'  # Still being compiled: check back for the rest
+    elif request.args.get('version') == bundle['version']:
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    else:
+        response.headers['Cache-Control'] = f'public, max-age={settings.UI_BUNDLE_MAX_AGE}'
+    return response.make_conditional(request)
+
 @translations_bp.route('/', methods=['GET'])
 def get_translations():
     """
-    Get all UI translations for a specified language.
-    Falls back to dynamic translation if keys are missing in the static file.
+    Get all UI translations for a specified language (the precompiled bundle).
     """
     try:
-        language = request.args.get('language', 'en')
-        translations = get_all_translations(language)
-        return jsonify(translations), 200
+        return bundle_response(request.args.get('language', 'en'))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -39,3 +59,11 @@ def batch_translate():
     except Exception as e:
         print(f"Batch translation error: {e}")
         return jsonify({'error': str(e)}), 500
+
+@translations_bp.route('/stats', methods=['GET'])
+def translation_stats():
+    """Translation cache numbers (hit ratio, evictions, store errors)"""
+    try:
+        return jsonify(get_translation_stats()), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -12,8 +12,10 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 from database.db_connection import db
 from config.settings import settings
 from utils.validators import validate_user_registration, validate_email, validate_language
-from services.language_service import get_translated_ui_labels
+from api.routes.translations import bundle_response
 from services.email_service import generate_otp, send_otp_email, store_otp, verify_otp
+from services.user_stats_service import get_user_stats
+from api.request_context import get_user_context, get_user_language, remember_user_language, user_lookup_query
 
 # Create a 'blueprint' for all user-related routes (registration, login, profile)
 user_bp = Blueprint('user', __name__)
@@ -121,6 +123,7 @@ def login():
         
         # Create a fresh token for this session (Cast to string in case user_id is passed as ObjectId)
         token = generate_token(str(user.get('_id') or user.get('id')))
+        remember_user_language(str(user.get('_id') or user.get('id')), user.get('preferred_language'))
         
         return jsonify({
             'message': 'Login successful',
@@ -141,23 +144,11 @@ def get_profile():
     """Get the profile details of the logged-in user"""
     try:
         # Check for the secure token in the header
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
-            return jsonify({'error': 'No token provided'}), 401
-        
-        token = auth_header.split(' ')[1]
-        token_data = verify_token(token)
-        
+        token_data = get_user_context()
         if not token_data['valid']:
             return jsonify({'error': token_data['error']}), 401
         
-        from bson.errors import InvalidId
-        from bson.objectid import ObjectId
-
-        try:
-            query = {'_id': ObjectId(token_data['user_id'])}
-        except InvalidId:
-            query = {'id': token_data['user_id']}
+        query = user_lookup_query(token_data['user_id'])
 
         # Fetch the user's details from the database
         user = db.execute_query(
@@ -180,7 +171,9 @@ def get_profile():
                 'farm_size': user.get('farm_size', 0),
                 'preferred_language': user.get('preferred_language', 'en'),
                 'created_at': user.get('created_at')
-            }
+            },
+            # Pre-computed summary of their diagnoses (one small read)
+            'stats': get_user_stats(token_data['user_id'])
         }), 200
         
     except Exception as e:
@@ -191,25 +184,13 @@ def update_profile():
     """Update the user's profile information"""
     try:
         # Authenticate the user
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
-            return jsonify({'error': 'No token provided'}), 401
-        
-        token = auth_header.split(' ')[1]
-        token_data = verify_token(token)
-        
+        token_data = get_user_context()
         if not token_data['valid']:
             return jsonify({'error': token_data['error']}), 401
         
         data = request.get_json()
         
-        from bson.errors import InvalidId
-        from bson.objectid import ObjectId
-
-        try:
-            query = {'_id': ObjectId(token_data['user_id'])}
-        except InvalidId:
-            query = {'id': token_data['user_id']}
+        query = user_lookup_query(token_data['user_id'])
             
         # Update the database with new info
         db.execute_update(
@@ -234,13 +215,7 @@ def update_language():
     """Update the user's preferred language"""
     try:
         # Authenticate first
-        auth_header = request.headers.get('Authorization')
-        if not auth_header or not auth_header.startswith('Bearer '):
-            return jsonify({'error': 'No token provided'}), 401
-        
-        token = auth_header.split(' ')[1]
-        token_data = verify_token(token)
-        
+        token_data = get_user_context()
         if not token_data['valid']:
             return jsonify({'error': token_data['error']}), 401
         
@@ -250,13 +225,7 @@ def update_language():
         if not validate_language(language):
             return jsonify({'error': 'Unsupported language'}), 400
         
-        from bson.errors import InvalidId
-        from bson.objectid import ObjectId
-
-        try:
-            query = {'_id': ObjectId(token_data['user_id'])}
-        except InvalidId:
-            query = {'id': token_data['user_id']}
+        query = user_lookup_query(token_data['user_id'])
 
         # Save preference to DB
         db.execute_update(
@@ -268,6 +237,9 @@ def update_language():
             }
         )
         
+        # Every other route reads the language from the cache, so update it right away
+        remember_user_language(token_data['user_id'], language)
+        
         return jsonify({'message': 'Language updated successfully', 'language': language}), 200
         
     except Exception as e:
@@ -281,26 +253,10 @@ def get_translations():
         
         # If language isn't specified, try to get it from the user's profile
         if 'lang' not in request.args:
-            auth_header = request.headers.get('Authorization')
-            if auth_header and auth_header.startswith('Bearer '):
-                token = auth_header.split(' ')[1]
-                token_data = verify_token(token)
-                if token_data['valid']:
-                    from bson.errors import InvalidId
-                    from bson.objectid import ObjectId
-
-                    try:
-                        query = {'_id': ObjectId(token_data['user_id'])}
-                    except InvalidId:
-                        query = {'id': token_data['user_id']}
-                        
-                    user = db.execute_query(collection='users', mongo_query=query)
-                    if user:
-                        language = user[0].get('preferred_language', language)
-        
-        # Fetch the translations
-        translations = get_translated_ui_labels(language)
-        return jsonify(translations), 200
+            language = get_user_language(language)
+        
+        # The same precompiled bundle /api/translations serves (with its ETag)
+        return bundle_response(language)
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
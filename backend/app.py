@@ -2,6 +2,7 @@ from flask import Flask, jsonify, request
 from flask_cors import CORS
 import os
 import sys
+import threading
 
 # Ensure Python can find our other files by adding the project root to the path
 sys.path.append(os.path.dirname(__file__))
@@ -18,6 +19,9 @@ from api.routes.cost import cost_bp
 from api.routes.chatbot import chatbot_bp
 from api.routes.weather import weather_bp
 from api.routes.translations import translations_bp
+from api.routes.analytics import analytics_bp
+from services.outbreak_detector import prime_from_rollups
+from services.archive_service import start_maintenance_thread
 
 
 # Initialize the Flask application
@@ -33,6 +37,15 @@ CORS(app, resources={r"/api/*": {"origins": "*"}})
 # Start up the settings (like creating folders)
 settings.init_app()
 
+# Make sure the database has the indexes our queries rely on
+try:
+    db.ensure_indexes()
+except Exception as e:
+    print(f"Could not create database indexes: {e}")
+
+# Give the live outbreak detector its baseline back (in the background, it needs the database)
+threading.Thread(target=prime_from_rollups, daemon=True).start()
+
 
 # Register the blueprints - these are like mini-apps for each feature
 app.register_blueprint(user_bp, url_prefix='/api/user')
@@ -41,6 +54,7 @@ app.register_blueprint(cost_bp, url_prefix='/api/cost')
 app.register_blueprint(chatbot_bp, url_prefix='/api/chatbot')
 app.register_blueprint(weather_bp, url_prefix='/api/weather')
 app.register_blueprint(translations_bp, url_prefix='/api/translations')
+app.register_blueprint(analytics_bp, url_prefix='/api/analytics')
 
 
 
@@ -88,8 +102,11 @@ def api_info():
             'diagnosis': {
                 'POST /api/diagnosis/detect': 'Detect disease from image',
                 'GET /api/diagnosis/history': 'Get diagnosis history',
+                'GET /api/diagnosis/sync?since=<token>': 'Get history changes since the last sync',
+                'GET /api/diagnosis/nearby': 'Count recent diseases found near a location',
                 'GET /api/diagnosis/<id>': 'Get diagnosis details',
-                'GET /api/diagnosis/voice/<filename>': 'Get voice file'
+                'GET /api/diagnosis/voice/<filename>': 'Get voice file (202 while it is being made)',
+                'GET /api/diagnosis/voice-stats': 'Voice job, segment cache and store numbers'
             },
             'cost': {
                 'POST /api/cost/calculate': 'Calculate treatment costs',
@@ -98,6 +115,10 @@ def api_info():
             'chatbot': {
                 'POST /api/chatbot/message': 'Send message to chatbot',
                 'GET /api/chatbot/history': 'Get chat history'
+            },
+            'analytics': {
+                'GET /api/analytics/prevalence': 'Disease counts per area and day/week',
+                'GET /api/analytics/alerts': 'Recent disease spikes from the live outbreak detector'
             }
         },
         'supported_crops': ['grape', 'maize', 'potato', 'rice', 'tomato'],
@@ -133,6 +154,11 @@ if __name__ == '__main__':
     print(f"Supported languages: en, hi, te, ta, kn, mr")
     print("=" * 60)
     
+    # Archive old history and keep the uploads folder bounded, in the background
+    # (only in the process that serves requests, not the debug reloader's watcher)
+    if not settings.DEBUG or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_maintenance_thread()
+    
     # Start the server!
     app.run(
         host=settings.HOST,
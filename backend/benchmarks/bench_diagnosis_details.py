@@ -0,0 +1,182 @@
+"""
+Benchmark for GET /api/diagnosis/<id>.
+
+Compares the old way of building the details screen (diagnosis + diseases +
+cost_calculations reads, recommendations rebuilt, snapshot written back) with
+the snapshot stored at /detect time (one read).
+
+By default the database is an in-memory stand-in that sleeps for a fixed
+round-trip time on every call, so the numbers show how many trips each path
+makes. `--backend sqlite` runs the same requests against the real SQLite
+storage engine (in a throwaway file) instead.
+
+Usage:
+    python benchmarks/bench_diagnosis_details.py --requests 200 --rtt-ms 2
+    python benchmarks/bench_diagnosis_details.py --backend sqlite
+"""
+import argparse
+import datetime
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from unittest.mock import patch
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson.objectid import ObjectId
+
+from app import app
+from api import request_context
+from api.routes.user import generate_token
+from database.sqlite_backend import SQLiteDatabase
+from services import pesticide_service
+
+
+class MemoryDB:
+    """A tiny in-memory stand-in for database.db_connection.Database with a fake network delay"""
+
+    def __init__(self, rtt_ms: float = 2.0):
+        self.collections = defaultdict(list)
+        self.rtt = rtt_ms / 1000.0
+        self.calls = 0
+
+    def _round_trip(self):
+        self.calls += 1
+        if self.rtt:
+            time.sleep(self.rtt)
+
+    @staticmethod
+    def _matches(doc, query):
+        return all(doc.get(key) == value for key, value in query.items())
+
+    def execute_query(self, query=None, params=None, collection=None, mongo_query=None, sort=None, limit=None):
+        self._round_trip()
+        return [dict(d) for d in self.collections[collection] if self._matches(d, mongo_query or {})]
+
+    def execute_insert(self, query=None, params=None, collection=None, document=None):
+        self._round_trip()
+        doc = dict(document)
+        doc.setdefault('_id', ObjectId())
+        self.collections[collection].append(doc)
+        return str(doc['_id'])
+
+    def execute_update(self, query=None, params=None, collection=None, mongo_query=None, update=None):
+        self._round_trip()
+        for doc in self.collections[collection]:
+            if self._matches(doc, mongo_query):
+                for path, value in update.items():
+                    target = doc
+                    parts = path.split('.')
+                    for part in parts[:-1]:
+                        target = target.setdefault(part, {})
+                    target[parts[-1]] = value
+        return True
+
+
+class CountingDB:
+    """Wraps a real storage backend and counts the calls made to it"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.calls = 0
+
+    def __getattr__(self, name):
+        method = getattr(self.backend, name)
+
+        def counted(*args, **kwargs):
+            self.calls += 1
+            return method(*args, **kwargs)
+        return counted
+
+
+def seed(db, user_id):
+    """Reference data plus one cost calculation; diagnoses are added per request"""
+    db.execute_insert(collection='diseases', document={
+        'crop': 'tomato', 'disease_name': 'Early blight',
+        'description': 'Fungal disease', 'symptoms': 'Dark rings on leaves',
+        'prevention_steps': 'Rotate crops'
+    })
+    pesticides = [
+        {'name': 'Mancozeb', 'type': 'fungicide', 'target_diseases': 'Early blight, Late blight',
+         'dosage_per_acre': '2 kg', 'frequency': 'Every 7 days', 'cost_per_liter': 380,
+         'is_organic': False, 'is_government_approved': True, 'warnings': 'Wear gloves',
+         'incompatible_with': 'Alkaline pesticides'},
+        {'name': 'Neem Oil', 'type': 'organic', 'target_diseases': 'Early blight',
+         'dosage_per_acre': '1 liter', 'frequency': 'Every 5 days', 'cost_per_liter': 250,
+         'is_organic': True, 'is_government_approved': True, 'warnings': 'None',
+         'incompatible_with': 'Copper-based fungicides'},
+    ]
+    for pesticide in pesticides:
+        db.execute_insert(collection='pesticides', document=pesticide)
+
+
+def add_diagnosis(db, user_id, with_snapshot):
+    doc = {
+        'user_id': user_id, 'crop': 'tomato', 'disease': 'Early blight',
+        'confidence': 93.1, 'severity_percent': 32.0, 'stage': 'Moderate Stage',
+        'created_at': datetime.datetime.utcnow()
+    }
+    if with_snapshot:
+        doc['snapshots'] = {'en': {
+            'prediction': {'crop': 'tomato', 'disease': 'Early blight', 'confidence': 93.1,
+                           'severity_percent': 32.0, 'stage': 'Moderate Stage'},
+            'disease_info': {'description': 'Fungal disease', 'symptoms': 'Dark rings on leaves',
+                             'prevention_steps': 'Rotate crops'},
+            'pesticide_recommendations': pesticide_service.get_severity_based_recommendations('Early blight', 32.0, 'tomato')
+        }}
+        doc['cost'] = None
+    return db.execute_insert(collection='diagnosis_history', document=doc)
+
+
+def run(label, db, client, headers, user_id, with_snapshot, requests):
+    timings = []
+    calls = []
+    for _ in range(requests):
+        # Old records get upgraded on first view, so each request uses a fresh one
+        diagnosis_id = add_diagnosis(db, user_id, with_snapshot)
+        before = db.calls
+        start = time.perf_counter()
+        response = client.get(f'/api/diagnosis/{diagnosis_id}', headers=headers)
+        timings.append((time.perf_counter() - start) * 1000)
+        calls.append(db.calls - before)
+        assert response.status_code == 200, response.get_json()
+
+    timings.sort()
+    print(f"{label:<28} mean {statistics.mean(timings):7.2f} ms | "
+          f"p50 {timings[len(timings) // 2]:7.2f} ms | "
+          f"p95 {timings[int(len(timings) * 0.95) - 1]:7.2f} ms | "
+          f"db calls/request {statistics.mean(calls):.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--rtt-ms', type=float, default=2.0, help='Simulated database round-trip time (memory backend)')
+    parser.add_argument('--backend', choices=['memory', 'sqlite'], default='memory')
+    args = parser.parse_args()
+
+    if args.backend == 'sqlite':
+        db = CountingDB(SQLiteDatabase(os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')))
+    else:
+        db = MemoryDB(args.rtt_ms)
+    user_id = str(ObjectId())
+    seed(db, user_id)
+    headers = {'Authorization': f'Bearer {generate_token(user_id)}'}
+
+    with patch('api.routes.diagnosis.db', db), \
+         patch.object(pesticide_service, 'db', db), \
+         patch.object(request_context, 'db', db):
+        pesticide_service.refresh_pesticide_catalog()
+        request_context.remember_user_language(user_id, 'en')
+        app.config['TESTING'] = True
+        with app.test_client() as client:
+            print(f"GET /api/diagnosis/<id>, {args.requests} requests, backend: {args.backend}")
+            run('rebuilt (old records)', db, client, headers, user_id, False, args.requests)
+            run('snapshot (one read)', db, client, headers, user_id, True, args.requests)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark for the storage backends (database/db_connection.py, database/sqlite_backend.py).
+
+Runs the same workloads the app does against each backend:
+- insert a diagnosis
+- load one diagnosis by id
+- a user's history page (newest first, 20 per page)
+- the pesticide lookup by name
+- a `$set` update on one diagnosis
+
+SQLite always runs (in a throwaway file). MongoDB runs too if MONGODB_URI
+points at a reachable server; it uses a scratch database that is dropped at the end.
+
+Usage:
+    python benchmarks/bench_storage.py --users 50 --per-user 40
+    python benchmarks/bench_storage.py --backends sqlite
+"""
+import argparse
+import datetime
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson.objectid import ObjectId
+
+from config.settings import settings
+from database.sqlite_backend import SQLiteDatabase
+
+
+def make_sqlite():
+    return SQLiteDatabase(os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')), None
+
+
+def make_mongo():
+    """A MongoDatabase pointed at a scratch database, or None if there's no server"""
+    from pymongo import MongoClient
+    from database.db_connection import MongoDatabase
+
+    client = MongoClient(settings.MONGODB_URI, serverSelectionTimeoutMS=2000)
+    try:
+        client.admin.command('ping')
+    except Exception as e:
+        print(f"Skipping MongoDB: {e.__class__.__name__}")
+        return None, None
+
+    backend = MongoDatabase.__new__(MongoDatabase)
+    backend.client = client
+    backend.db = client[f"{settings.MONGODB_DB_NAME}_bench"]
+    backend.ensure_indexes()
+    return backend, lambda: client.drop_database(backend.db.name)
+
+
+BACKENDS = {'sqlite': make_sqlite, 'mongo': make_mongo}
+
+
+def timed(samples, fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    samples.append((time.perf_counter() - start) * 1000)
+    return result
+
+
+def report(label, samples):
+    samples = sorted(samples)
+    print(f"  {label:<18} n={len(samples):<6} mean {statistics.mean(samples):7.3f} ms | "
+          f"p50 {samples[len(samples) // 2]:7.3f} ms | "
+          f"p95 {samples[max(int(len(samples) * 0.95) - 1, 0)]:7.3f} ms")
+
+
+def run(db, users, per_user, reads):
+    rng = random.Random(42)
+    user_ids = [str(ObjectId()) for _ in range(users)]
+    start_time = datetime.datetime.utcnow() - datetime.timedelta(days=per_user)
+    results = {'insert': [], 'get by id': [], 'history page': [], 'pesticide by name': [], 'update': []}
+
+    for i in range(20):
+        db.execute_insert(collection='pesticides', document={
+            'name': f'Pesticide {i}', 'type': 'fungicide', 'cost_per_liter': 100 + i,
+            'target_diseases': 'Early blight', 'is_organic': i % 3 == 0
+        })
+
+    diagnosis_ids = []
+    for n in range(per_user):
+        for user_id in user_ids:
+            diagnosis_ids.append(timed(results['insert'], db.execute_insert, collection='diagnosis_history', document={
+                'user_id': user_id, 'crop': 'tomato', 'disease': 'Early blight',
+                'confidence': 90.0, 'severity_percent': 30.0, 'stage': 'Moderate Stage',
+                'created_at': start_time + datetime.timedelta(days=n, seconds=rng.randint(0, 3600)),
+                'snapshots': {'en': {'prediction': {'crop': 'tomato', 'disease': 'Early blight'}}}
+            }))
+
+    for _ in range(reads):
+        diagnosis_id = rng.choice(diagnosis_ids)
+        rows = timed(results['get by id'], db.execute_query, collection='diagnosis_history',
+                     mongo_query={'_id': ObjectId(diagnosis_id)})
+        assert rows, diagnosis_id
+
+        page = timed(results['history page'], db.execute_query, collection='diagnosis_history',
+                     mongo_query={'user_id': rng.choice(user_ids)}, sort=[('created_at', -1)], limit=20)
+        assert len(page) == min(20, per_user)
+
+        timed(results['pesticide by name'], db.execute_query, collection='pesticides',
+              mongo_query={'name': f'Pesticide {rng.randint(0, 19)}'})
+
+        timed(results['update'], db.execute_update, collection='diagnosis_history',
+              mongo_query={'_id': ObjectId(diagnosis_id)}, update={'snapshots.hi': {'prediction': {}}})
+
+    for label, samples in results.items():
+        report(label, samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--per-user', type=int, default=40, help='Diagnoses stored per user')
+    parser.add_argument('--reads', type=int, default=500, help='Rounds of the read/update workloads')
+    parser.add_argument('--backends', nargs='+', choices=list(BACKENDS), default=list(BACKENDS))
+    args = parser.parse_args()
+
+    for name in args.backends:
+        db, cleanup = BACKENDS[name]()
+        if db is None:
+            continue
+        print(f"\n{name}: {args.users} users x {args.per_user} diagnoses, {args.reads} read rounds")
+        try:
+            run(db, args.users, args.per_user, args.reads)
+        finally:
+            if cleanup:
+                cleanup()
+
+
+if __name__ == '__main__':
+    main()
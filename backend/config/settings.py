@@ -17,9 +17,22 @@ class Settings:
     MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/')
     MONGODB_DB_NAME = os.getenv('MONGODB_DB_NAME', 'crop_diagnosis_db')
     
+    # Which database to use: 'mongo' (default) or 'sqlite' for offline boxes with no MongoDB
+    STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'mongo')
+    SQLITE_DB_PATH = os.getenv('SQLITE_DB_PATH', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'crop_diagnosis.sqlite3'))
+    
     # Folder to save uploaded images
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'uploads')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # Limit file size to 16MB
+    UPLOADS_MAX_MB = int(os.getenv('UPLOADS_MAX_MB', 2048))  # Oldest saved photos move to the archive past this
+    TEMPORARY_UPLOAD_MAX_AGE_HOURS = float(os.getenv('TEMPORARY_UPLOAD_MAX_AGE_HOURS', 24))  # Guest/chat uploads
+    
+    # Cold storage for old diagnosis history (gzipped JSON lines + shrunk photos)
+    ARCHIVE_FOLDER = os.getenv('ARCHIVE_FOLDER', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'archive'))
+    ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', 365))
+    ARCHIVE_IMAGE_MAX_SIDE = int(os.getenv('ARCHIVE_IMAGE_MAX_SIDE', 512))
+    ARCHIVE_IMAGE_QUALITY = int(os.getenv('ARCHIVE_IMAGE_QUALITY', 60))
+    ARCHIVE_INTERVAL_HOURS = float(os.getenv('ARCHIVE_INTERVAL_HOURS', 24))  # 0 = don't run it inside the server
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg'} # Only allow image files
     
     # Path to our AI models (the brains of the operation)
@@ -63,10 +76,52 @@ class Settings:
     GOOGLE_TRANSLATE_API_KEY = os.getenv('GOOGLE_TRANSLATE_API_KEY', '')
     USE_FREE_TRANSLATION = os.getenv('USE_FREE_TRANSLATION', 'True') == 'True'  
     
+    # Translation cache: recent ones in memory, all of them in a store every worker shares
+    # ('sqlite' = a local file, 'database' = the main database, 'memory' = no persistence)
+    TRANSLATION_CACHE_SIZE = int(os.getenv('TRANSLATION_CACHE_SIZE', 5000))
+    TRANSLATION_CACHE_STORE = os.getenv('TRANSLATION_CACHE_STORE', 'sqlite')
+    TRANSLATION_CACHE_PATH = os.getenv('TRANSLATION_CACHE_PATH', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'translation_cache.sqlite3'))
+    
+    # Calls to Google run in parallel chunks; a request waits at most the deadline for them
+    # (the rest shows in English and finishes into the cache in the background)
+    TRANSLATION_WORKERS = int(os.getenv('TRANSLATION_WORKERS', 8))
+    TRANSLATION_CHUNK_SIZE = int(os.getenv('TRANSLATION_CHUNK_SIZE', 5))
+    TRANSLATION_DEADLINE_SECONDS = float(os.getenv('TRANSLATION_DEADLINE_SECONDS', 3.0))
+    TRANSLATION_MAX_PENDING = int(os.getenv('TRANSLATION_MAX_PENDING', 200))
+    
+    # Who translates: 'google', 'dictionary' (offline, labels + glossary only) or 'stub' (fake, for load tests)
+    TRANSLATOR_BACKEND = os.getenv('TRANSLATOR_BACKEND', 'google')
+    TRANSLATOR_GLOSSARY_PATH = os.getenv('TRANSLATOR_GLOSSARY_PATH', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'seed', 'glossary.json'))
+    TRANSLATOR_STUB_LATENCY_MS = float(os.getenv('TRANSLATOR_STUB_LATENCY_MS', 200))
+    TRANSLATOR_STUB_JITTER_MS = float(os.getenv('TRANSLATOR_STUB_JITTER_MS', 50))
+    
+    # Compiled app label bundles (one file per language) and how long the app may reuse one unchecked
+    UI_BUNDLE_FOLDER = os.getenv('UI_BUNDLE_FOLDER', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'ui_bundles'))
+    UI_BUNDLE_MAX_AGE = int(os.getenv('UI_BUNDLE_MAX_AGE', 300))
+    # A bundle missing some translations (provider down during the compile) is tried again after this
+    UI_BUNDLE_RETRY_SECONDS = int(os.getenv('UI_BUNDLE_RETRY_SECONDS', 300))
+    
     # Text-to-Speech settings
-    TTS_SERVICE = os.getenv('TTS_SERVICE', 'gtts')  
+    TTS_SERVICE = os.getenv('TTS_SERVICE', 'gtts')  # gtts, local (espeak-ng, offline) or silent (tests)
     GOOGLE_CLOUD_TTS_API_KEY = os.getenv('GOOGLE_CLOUD_TTS_API_KEY', '')
     VOICE_OUTPUT_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'voice_outputs')
+    # Spoken pieces of the diagnosis messages, joined into whole messages
+    VOICE_SEGMENT_FOLDER = os.getenv('VOICE_SEGMENT_FOLDER', os.path.join(VOICE_OUTPUT_FOLDER, 'segments'))
+    # Finished voice files: an index of them (size, last played) and how much disk they may use
+    VOICE_INDEX_PATH = os.getenv('VOICE_INDEX_PATH', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'voice_index.sqlite3'))
+    VOICE_STORE_MAX_MB = int(os.getenv('VOICE_STORE_MAX_MB', 500))
+    # Voice files never change, so the app may keep them for a year. VOICE_SENDFILE_MODE hands the
+    # sending to the front proxy: 'x-accel' (nginx, internal location VOICE_ACCEL_PREFIX pointing at
+    # VOICE_OUTPUT_FOLDER) or 'x-sendfile' (Apache/lighttpd); empty = Flask sends them itself
+    VOICE_CACHE_MAX_AGE = int(os.getenv('VOICE_CACHE_MAX_AGE', 31536000))
+    VOICE_SENDFILE_MODE = os.getenv('VOICE_SENDFILE_MODE', '')
+    VOICE_ACCEL_PREFIX = os.getenv('VOICE_ACCEL_PREFIX', '/protected-voice/')
+    # Voice files are made in the background by a few workers; the app is told to come back shortly
+    VOICE_WORKERS = int(os.getenv('VOICE_WORKERS', 2))
+    VOICE_MAX_QUEUED = int(os.getenv('VOICE_MAX_QUEUED', 100))
+    VOICE_TTS_TIMEOUT = float(os.getenv('VOICE_TTS_TIMEOUT', 20))
+    VOICE_RETRY_AFTER = int(os.getenv('VOICE_RETRY_AFTER', 1))
+    VOICE_WARMUP_WORKERS = int(os.getenv('VOICE_WARMUP_WORKERS', 4))  # Parallel gTTS calls of voice_warmup.py
     
     # Chatbot keys (Gemini AI)
     CHATBOT_SERVICE = os.getenv('CHATBOT_SERVICE', 'gemini')  
@@ -77,9 +132,36 @@ class Settings:
     WEATHER_API_KEY = os.getenv('WEATHER_API_KEY', '')  
     WEATHER_API_URL = 'https://api.openweathermap.org/data/2.5/weather'
     
+    # "Diseases near me" search limits
+    NEARBY_DEFAULT_RADIUS_KM = float(os.getenv('NEARBY_DEFAULT_RADIUS_KM', 25))
+    NEARBY_MAX_RADIUS_KM = float(os.getenv('NEARBY_MAX_RADIUS_KM', 100))
+    NEARBY_DEFAULT_DAYS = int(os.getenv('NEARBY_DEFAULT_DAYS', 14))
+    NEARBY_MAX_DAYS = int(os.getenv('NEARBY_MAX_DAYS', 90))
+    
+    # Offline history sync: records per batch (the app can ask for up to the max)
+    SYNC_BATCH_SIZE = int(os.getenv('SYNC_BATCH_SIZE', 100))
+    SYNC_MAX_BATCH_SIZE = int(os.getenv('SYNC_MAX_BATCH_SIZE', 500))
+    
+    # Regional disease rollups: map cell size (geohash characters, 5 = ~5 km) and longest report
+    ROLLUP_GEOHASH_PRECISION = int(os.getenv('ROLLUP_GEOHASH_PRECISION', 5))
+    ROLLUP_MAX_RANGE_DAYS = int(os.getenv('ROLLUP_MAX_RANGE_DAYS', 366))
+    
+    # Live outbreak detector: a recent window (4 x 6h = 1 day) compared with a baseline (28 x 6h = 7 days)
+    OUTBREAK_BUCKET_MINUTES = int(os.getenv('OUTBREAK_BUCKET_MINUTES', 360))
+    OUTBREAK_WINDOW_BUCKETS = int(os.getenv('OUTBREAK_WINDOW_BUCKETS', 4))
+    OUTBREAK_BASELINE_BUCKETS = int(os.getenv('OUTBREAK_BASELINE_BUCKETS', 28))
+    OUTBREAK_GEOHASH_PRECISION = int(os.getenv('OUTBREAK_GEOHASH_PRECISION', 4))  # ~40 x 20 km regions
+    OUTBREAK_MIN_COUNT = int(os.getenv('OUTBREAK_MIN_COUNT', 5))  # Never alert on fewer cases than this
+    OUTBREAK_SPIKE_RATIO = float(os.getenv('OUTBREAK_SPIKE_RATIO', 3.0))  # ...or less than 3x the usual
+    OUTBREAK_MAX_KEYS = int(os.getenv('OUTBREAK_MAX_KEYS', 20000))  # Memory cap: region/crop/disease rings kept
+    OUTBREAK_MAX_ALERTS = int(os.getenv('OUTBREAK_MAX_ALERTS', 500))
+    
     # User session settings
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'jwt-secret-key-change-in-production')
     JWT_EXPIRATION_HOURS = 24 * 7  # Keep users logged in for a week
+    USER_CONTEXT_CACHE_TTL = int(os.getenv('USER_CONTEXT_CACHE_TTL', 300))  # Seconds we trust a cached preferred language
+    USER_CONTEXT_CACHE_SIZE = int(os.getenv('USER_CONTEXT_CACHE_SIZE', 10000))  # Max users kept in that cache
+    SEED_VERSION_CHECK_SECONDS = float(os.getenv('SEED_VERSION_CHECK_SECONDS', 60))  # How often caches look for a re-seed
 
     # Email / SMTP settings for OTP delivery
     SMTP_HOST = os.getenv('SMTP_HOST', 'smtp.gmail.com')
@@ -1,14 +1,18 @@
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
 import os
 import sys
+import threading
 
 # Load configurations securely
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 from config.settings import settings
+from database.storage_backend import StorageBackend, INDEXES
 
-class Database:
+class MongoDatabase(StorageBackend):
     """MongoDB Database Connection and Operations wrapper."""
 
+    name = 'mongo'
+
     def __init__(self):
         self.client = None
         self.db = None
@@ -26,7 +30,8 @@ class Database:
             self.client = None
             self.db = None
 
-    def execute_query(self, query: str = None, params: tuple = None, collection: str = None, mongo_query: dict = None):
+    def execute_query(self, query: str = None, params: tuple = None, collection: str = None, mongo_query: dict = None,
+                      sort=None, limit: int = None):
         """
         Execute a search/SELECT in MongoDB.
         Supports dual interface since other files pass raw SQL like `SELECT id FROM...`.
@@ -34,11 +39,16 @@ class Database:
         """
         if self.db is None:
             return []
-            
+
         # MongoDB native way
         if collection and mongo_query is not None:
-            return list(self.db[collection].find(mongo_query))
-            
+            cursor = self.db[collection].find(mongo_query)
+            if sort:
+                cursor = cursor.sort(list(sort))
+            if limit:
+                cursor = cursor.limit(limit)
+            return list(cursor)
+
         print(f"⚠️ Warning: `execute_query` was called with SQL string: {query}. Refactoring required in route.")
         return []
 
@@ -48,11 +58,11 @@ class Database:
         """
         if self.db is None:
             return None
-            
+
         if collection and document:
             result = self.db[collection].insert_one(document)
             return str(result.inserted_id)
-            
+
         print(f"⚠️ Warning: `execute_insert` was called with SQL string: {query}. Refactoring required in route.")
         return None
 
@@ -62,13 +72,127 @@ class Database:
         """
         if self.db is None:
             return False
-            
+
         if collection and mongo_query and update:
             self.db[collection].update_many(mongo_query, {'$set': update})
             return True
-            
+
         print(f"⚠️ Warning: `execute_update` was called with SQL string: {query}. Refactoring required in route.")
         return False
 
+    def execute_increment(self, collection: str, mongo_query: dict, inc: dict, set_on_insert: dict = None,
+                          set_fields: dict = None):
+        """
+        `$inc` upsert in MongoDB: one atomic round trip, no read first.
+        """
+        if self.db is None:
+            return
+        update = {'$inc': inc}
+        if set_on_insert:
+            update['$setOnInsert'] = set_on_insert
+        if set_fields:
+            update['$set'] = set_fields
+        self.db[collection].update_one(mongo_query, update, upsert=True)
+
+    def execute_bulk_upsert(self, collection: str, documents, key_fields):
+        """
+        One ordered bulk_write of upserts: a whole collection in a single round trip.
+        """
+        if self.db is None or not documents:
+            return {'inserted': 0, 'updated': 0}
+        operations = [
+            UpdateOne({field: doc.get(field) for field in key_fields}, {'$set': doc}, upsert=True)
+            for doc in documents
+        ]
+        result = self.db[collection].bulk_write(operations, ordered=True)
+        return {'inserted': result.upserted_count, 'updated': result.modified_count}
+
+    def iterate_query(self, collection: str, mongo_query: dict, batch_size: int = 1000):
+        """
+        Stream a MongoDB query through a cursor instead of loading it all into a list.
+        """
+        if self.db is None:
+            return iter(())
+        return self.db[collection].find(mongo_query, batch_size=batch_size)
+
+    def execute_delete(self, collection: str = None, mongo_query: dict = None):
+        """
+        Execute a DELETE in MongoDB.
+        """
+        if self.db is None or not collection or mongo_query is None:
+            return 0
+        return self.db[collection].delete_many(mongo_query).deleted_count
+
+    def count_near(self, collection: str, field: str, latitude: float, longitude: float, radius_m: float,
+                   mongo_query: dict = None, group_by=()):
+        """
+        Count nearby documents with a $geoNear aggregation, so the 2dsphere index does the
+        distance work and only the per-group counts come back over the network.
+        """
+        if self.db is None:
+            return []
+
+        pipeline = [
+            {'$geoNear': {
+                'near': {'type': 'Point', 'coordinates': [longitude, latitude]},
+                'key': field,
+                'distanceField': '_distance',
+                'maxDistance': radius_m,
+                'query': mongo_query or {},
+                'spherical': True
+            }},
+            {'$group': {
+                '_id': {name: f'${name}' for name in group_by},
+                'count': {'$sum': 1},
+                'nearest_m': {'$min': '$_distance'}
+            }},
+            {'$sort': {'count': -1}}
+        ]
+        return [
+            dict(row['_id'], count=row['count'], nearest_m=row['nearest_m'])
+            for row in self.db[collection].aggregate(pipeline)
+        ]
+
+    def ensure_indexes(self):
+        """
+        Create our indexes in the background.
+        create_index is a no-op when the index already exists, but it needs the server,
+        so we don't want an unreachable MongoDB to hold up app startup.
+        """
+        if self.db is None:
+            return
+
+        def _create():
+            try:
+                self.client.admin.command('ping')
+            except Exception as e:
+                print(f"Skipping index creation, MongoDB is not reachable: {e.__class__.__name__}")
+                return
+            for collection, indexes in INDEXES.items():
+                for keys in indexes:
+                    try:
+                        self.db[collection].create_index(keys)
+                    except Exception as e:
+                        print(f"Could not create index {keys} on '{collection}': {e}")
+
+        threading.Thread(target=_create, daemon=True).start()
+
+
+# Older code (and scripts) know the MongoDB wrapper by this name
+Database = MongoDatabase
+
+def create_database(backend: str = None) -> StorageBackend:
+    """
+    Pick the storage backend for this deployment (settings.STORAGE_BACKEND):
+    'mongo' (default) or 'sqlite' for single-box offline installs with no MongoDB.
+    """
+    backend = (backend or settings.STORAGE_BACKEND or 'mongo').lower()
+    if backend == 'sqlite':
+        from database.sqlite_backend import SQLiteDatabase
+        return SQLiteDatabase(settings.SQLITE_DB_PATH)
+    if backend != 'mongo':
+        print(f"Unknown STORAGE_BACKEND '{backend}', falling back to MongoDB")
+    return MongoDatabase()
+
 # Export the db instance for other files to use
-db = Database()
+db = create_database()
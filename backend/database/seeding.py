@@ -0,0 +1,255 @@
+import datetime
+import hashlib
+import json
+import os
+import sys
+from typing import Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from database.db_connection import db
+
+# Reference data lives in <project root>/database/seed/*.json
+SEED_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'database', 'seed'
+)
+
+META_COLLECTION = 'meta'
+
+# collection -> (seed file, natural key fields). Re-seeding updates rows in place by these keys,
+# so running it twice changes nothing and never creates duplicates.
+SEED_COLLECTIONS = {
+    'diseases': ('diseases.json', ('crop', 'disease_name')),
+    'pesticides': ('pesticides.json', ('name',)),
+    'translations': ('translations.json', ('language', 'key')),
+}
+
+
+def load_seed_documents(seed_dir: str = None) -> Dict[str, List[Dict]]:
+    """Read every seed file into the documents we store (translations become one row per language+key)"""
+    seed_dir = seed_dir or SEED_DIR
+    documents = {}
+    for collection, (filename, _) in SEED_COLLECTIONS.items():
+        path = os.path.join(seed_dir, filename)
+        if not os.path.exists(path):
+            print(f"Warning: {filename} not found at {path}")
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if collection == 'translations':
+            data = [
+                {'language': language, 'key': key, 'text': text}
+                for language, labels in data.items()
+                for key, text in labels.items()
+            ]
+        documents[collection] = data
+    return documents
+
+
+def compute_seed_version(documents: Dict[str, List[Dict]]) -> str:
+    """A short fingerprint of the seed data: changes whenever any seed row changes"""
+    canonical = json.dumps(documents, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def get_meta(key: str, storage=None):
+    rows = (storage or db).execute_query(collection=META_COLLECTION, mongo_query={'key': key}, limit=1)
+    return rows[0].get('value') if rows else None
+
+
+def set_meta(key: str, value, storage=None) -> None:
+    (storage or db).execute_bulk_upsert(
+        META_COLLECTION,
+        [{'key': key, 'value': value, 'updated_at': datetime.datetime.utcnow()}],
+        ('key',)
+    )
+
+
+def get_seed_version(storage=None):
+    """The version of the reference data currently in the database (caches compare against this)"""
+    return get_meta('seed_version', storage)
+
+
+def seed_reference_data(seed_dir: str = None, storage=None) -> Dict:
+    """
+    Load all seed files with one ordered bulk upsert per collection, then record the seed version.
+    Skips the writes entirely when the database already has this exact version.
+    """
+    storage = storage or db
+    documents = load_seed_documents(seed_dir)
+    version = compute_seed_version(documents)
+    if get_seed_version(storage) == version:
+        print(f"Reference data already at seed version {version}")
+        return {'version': version, 'changed': False}
+
+    results = {}
+    for collection, rows in documents.items():
+        key_fields = SEED_COLLECTIONS[collection][1]
+        results[collection] = storage.execute_bulk_upsert(collection, rows, key_fields)
+        print(f"Seeded {collection}: {results[collection]}")
+
+    # Written last, so caches only see the new version once all the data is in
+    set_meta('seed_version', version, storage)
+    return {'version': version, 'changed': True, 'collections': results}
+
+
+def _json_indent(path: str) -> int:
+    """How far the file is indented (so a rewrite only shows the lines we changed)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        f.readline()
+        second = f.readline()
+    return (len(second) - len(second.lstrip(' '))) or 2
+
+
+def translate_seed_content(seed_dir: str = None, languages: List[str] = None, refresh: bool = False) -> Dict:
+    """
+    Translate the fixed seed texts (disease descriptions, pesticide instructions...) into every
+    supported language once, and store them in the seed files next to the English:
+        "i18n": {"hi": {"symptoms": "..."}, "te": {...}}
+    Re-seeding then carries them into the database. Only missing entries are translated
+    (everything with `refresh`), one batch per file and language.
+    """
+    from services.language_service import PRETRANSLATED_FIELDS, get_supported_languages, translate_batch
+
+    seed_dir = seed_dir or SEED_DIR
+    languages = [l for l in (languages or get_supported_languages()) if l != 'en']
+    added = {}
+    for filename, fields in PRETRANSLATED_FIELDS.items():
+        path = os.path.join(seed_dir, filename)
+        if not os.path.exists(path):
+            print(f"Warning: {filename} not found at {path}")
+            continue
+        indent = _json_indent(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+
+        count = 0
+        for language in languages:
+            todo = {}
+            for record in records:
+                stored = (record.get('i18n') or {}).get(language, {})
+                for field in fields:
+                    if record.get(field) and (refresh or not stored.get(field)):
+                        todo[record[field]] = record[field]
+            if not todo:
+                continue
+            print(f"Translating {len(todo)} texts from {filename} into '{language}'...")
+            translated = translate_batch(todo, language, wait_for_all=True)
+            for record in records:
+                for field in fields:
+                    text = translated.get(record.get(field))
+                    # Failed translations come back as the English text: leave those for next time
+                    if text and text != record[field]:
+                        record.setdefault('i18n', {}).setdefault(language, {})[field] = text
+                        count += 1
+
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(records, f, indent=indent, ensure_ascii=False)
+        added[filename] = count
+    return added
+
+
+def glossary_terms(seed_dir: str = None) -> List[str]:
+    """Disease names, pesticide names and pesticide types from the seed data, written the way we show them"""
+    seed_dir = seed_dir or SEED_DIR
+    with open(os.path.join(seed_dir, 'diseases.json'), 'r', encoding='utf-8') as f:
+        diseases = json.load(f)
+    with open(os.path.join(seed_dir, 'pesticides.json'), 'r', encoding='utf-8') as f:
+        pesticides = json.load(f)
+    names = [d['disease_name'] for d in diseases] + [p['name'] for p in pesticides] + [p['type'] for p in pesticides]
+    terms = {}
+    for name in names:
+        name = name.replace('___', ' - ').replace('_', ' ').strip()  # Same clean-up as the diagnosis result
+        terms.setdefault(name.lower(), name)  # The dictionary translator ignores case anyway
+    return sorted(terms.values(), key=str.lower)
+
+
+def build_glossary(seed_dir: str = None, path: str = None, languages: List[str] = None,
+                   refresh: bool = False) -> Dict:
+    """
+    Fill the offline translator's glossary ({"hi": {"Early Blight": "..."}}) with every term from
+    glossary_terms. Only missing terms are translated (everything with `refresh`); what's already
+    there, hand-written or not, is kept.
+    """
+    from config.settings import settings
+    from services.language_service import get_supported_languages, translate_batch
+
+    path = path or settings.TRANSLATOR_GLOSSARY_PATH
+    languages = [l for l in (languages or get_supported_languages()) if l != 'en']
+    glossary = {}
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            glossary = json.load(f)
+
+    terms = glossary_terms(seed_dir)
+    added = {}
+    for language in languages:
+        stored = glossary.setdefault(language, {})
+        todo = {term: term for term in terms if refresh or not stored.get(term)}
+        if not todo:
+            continue
+        print(f"Translating {len(todo)} glossary terms into '{language}'...")
+        translated = translate_batch(todo, language, wait_for_all=True)
+        count = 0
+        for term in todo:
+            # Failed translations come back as the English text: leave those for next time
+            if translated.get(term) and translated[term] != term:
+                stored[term] = translated[term]
+                count += 1
+        added[language] = count
+
+    glossary = {language: dict(sorted(entries.items(), key=lambda e: e[0].lower()))
+                for language, entries in glossary.items() if entries}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(glossary, f, indent=2, ensure_ascii=False)
+        f.write('\n')
+    return added
+
+
+# --- Migrations ---
+# Numbered, run in order, each exactly once per database. The applied number is kept in meta.
+
+def _migrate_month_partitions():
+    from services.archive_service import backfill_months
+    backfill_months()
+
+def _migrate_locations():
+    from services.geo_service import backfill_locations
+    backfill_locations()
+
+def _migrate_rollups():
+    from services.rollup_service import backfill_rollups
+    backfill_rollups()
+
+def _migrate_user_stats():
+    from services.user_stats_service import rebuild_user_stats
+    rebuild_user_stats()
+
+def _migrate_updated_at():
+    from services.sync_service import backfill_updated_at
+    backfill_updated_at()
+
+MIGRATIONS = [
+    (1, 'Add month partition key to diagnosis history', _migrate_month_partitions),
+    (2, 'Add GeoJSON location to diagnosis history', _migrate_locations),
+    (3, 'Build regional disease rollups', _migrate_rollups),
+    (4, 'Build per-user diagnosis stats', _migrate_user_stats),
+    (5, 'Add updated_at to diagnosis history for delta sync', _migrate_updated_at),
+]
+
+
+def run_migrations(storage=None, migrations=None) -> List[int]:
+    """Apply every migration newer than the database's schema version; returns the ones applied"""
+    storage = storage or db
+    current = get_meta('schema_version', storage) or 0
+    applied = []
+    for number, description, migrate in sorted(migrations or MIGRATIONS, key=lambda m: m[0]):
+        if number <= current:
+            continue
+        print(f"Running migration {number}: {description}")
+        migrate()
+        set_meta('schema_version', number, storage)
+        applied.append(number)
+    if not applied:
+        print(f"Database schema already at version {current}")
+    return applied
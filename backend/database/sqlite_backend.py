@@ -0,0 +1,560 @@
+import datetime
+import json
+import os
+import re
+import secrets
+import sqlite3
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from database.storage_backend import StorageBackend, INDEXES, DATETIME_FIELDS
+from utils.geo import bounding_box, haversine_km
+
+try:
+    from bson.objectid import ObjectId
+except ImportError:  # pymongo isn't needed for an SQLite-only install
+    ObjectId = None
+
+# Collection names become table names, so only allow plain identifiers
+_NAME_PATTERN = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+_DATE_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
+_PREFIX_PATTERN = re.compile(r'^\^[A-Za-z0-9_ -]+$')  # Anchored regex with no special characters
+_COMPARISONS = {'$gt': '>', '$gte': '>=', '$lt': '<', '$lte': '<='}
+
+
+def _new_id() -> str:
+    """Ids look just like MongoDB ObjectIds, so routes that call ObjectId(id) keep working"""
+    return str(ObjectId()) if ObjectId else secrets.token_hex(12)
+
+
+def _plain(value):
+    """Turn ObjectIds (used in MongoDB-style queries) into the plain strings we store"""
+    if ObjectId is not None and isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    return value
+
+
+def _format_date(value: datetime.datetime) -> str:
+    """Fixed-width UTC timestamps, so text comparison == time comparison"""
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value.strftime(_DATE_FORMAT)
+
+
+def _encode(value):
+    if isinstance(value, datetime.datetime):
+        return {'$date': _format_date(value)}
+    if ObjectId is not None and isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Cannot store {type(value).__name__} in SQLite backend")
+
+
+def _decode(obj: Dict):
+    if len(obj) == 1 and '$date' in obj:
+        return datetime.datetime.strptime(obj['$date'], _DATE_FORMAT)
+    return obj
+
+
+def _dumps(document: Dict) -> str:
+    return json.dumps(document, default=_encode, ensure_ascii=False, separators=(',', ':'))
+
+
+def _loads(text: str) -> Dict:
+    return json.loads(text, object_hook=_decode)
+
+
+def _get_path(doc: Dict, path: str) -> Tuple[bool, Any]:
+    """Read 'a.b.c' out of a nested document -> (found, value)"""
+    current = doc
+    for part in path.split('.'):
+        if isinstance(current, dict) and part in current:
+            current = current[part]
+        else:
+            return False, None
+    return True, current
+
+
+def _set_path(doc: Dict, path: str, value) -> None:
+    parts = path.split('.')
+    target = doc
+    for part in parts[:-1]:
+        if not isinstance(target.get(part), dict):
+            target[part] = {}
+        target = target[part]
+    target[parts[-1]] = value
+
+
+def _compare(a, op: str, b) -> bool:
+    try:
+        if op == '$gt':
+            return a > b
+        if op == '$gte':
+            return a >= b
+        if op == '$lt':
+            return a < b
+        return a <= b
+    except TypeError:
+        return False
+
+
+def _sort_key(value) -> Tuple[int, Any]:
+    """Order mixed values the way MongoDB does: missing/None, numbers, strings, objects, arrays, booleans, dates"""
+    if value is None:
+        return 0, 0
+    if isinstance(value, bool):
+        return 5, value
+    if isinstance(value, (int, float)):
+        return 1, value
+    if isinstance(value, str):
+        return 2, value
+    if isinstance(value, datetime.datetime):
+        return 6, _format_date(value)
+    if isinstance(value, dict):
+        return 3, _dumps(value)
+    if isinstance(value, (list, tuple)):
+        return 4, _dumps(list(value))
+    return 7, str(value)
+
+
+def _value_matches(found: bool, value, condition) -> bool:
+    """Does one field satisfy one MongoDB-style condition?"""
+    if isinstance(condition, dict) and condition and all(k.startswith('$') for k in condition):
+        for op, arg in condition.items():
+            if op == '$options':
+                continue
+            if op in _COMPARISONS:
+                if not found or not _compare(value, op, arg):
+                    return False
+            elif op == '$ne':
+                if _value_matches(found, value, arg):
+                    return False
+            elif op == '$in':
+                if not any(_value_matches(found, value, item) for item in arg):
+                    return False
+            elif op == '$nin':
+                if any(_value_matches(found, value, item) for item in arg):
+                    return False
+            elif op == '$exists':
+                if bool(arg) != found:
+                    return False
+            elif op == '$regex':
+                flags = re.IGNORECASE if 'i' in condition.get('$options', '') else 0
+                if not isinstance(value, str) or not re.search(arg, value, flags):
+                    return False
+            else:
+                raise ValueError(f"Query operator '{op}' is not supported by the SQLite backend")
+        return True
+
+    # Plain equality (a list field matches if any element matches, like MongoDB)
+    if isinstance(value, list) and not isinstance(condition, list):
+        return condition in value
+    if condition is None:
+        return value is None
+    return found and value == condition
+
+
+def matches(doc: Dict, query: Dict) -> bool:
+    """Evaluate a MongoDB-style query against one document in Python"""
+    for key, condition in query.items():
+        if key == '$and':
+            if not all(matches(doc, sub) for sub in condition):
+                return False
+        elif key == '$or':
+            if not any(matches(doc, sub) for sub in condition):
+                return False
+        else:
+            found, value = _get_path(doc, key)
+            if not _value_matches(found, value, condition):
+                return False
+    return True
+
+
+class SQLiteDatabase(StorageBackend):
+    """
+    A document store on top of SQLite for single-box deployments with no MongoDB.
+
+    Each collection is a table of (_id, JSON document). Fields we filter and sort on
+    get expression indexes (see INDEXES), and the simple parts of a query are turned
+    into SQL against those same expressions so SQLite can use them. Whatever is left
+    (regex, nested documents...) is checked in Python on the already-narrowed rows.
+
+    Tuned for a small, low-power box:
+    - WAL journal so readers never wait for the writer
+    - one connection per thread (sqlite3 connections must not be shared)
+    - parameterized SQL with a stable shape per query, so sqlite3's statement cache
+      reuses the prepared statements
+    """
+
+    name = 'sqlite'
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._tables = set()
+        self._tables_lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        self.ensure_indexes()
+        print(f"Successfully initialized SQLite storage at '{db_path}'")
+
+    # ------------------------------------------------------------------
+    # Connections
+    # ------------------------------------------------------------------
+
+    def _connection(self) -> sqlite3.Connection:
+        """The calling thread's own connection (opened and tuned on first use)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None, cached_statements=256)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')  # Safe with WAL, far fewer fsyncs
+            conn.execute('PRAGMA temp_store=MEMORY')
+            conn.execute('PRAGMA cache_size=-8000')    # ~8 MB page cache
+            conn.execute('PRAGMA busy_timeout=5000')
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        """Close this thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # ------------------------------------------------------------------
+    # Schema
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _field_expr(field: str) -> str:
+        """The SQL expression for a document field (the same one the indexes are built on)"""
+        if not all(_NAME_PATTERN.match(part) for part in field.split('.')):
+            raise ValueError(f"Invalid field name: {field}")
+        if field == '_id':
+            return '_id'
+        if field in DATETIME_FIELDS:
+            return f"json_extract(doc, '$.{field}.\"$date\"')"
+        return f"json_extract(doc, '$.{field}')"
+
+    @classmethod
+    def _point_exprs(cls, field: str) -> Tuple[str, str]:
+        """SQL expressions for the latitude and longitude of a GeoJSON point field"""
+        cls._field_expr(field)  # Only checks that the name is safe to put in SQL
+        path = f'$.{field}.coordinates'
+        return f"json_extract(doc, '{path}[1]')", f"json_extract(doc, '{path}[0]')"
+
+    def _table(self, collection: str) -> str:
+        """Make sure the collection's table (and its indexes) exist, and return its name"""
+        if collection in self._tables:
+            return collection
+        if not _NAME_PATTERN.match(collection or ''):
+            raise ValueError(f"Invalid collection name: {collection}")
+
+        with self._tables_lock:
+            if collection not in self._tables:
+                conn = self._connection()
+                conn.execute(f'CREATE TABLE IF NOT EXISTS "{collection}" (_id TEXT PRIMARY KEY, doc TEXT NOT NULL)')
+                for keys in INDEXES.get(collection, []):
+                    columns = []
+                    for field, direction in keys:
+                        if direction == '2dsphere':
+                            # No spatial index here, so index latitude then longitude for bounding boxes
+                            columns.extend(self._point_exprs(field))
+                        elif direction in (1, -1):
+                            columns.append(self._field_expr(field))
+                    name = f"idx_{collection}_{'_'.join(f.replace('.', '_') for f, _ in keys)}"
+                    conn.execute(f'CREATE INDEX IF NOT EXISTS "{name}" ON "{collection}" ({", ".join(columns)})')
+                self._tables.add(collection)
+        return collection
+
+    def ensure_indexes(self):
+        """Create every known collection table with its indexes"""
+        for collection in INDEXES:
+            self._table(collection)
+
+    # ------------------------------------------------------------------
+    # Query translation
+    # ------------------------------------------------------------------
+
+    def _compile(self, mongo_query: Dict) -> Tuple[List[str], List[Any], bool]:
+        """
+        Turn the simple parts of a MongoDB query into SQL conditions.
+        Anything we can't express exactly is left for the Python check in `matches`.
+        Returns (clauses, params, exact) where `exact` means SQL alone gives the right rows.
+        """
+        clauses, params = [], []
+        exact = True
+        for field, condition in mongo_query.items():
+            if field.startswith('$') or not all(_NAME_PATTERN.match(p) for p in field.split('.')):
+                exact = False
+                continue
+            is_date_field = field in DATETIME_FIELDS
+            expr = self._field_expr(field)
+
+            if isinstance(condition, dict) and condition and all(k.startswith('$') for k in condition):
+                for op, arg in condition.items():
+                    if op in _COMPARISONS and is_date_field and isinstance(arg, datetime.datetime):
+                        clauses.append(f'{expr} {_COMPARISONS[op]} ?')
+                        params.append(_format_date(arg))
+                    elif op in _COMPARISONS and not is_date_field and isinstance(arg, (int, float)) and not isinstance(arg, bool):
+                        clauses.append(f'{expr} {_COMPARISONS[op]} ?')
+                        params.append(arg)
+                    elif op in _COMPARISONS and not is_date_field and isinstance(arg, str):
+                        clauses.append(f'{expr} {_COMPARISONS[op]} ?')
+                        params.append(arg)
+                        if field != '_id':
+                            # SQLite ranks every number below every string; MongoDB never compares the two
+                            clauses.append(f"json_type(doc, '$.{field}') = 'text'")
+                    elif op == '$regex' and not condition.get('$options') and _PREFIX_PATTERN.match(str(arg)):
+                        # '^tfch' -> a range scan on the index; the regex itself is still checked in Python
+                        prefix = arg[1:]
+                        clauses.append(f'{expr} >= ? AND {expr} < ?')
+                        params.extend([prefix, prefix + '\uffff'])
+                        exact = False
+                    elif op == '$options':
+                        continue
+                    elif op == '$in' and arg and all(isinstance(a, str) for a in arg) and not is_date_field:
+                        clauses.append(f"{expr} IN ({', '.join('?' for _ in arg)})")
+                        params.extend(arg)
+                    else:
+                        exact = False
+                continue
+
+            if is_date_field and isinstance(condition, datetime.datetime):
+                clauses.append(f'{expr} = ?')
+                params.append(_format_date(condition))
+            elif not is_date_field and isinstance(condition, bool):
+                clauses.append(f'{expr} = ?')
+                params.append(1 if condition else 0)
+            elif not is_date_field and isinstance(condition, (str, int, float)):
+                # Note: this assumes the field holds a single value, not a list
+                clauses.append(f'{expr} = ?')
+                params.append(condition)
+            else:
+                exact = False
+        return clauses, params, exact
+
+    def _select(self, collection: str, mongo_query: Dict, sort=None, limit: int = None) -> List[Dict]:
+        table = self._table(collection)
+        query = _plain(mongo_query or {})
+        clauses, params, exact = self._compile(query)
+        sql = f'SELECT _id, doc FROM "{table}"'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+
+        # When SQL alone answers the query, let SQLite sort (using the index) and stop early
+        sort = list(sort or [])
+        sql_sort = exact and all(all(_NAME_PATTERN.match(p) for p in f.split('.')) for f, _ in sort)
+        if sql_sort:
+            if sort:
+                sql += ' ORDER BY ' + ', '.join(
+                    f"{self._field_expr(f)} {'DESC' if d < 0 else 'ASC'}" for f, d in sort
+                )
+            if limit:
+                sql += ' LIMIT ?'
+                params = params + [int(limit)]
+
+        rows = self._connection().execute(sql, params).fetchall()
+        documents = []
+        for _id, text in rows:
+            doc = _loads(text)
+            doc['_id'] = _id
+            if exact or matches(doc, query):
+                documents.append(doc)
+
+        if not sql_sort:
+            # Stable sorts applied from the last key to the first give a multi-key sort
+            for field, direction in reversed(sort):
+                documents.sort(
+                    key=lambda d: _sort_key(_get_path(d, field)[1]),
+                    reverse=direction < 0
+                )
+            if limit:
+                documents = documents[:limit]
+        return documents
+
+    # ------------------------------------------------------------------
+    # StorageBackend interface
+    # ------------------------------------------------------------------
+
+    def execute_query(self, query: str = None, params: tuple = None, collection: str = None, mongo_query: dict = None,
+                      sort=None, limit: int = None):
+        """Find documents with a MongoDB-style query"""
+        if collection and mongo_query is not None:
+            return self._select(collection, mongo_query, sort, limit)
+        print(f"⚠️ Warning: `execute_query` was called with SQL string: {query}. Refactoring required in route.")
+        return []
+
+    def execute_insert(self, query: str = None, params: tuple = None, collection: str = None, document: dict = None):
+        """Insert one document (gets an ObjectId-style '_id' like MongoDB would give it)"""
+        if not (collection and document):
+            print(f"⚠️ Warning: `execute_insert` was called with SQL string: {query}. Refactoring required in route.")
+            return None
+        table = self._table(collection)
+        _id = str(document.get('_id') or _new_id())
+        document['_id'] = _id
+        body = {k: v for k, v in document.items() if k != '_id'}
+        self._connection().execute(f'INSERT INTO "{table}" (_id, doc) VALUES (?, ?)', (_id, _dumps(body)))
+        return _id
+
+    def execute_update(self, query: str = None, params: tuple = None, collection: str = None, mongo_query: dict = None, update: dict = None):
+        """Apply a `$set` (dotted paths allowed) to every matching document in one transaction"""
+        if not (collection and mongo_query and update):
+            print(f"⚠️ Warning: `execute_update` was called with SQL string: {query}. Refactoring required in route.")
+            return False
+        table = self._table(collection)
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for doc in self._select(collection, mongo_query):
+                _id = doc.pop('_id')
+                for path, value in _plain(update).items():
+                    _set_path(doc, path, value)
+                conn.execute(f'UPDATE "{table}" SET doc = ? WHERE _id = ?', (_dumps(doc), _id))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return True
+
+    def count_near(self, collection: str, field: str, latitude: float, longitude: float, radius_m: float,
+                   mongo_query: dict = None, group_by=()):
+        """
+        Count nearby documents: the indexed bounding box narrows the rows, then the
+        exact distance (haversine) and the rest of the query are checked in Python.
+        """
+        table = self._table(collection)
+        query = _plain(mongo_query or {})
+        clauses, params, exact = self._compile(query)
+
+        lat_expr, lon_expr = self._point_exprs(field)
+        min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_m / 1000.0)
+        clauses = [f'{lat_expr} BETWEEN ? AND ?', f'{lon_expr} BETWEEN ? AND ?'] + clauses
+        params = [min_lat, max_lat, min_lon, max_lon] + params
+
+        groups = {}
+        sql = f'SELECT _id, doc FROM "{table}" WHERE ' + ' AND '.join(clauses)
+        for _id, text in self._connection().execute(sql, params):
+            doc = _loads(text)
+            if not exact and not matches(doc, query):
+                continue
+            point_lon, point_lat = doc[field]['coordinates']
+            distance_m = haversine_km(latitude, longitude, point_lat, point_lon) * 1000
+            if distance_m > radius_m:
+                continue
+            key = tuple(_get_path(doc, name)[1] for name in group_by)
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = dict(zip(group_by, key), count=0, nearest_m=distance_m)
+            group['count'] += 1
+            group['nearest_m'] = min(group['nearest_m'], distance_m)
+
+        return sorted(groups.values(), key=lambda g: g['count'], reverse=True)
+
+    def execute_increment(self, collection: str, mongo_query: dict, inc: dict, set_on_insert: dict = None,
+                          set_fields: dict = None):
+        """`$inc` upsert: read-modify-write inside one write transaction, so concurrent writers can't lose counts"""
+        table = self._table(collection)
+        key = _plain(mongo_query)
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            existing = self._select(collection, key, limit=1)
+            if existing:
+                doc = existing[0]
+                _id = doc.pop('_id')
+                for path, amount in inc.items():
+                    found, value = _get_path(doc, path)
+                    _set_path(doc, path, (value if found and value is not None else 0) + amount)
+                for path, value in _plain(set_fields or {}).items():
+                    _set_path(doc, path, value)
+                conn.execute(f'UPDATE "{table}" SET doc = ? WHERE _id = ?', (_dumps(doc), _id))
+            else:
+                doc = dict(key)
+                doc.update(_plain(set_on_insert or {}))
+                for path, amount in inc.items():
+                    _set_path(doc, path, amount)
+                for path, value in _plain(set_fields or {}).items():
+                    _set_path(doc, path, value)
+                conn.execute(f'INSERT INTO "{table}" (_id, doc) VALUES (?, ?)', (_new_id(), _dumps(doc)))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def execute_bulk_upsert(self, collection: str, documents, key_fields):
+        """All the upserts in one transaction, each found through the natural-key index"""
+        table = self._table(collection)
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            for document in documents:
+                document = _plain(document)
+                key = {field: document.get(field) for field in key_fields}
+                existing = self._select(collection, key, limit=1)
+                if not existing:
+                    body = {k: v for k, v in document.items() if k != '_id'}
+                    conn.execute(f'INSERT INTO "{table}" (_id, doc) VALUES (?, ?)', (_new_id(), _dumps(body)))
+                    counts['inserted'] += 1
+                    continue
+                doc = existing[0]
+                _id = doc.pop('_id')
+                updated = dict(doc)
+                updated.update({k: v for k, v in document.items() if k != '_id'})
+                if updated == doc:
+                    counts['unchanged'] += 1
+                    continue
+                conn.execute(f'UPDATE "{table}" SET doc = ? WHERE _id = ?', (_dumps(updated), _id))
+                counts['updated'] += 1
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return counts
+
+    def iterate_query(self, collection: str, mongo_query: dict, batch_size: int = 1000):
+        """Stream matching documents a batch of rows at a time"""
+        table = self._table(collection)
+        query = _plain(mongo_query or {})
+        clauses, params, exact = self._compile(query)
+        sql = f'SELECT _id, doc FROM "{table}"'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        # A separate connection, so the job's own writes on this thread don't disturb the read
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            cursor = conn.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for _id, text in rows:
+                    doc = _loads(text)
+                    doc['_id'] = _id
+                    if exact or matches(doc, query):
+                        yield doc
+        finally:
+            conn.close()
+
+    def execute_delete(self, collection: str = None, mongo_query: dict = None):
+        """Delete every matching document"""
+        if not collection or mongo_query is None:
+            return 0
+        table = self._table(collection)
+        ids = [doc['_id'] for doc in self._select(collection, mongo_query)]
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany(f'DELETE FROM "{table}" WHERE _id = ?', [(i,) for i in ids])
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return len(ids)
@@ -0,0 +1,128 @@
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# The indexes every backend should create, per collection.
+# Each entry is a list of (field, direction) pairs, like pymongo's create_index().
+# A direction of '2dsphere' marks a GeoJSON point field.
+INDEXES = {
+    'users': [
+        [('email', 1)],
+    ],
+    'diagnosis_history': [
+        [('user_id', 1), ('created_at', -1)],
+        # "What's spreading near me": GeoJSON point + time filter
+        [('location', '2dsphere'), ('created_at', -1)],
+        # Monthly partition key, used by archival
+        [('month', 1)],
+        # Delta sync: a user's changes in (updated_at, _id) order
+        [('user_id', 1), ('updated_at', 1), ('_id', 1)],
+    ],
+    'archive_manifest': [
+        [('month', 1)],
+    ],
+    'pesticide_recommendations': [
+        [('diagnosis_id', 1)],
+    ],
+    'cost_calculations': [
+        [('diagnosis_id', 1)],
+    ],
+    'chatbot_conversations': [
+        [('user_id', 1), ('created_at', -1)],
+    ],
+    'diseases': [
+        [('crop', 1), ('disease_name', 1)],
+    ],
+    'pesticides': [
+        [('name', 1)],
+    ],
+    'otp_tokens': [
+        [('email', 1), ('purpose', 1)],
+    ],
+    'translations': [
+        [('language', 1), ('key', 1)],
+    ],
+    'translation_cache': [
+        [('key', 1)],
+    ],
+    'voice_assets': [
+        [('name', 1)],
+        [('last_access', 1)],
+    ],
+    'meta': [
+        [('key', 1)],
+    ],
+    'user_stats': [
+        [('user_id', 1)],
+    ],
+    'disease_rollups': [
+        [('cell', 1), ('crop', 1), ('disease', 1), ('day', 1)],
+        [('day', 1)],
+    ],
+}
+
+# Fields that always hold a datetime (lets backends index and sort them properly)
+DATETIME_FIELDS = {'created_at', 'updated_at', 'expires_at'}
+
+
+class StorageBackend:
+    """
+    The storage interface every database backend implements.
+    Routes and services only talk to `db` through these methods, using MongoDB-style
+    queries ({'user_id': '42', 'created_at': {'$gte': some_date}}), so the same code
+    runs on MongoDB or on the SQLite engine used by offline edge deployments.
+    """
+
+    name = 'base'
+
+    def execute_query(self, query: str = None, params: tuple = None, collection: str = None,
+                      mongo_query: dict = None, sort: Optional[Sequence[Tuple[str, int]]] = None,
+                      limit: Optional[int] = None) -> List[Dict]:
+        """Find documents matching `mongo_query`, optionally sorted [(field, 1 or -1)] and limited"""
+        raise NotImplementedError
+
+    def execute_insert(self, query: str = None, params: tuple = None, collection: str = None,
+                       document: dict = None) -> Optional[str]:
+        """Insert one document and return its id as a string"""
+        raise NotImplementedError
+
+    def execute_update(self, query: str = None, params: tuple = None, collection: str = None,
+                       mongo_query: dict = None, update: dict = None) -> bool:
+        """Set fields (dotted paths allowed) on every document matching `mongo_query`"""
+        raise NotImplementedError
+
+    def execute_increment(self, collection: str, mongo_query: dict, inc: dict, set_on_insert: dict = None,
+                          set_fields: dict = None) -> None:
+        """
+        Add `inc` to the counters of the one document matching `mongo_query` (an equality key),
+        creating it from the key + `set_on_insert` if it doesn't exist yet (an `$inc` upsert).
+        `set_fields` are plain `$set`s applied in the same atomic update.
+        """
+        raise NotImplementedError
+
+    def execute_bulk_upsert(self, collection: str, documents: List[Dict], key_fields: Sequence[str]) -> Dict:
+        """
+        Insert-or-update many documents in order, matching existing ones on `key_fields`
+        (a natural key like ('crop', 'disease_name')), in a single round trip / transaction.
+        Returns {'inserted': n, 'updated': n, 'unchanged': n} (MongoDB can only report inserted/updated).
+        """
+        raise NotImplementedError
+
+    def iterate_query(self, collection: str, mongo_query: dict, batch_size: int = 1000) -> Iterator[Dict]:
+        """Like execute_query, but streams the documents for jobs that walk a whole collection"""
+        raise NotImplementedError
+
+    def execute_delete(self, collection: str = None, mongo_query: dict = None) -> int:
+        """Delete every document matching `mongo_query` and return how many were removed"""
+        raise NotImplementedError
+
+    def count_near(self, collection: str, field: str, latitude: float, longitude: float, radius_m: float,
+                   mongo_query: dict = None, group_by: Sequence[str] = ()) -> List[Dict]:
+        """
+        Count documents whose GeoJSON point `field` lies within `radius_m` metres of
+        (latitude, longitude) and that match `mongo_query`, grouped by the `group_by` fields.
+        Returns [{<group fields>..., 'count': n, 'nearest_m': metres}] with the biggest groups first.
+        """
+        raise NotImplementedError
+
+    def ensure_indexes(self) -> None:
+        """Create the indexes listed in INDEXES (safe to call repeatedly)"""
+        raise NotImplementedError
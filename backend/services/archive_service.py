@@ -0,0 +1,255 @@
+import sys
+import os
+import gzip
+import json
+import datetime
+import threading
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db_connection import db
+from config.settings import settings
+from typing import Dict, Iterator, List, Optional
+
+# Diagnosis history is partitioned by month ('month': '2024-06' on every record).
+# Whole months older than ARCHIVE_AFTER_DAYS move out of the database into
+# gzipped JSON-lines files, and their photos are shrunk and moved next to them:
+#
+#   archive/diagnosis_history/2024-06.jsonl.gz
+#   archive/images/2024-06/<diagnosis id>.jpg
+#
+# The uploads folder is also kept under UPLOADS_MAX_MB (see enforce_upload_limit).
+
+# Uploads nobody keeps: guest diagnoses and chatbot attachments
+TEMPORARY_UPLOAD_PREFIXES = ('anonymous_', 'chat_upload_')
+
+def month_key(when: datetime.datetime) -> str:
+    """The partition a record belongs to: '2024-06'"""
+    return when.strftime('%Y-%m')
+
+def backfill_months(batch_size: int = 500) -> int:
+    """Give older records their 'month' partition key. Safe to run again."""
+    updated = 0
+    while True:
+        batch = db.execute_query(collection='diagnosis_history', mongo_query={'month': {'$exists': False}},
+                                 limit=batch_size)
+        if not batch:
+            break
+        for record in batch:
+            created_at = record.get('created_at')
+            db.execute_update(
+                collection='diagnosis_history',
+                mongo_query={'_id': record['_id']},
+                update={'month': month_key(created_at) if created_at else None}
+            )
+            updated += 1
+    return updated
+
+def shrink_image(source: str, target: str, max_side: int = None, quality: int = None) -> Optional[str]:
+    """Re-encode a photo as a small JPEG (what an archived record needs, not model-ready quality)"""
+    from PIL import Image
+
+    max_side = max_side or settings.ARCHIVE_IMAGE_MAX_SIDE
+    quality = quality or settings.ARCHIVE_IMAGE_QUALITY
+    try:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with Image.open(source) as img:
+            img = img.convert('RGB')
+            img.thumbnail((max_side, max_side))
+            img.save(target, 'JPEG', quality=quality, optimize=True)
+        return target
+    except Exception as e:
+        print(f"Could not shrink image {source}: {e}")
+        return None
+
+def _json_default(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return str(value)  # ObjectIds
+
+def archive_month(month: str, archive_folder: str = None, batch_size: int = 500) -> int:
+    """
+    Move one month of diagnosis history into the archive.
+    Each batch is written and flushed to the .jsonl.gz file (one gzip member per batch)
+    before those records and their uploads are deleted, so a crash can't lose data;
+    at worst a re-run repeats a batch in the file.
+    """
+    archive_folder = archive_folder or settings.ARCHIVE_FOLDER
+    history_folder = os.path.join(archive_folder, 'diagnosis_history')
+    image_folder = os.path.join(archive_folder, 'images', month)
+    os.makedirs(history_folder, exist_ok=True)
+    archive_file = os.path.join(history_folder, f'{month}.jsonl.gz')
+
+    archived = 0
+    while True:
+        batch = db.execute_query(collection='diagnosis_history', mongo_query={'month': month}, limit=batch_size)
+        if not batch:
+            break
+
+        uploads = []
+        lines = []
+        for record in batch:
+            record_id = str(record['_id'])
+            image_path = record.get('image_path')
+            if image_path and os.path.exists(image_path):
+                small = shrink_image(image_path, os.path.join(image_folder, f'{record_id}.jpg'))
+                if small:
+                    uploads.append(image_path)
+                    record['image_path'] = small
+            record['archived_at'] = datetime.datetime.utcnow()
+            lines.append(json.dumps(record, default=_json_default, ensure_ascii=False))
+
+        with gzip.open(archive_file, 'at', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+        ids = [record['_id'] for record in batch]
+        db.execute_delete(collection='diagnosis_history', mongo_query={'_id': {'$in': ids}})
+        db.execute_delete(collection='pesticide_recommendations',
+                          mongo_query={'diagnosis_id': {'$in': [str(i) for i in ids]}})
+        for path in uploads:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+        db.execute_increment('archive_manifest', {'month': month}, {'records': len(batch)},
+                             set_fields={'file': archive_file, 'archived_at': datetime.datetime.utcnow()})
+        archived += len(batch)
+
+    if archived:
+        print(f"Archived {archived} diagnoses from {month} to {archive_file}")
+    return archived
+
+def read_archived_month(month: str, archive_folder: str = None) -> List[Dict]:
+    """Load an archived month back (for support requests and audits, not the app)"""
+    path = os.path.join(archive_folder or settings.ARCHIVE_FOLDER, 'diagnosis_history', f'{month}.jsonl.gz')
+    if not os.path.exists(path):
+        return []
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def iter_archived_history(archive_folder: str = None) -> Iterator[Dict]:
+    """
+    Every archived diagnosis, oldest month first, with its dates as datetimes again.
+    For rebuilding totals (rollups, user stats) that must still count archived months.
+    """
+    folder = os.path.join(archive_folder or settings.ARCHIVE_FOLDER, 'diagnosis_history')
+    if not os.path.isdir(folder):
+        return
+    for filename in sorted(os.listdir(folder)):
+        if not filename.endswith('.jsonl.gz'):
+            continue
+        seen = set()  # A batch written twice (crash before the delete) counts once
+        with gzip.open(os.path.join(folder, filename), 'rt', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record.get('_id') in seen:
+                    continue
+                seen.add(record.get('_id'))
+                for field in ('created_at', 'archived_at'):
+                    if isinstance(record.get(field), str):
+                        record[field] = datetime.datetime.fromisoformat(record[field])
+                yield record
+
+def archive_old_history(max_age_days: int = None, archive_folder: str = None) -> int:
+    """Archive every whole month that is entirely older than `max_age_days`"""
+    max_age_days = max_age_days or settings.ARCHIVE_AFTER_DAYS
+    cutoff_month = month_key(datetime.datetime.utcnow() - datetime.timedelta(days=max_age_days))
+
+    backfill_months()
+    # Months before the cutoff month are completely past the cutoff. Take the oldest one from the
+    # month index (one row, not every old record), archive it, and repeat until none is left.
+    archived = 0
+    while True:
+        oldest = db.execute_query(collection='diagnosis_history', mongo_query={'month': {'$lt': cutoff_month}},
+                                  sort=[('month', 1)], limit=1)
+        if not oldest:
+            break
+        moved = archive_month(oldest[0]['month'], archive_folder)
+        if not moved:
+            break  # Nothing left that month after all: don't spin
+        archived += moved
+    return archived
+
+def enforce_upload_limit(upload_folder: str = None, max_bytes: int = None, temporary_max_age_hours: float = None,
+                         archive_folder: str = None) -> Dict:
+    """
+    Keep the uploads folder bounded:
+    1. Guest and chatbot uploads are only needed while the request runs, delete them after a while.
+    2. If it's still over the size limit, the oldest saved photos are shrunk into the archive
+       (and their records pointed there) until it fits.
+    """
+    upload_folder = upload_folder or settings.UPLOAD_FOLDER
+    max_bytes = max_bytes if max_bytes is not None else settings.UPLOADS_MAX_MB * 1024 * 1024
+    if temporary_max_age_hours is None:
+        temporary_max_age_hours = settings.TEMPORARY_UPLOAD_MAX_AGE_HOURS
+    archive_folder = archive_folder or settings.ARCHIVE_FOLDER
+
+    now = time.time()
+    removed = moved = 0
+    files = []
+    for entry in os.scandir(upload_folder):
+        if not entry.is_file():
+            continue
+        stat = entry.stat()
+        if entry.name.startswith(TEMPORARY_UPLOAD_PREFIXES) and now - stat.st_mtime > temporary_max_age_hours * 3600:
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except OSError:
+                pass
+            continue
+        files.append((stat.st_mtime, stat.st_size, entry.path, entry.name))
+
+    total = sum(size for _, size, _, _ in files)
+    for _, size, path, name in sorted(files):
+        if total <= max_bytes:
+            break
+        if name.startswith(TEMPORARY_UPLOAD_PREFIXES):
+            continue  # Still in use by a request, leave it alone
+        # Saved uploads are named '<user_id>_<timestamp>_<name>'
+        user_id = name.split('_', 1)[0]
+        target = os.path.join(archive_folder, 'images', 'uploads', os.path.splitext(name)[0] + '.jpg')
+        if shrink_image(path, target):
+            db.execute_update(collection='diagnosis_history',
+                              mongo_query={'user_id': user_id, 'image_path': path},
+                              update={'image_path': target})
+            os.remove(path)
+            total -= size
+            moved += 1
+
+    return {'temporary_removed': removed, 'archived': moved, 'bytes': total}
+
+def run_maintenance() -> None:
+    """One full pass: archive old months, then bound the uploads folder"""
+    try:
+        archive_old_history()
+    except Exception as e:
+        print(f"History archival failed: {e}")
+    try:
+        result = enforce_upload_limit()
+        print(f"Uploads folder: {result}")
+    except Exception as e:
+        print(f"Upload cleanup failed: {e}")
+
+def start_maintenance_thread(interval_hours: float = None) -> Optional[threading.Thread]:
+    """Run the maintenance pass in the background every `interval_hours` (0 turns it off)"""
+    interval_hours = settings.ARCHIVE_INTERVAL_HOURS if interval_hours is None else interval_hours
+    if not interval_hours or interval_hours <= 0:
+        return None
+
+    def loop():
+        while True:
+            run_maintenance()
+            time.sleep(interval_hours * 3600)
+
+    thread = threading.Thread(target=loop, daemon=True)
+    thread.start()
+    return thread
+
+if __name__ == '__main__':
+    run_maintenance()
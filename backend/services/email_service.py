@@ -115,7 +115,7 @@ def store_otp(email: str, otp: str, purpose: str) -> None:
     """
     # Delete old OTPs for this email + purpose first
     try:
-        db.db['otp_tokens'].delete_many({'email': email, 'purpose': purpose})
+        db.execute_delete(collection='otp_tokens', mongo_query={'email': email, 'purpose': purpose})
     except Exception:
         pass
 
@@ -164,9 +164,10 @@ def verify_otp(email: str, otp: str, purpose: str) -> dict:
 
     # Mark as used so it can't be reused
     try:
-        db.db['otp_tokens'].update_one(
-            {'_id': token['_id']},
-            {'$set': {'used': True}}
+        db.execute_update(
+            collection='otp_tokens',
+            mongo_query={'_id': token['_id']},
+            update={'used': True}
         )
     except Exception:
         pass
@@ -0,0 +1,76 @@
+import sys
+import os
+import datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db_connection import db
+from config.settings import settings
+from utils.geo import make_point
+from typing import List, Dict
+
+def get_nearby_outbreaks(latitude: float, longitude: float, radius_km: float = None,
+                         days: int = None, crop: str = None) -> List[Dict]:
+    """
+    "What's spreading near me?"
+    Counts the diseases detected within `radius_km` of the farmer in the last `days` days,
+    grouped by crop and disease, most common first. Healthy results are left out.
+    """
+    radius_km = min(radius_km or settings.NEARBY_DEFAULT_RADIUS_KM, settings.NEARBY_MAX_RADIUS_KM)
+    days = min(days or settings.NEARBY_DEFAULT_DAYS, settings.NEARBY_MAX_DAYS)
+
+    # The time filter keeps the search to recent records however big history grows
+    query = {
+        'created_at': {'$gte': datetime.datetime.utcnow() - datetime.timedelta(days=days)},
+        'disease': {'$ne': 'Healthy'}
+    }
+    if crop:
+        query['crop'] = crop.lower()
+
+    groups = db.count_near(
+        collection='diagnosis_history',
+        field='location',
+        latitude=latitude,
+        longitude=longitude,
+        radius_m=radius_km * 1000,
+        mongo_query=query,
+        group_by=('crop', 'disease')
+    )
+    return [
+        {
+            'crop': group.get('crop'),
+            'disease': group.get('disease'),
+            'count': group['count'],
+            'nearest_km': round(group['nearest_m'] / 1000, 1)
+        }
+        for group in groups
+    ]
+
+def backfill_locations(batch_size: int = 500) -> int:
+    """
+    Give older diagnosis records (saved with only latitude/longitude) their GeoJSON
+    'location' so the nearby search can see them. Safe to run again; returns how many were updated.
+    """
+    updated = 0
+    while True:
+        batch = db.execute_query(
+            collection='diagnosis_history',
+            mongo_query={'location': {'$exists': False}},
+            limit=batch_size
+        )
+        if not batch:
+            break
+        for record in batch:
+            # Records without usable coordinates get location=None so we don't pick them up again
+            point = make_point(record.get('latitude'), record.get('longitude'))
+            db.execute_update(
+                collection='diagnosis_history',
+                mongo_query={'_id': record['_id']},
+                update={'location': point}
+            )
+            if point:
+                updated += 1
+        print(f"Location backfill: {updated} records updated so far")
+    return updated
+
+if __name__ == '__main__':
+    backfill_locations()
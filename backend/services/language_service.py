@@ -1,17 +1,67 @@
 import json
 import os
-from typing import Dict
-from deep_translator import GoogleTranslator
+import threading
+from typing import Dict, List, Optional, Tuple
+from config.settings import settings
+from services.translation_cache import get_translation_cache
+from services.translation_executor import get_translation_executor
+from services.translator_backends import get_translator_backend
 
-# Cache for translations to reduce API calls
-# A simple memory to store words we've already translated so we don't ask Google again
-translation_cache = {}
+# Translations we've already done are remembered (in memory and on disk)
+# so we don't ask Google again - see translation_cache.py
 
 
 TRANSLATIONS_FILE = os.path.join(
     os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
     'database', 'seed', 'translations.json'
 )
+SEED_DIR = os.path.dirname(TRANSLATIONS_FILE)
+
+# Seed content that is translated ahead of time (add_translations.py --seed-content).
+# Each record keeps its translations next to the English: "i18n": {"hi": {"symptoms": "..."}}
+PRETRANSLATED_FIELDS = {
+    'diseases.json': ('description', 'symptoms', 'prevention_steps'),
+    'pesticides.json': ('dosage_per_acre', 'frequency', 'warnings'),
+}
+
+# (language, English text) -> translation, built from those records on first use
+_pretranslated = None
+_pretranslated_lock = threading.Lock()
+pretranslated_hits = 0
+
+def load_pretranslated(seed_dir: str = None) -> Dict:
+    """Collect every stored translation of the seed content into one lookup table"""
+    seed_dir = seed_dir or SEED_DIR
+    lookup = {}
+    for filename, fields in PRETRANSLATED_FIELDS.items():
+        path = os.path.join(seed_dir, filename)
+        if not os.path.exists(path):
+            continue
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                records = json.load(f)
+        except Exception as e:
+            print(f"Could not read pre-translated content from {filename}: {e}")
+            continue
+        for record in records:
+            for language, texts in (record.get('i18n') or {}).items():
+                for field in fields:
+                    english, translated = record.get(field), texts.get(field)
+                    if english and translated:
+                        lookup[(language, english)] = translated
+    return lookup
+
+def get_pretranslated(text: str, language: str) -> Optional[str]:
+    """The stored translation of a piece of seed content, if we have one (no network)"""
+    global _pretranslated, pretranslated_hits
+    if _pretranslated is None:
+        with _pretranslated_lock:
+            if _pretranslated is None:
+                _pretranslated = load_pretranslated()
+    translated = _pretranslated.get((language, text))
+    if translated is not None:
+        pretranslated_hits += 1
+    return translated
 
 def log_debug(message):
     try:
@@ -25,7 +75,7 @@ def log_debug(message):
 
 def translate_text(text: str, target_language: str = 'en', source_language: str = 'en') -> str:
     """
-    Translate text to target language using Google Translate (deep-translator)
+    Translate text to target language with the configured backend (Google by default)
     """
     
     # If no change needed, just return the text
@@ -35,192 +85,235 @@ def translate_text(text: str, target_language: str = 'en', source_language: str
     log_debug(f"Translating to {target_language}: {text[:50]}...")
     
     
-    # Check our memory cache first
-    cache_key = f"{text}_{source_language}_{target_language}"
-    if cache_key in translation_cache:
-        return translation_cache[cache_key]
-    
-    try:
-        translator = GoogleTranslator(source=source_language, target=target_language)
-        translated_text = translator.translate(text)
-        
-        if not translated_text:
-             print(f"DEBUG: Translation returned empty for '{text}' to {target_language}")
-             return text
-
-        # Remember it for next time
-        translation_cache[cache_key] = translated_text
-        return translated_text
-    except Exception as e:
-        print(f"Translation error: {e}")
-        # If it fails, at least give back the original text
+    # Seed content is translated ahead of time, then check our cache
+    if source_language == 'en':
+        pretranslated = get_pretranslated(text, target_language)
+        if pretranslated is not None:
+            return pretranslated
+    cache = get_translation_cache()
+    cached = cache.get(text, source_language, target_language)
+    if cached is not None:
+        return cached
+    
+    # Goes through the executor, so a slow Google can only hold us up until the deadline
+    translated_text = run_translations([text], source_language, target_language).get(text)
+    if not translated_text:
+        print(f"DEBUG: No translation in time for '{text}' to {target_language}")
         return text
+    return translated_text
 
-def translate_batch(texts, target_language):
+def run_translations(texts: List[str], source_language: str, target_language: str,
+                     wait_for_all: bool = False) -> Dict[str, str]:
+    """
+    Send texts to the translator backend in parallel chunks and return {text: translation} for the
+    ones done before TRANSLATION_DEADLINE_SECONDS (all of them with wait_for_all). Every finished
+    chunk is cached, including the ones that come back after we stopped waiting. Text another
+    request is already translating isn't sent twice, we wait for that call instead.
+    """
+    cache = get_translation_cache()
+    backend = get_translator_backend()
+    return get_translation_executor().translate(
+        texts,
+        provider=lambda chunk: backend.translate_batch(chunk, source_language, target_language),
+        on_done=(lambda done: cache.put_many(done, source_language, target_language)) if backend.cacheable else None,
+        deadline=None if wait_for_all else settings.TRANSLATION_DEADLINE_SECONDS,
+        key=(source_language, target_language),  # Same text, same languages: one call for everyone
+    )
+
+def translate_batch(texts, target_language, wait_for_all=False):
     """
     Translate a batch of texts using parallel processing.
     texts: dict of {key: text} where key is the ID and text is the content to translate
     target_language: language code (e.g., 'es', 'hi')
+    wait_for_all: don't stop at the request deadline (for offline jobs like the seed content)
     """
     if not texts or target_language == 'en':
         return texts
 
-    results = {}
-    
-    try:
-        keys = list(texts.keys())
-        values = list(texts.values())
-        
-        # deep-translator handles batch translation efficiently
-        translator = GoogleTranslator(source='en', target=target_language)
-        
-        # Chunking to avoid timeouts or API limits with large batches
-        BATCH_SIZE = 50 
-        translations = []
-        
-        print(f"DEBUG: Starting translation of {len(values)} items in batches of {BATCH_SIZE}...")
-        
-        for i in range(0, len(values), BATCH_SIZE):
-            chunk = values[i:i + BATCH_SIZE]
-            print(f"DEBUG: Processing chunk {i//BATCH_SIZE + 1}/{(len(values)-1)//BATCH_SIZE + 1}...")
-            try:
-                # Translate chunk
-                chunk_results = translator.translate_batch(chunk)
-                translations.extend(chunk_results)
-            except Exception as chunk_error:
-                print(f"DEBUG: Chunk failed: {chunk_error}")
-                # Fallback: append original values for this failed chunk
-                translations.extend(chunk)
-        
-        print(f"DEBUG: translate_batch return type: {type(translations)}")
-        if translations:
-            print(f"DEBUG: First translated item: '{translations[0]}'")
-            print(f"DEBUG: Total items translated: {len(translations)}")
-        else:
-            print("DEBUG: translate_batch returned empty/None")
-
-        for i, key in enumerate(keys):
-            # Fallback if something went wrong in matching indices
-            if i < len(translations):
-                translated_text = translations[i]
-                results[key] = translated_text
-                
-                # Cache it
-                cache_key = f"{values[i]}_en_{target_language}"
-                translation_cache[cache_key] = translated_text
+    # What doesn't make the deadline stays English this time; it'll be in the cache next time
+    translated, _ = translate_found(texts.values(), target_language, wait_for_all)
+    return {key: translated.get(text, text) for key, text in texts.items()}
+
+def translate_found(texts, target_language: str, wait_for_all: bool = False) -> Tuple[Dict[str, str], bool]:
+    """
+    {text: translation} for the texts we could translate (no English stand-ins), and whether
+    those translations are real ones that may be stored (False if a non-cacheable backend,
+    like the stub, answered some of them).
+    """
+    texts = list(dict.fromkeys(texts))
+    # Anything we've translated before comes from the cache; only the rest goes to Google
+    translated = get_translation_cache().get_many(texts, 'en', target_language)
+    new = [text for text in texts if text not in translated]
+    if not new:
+        return translated, True
+    done = run_translations(new, 'en', target_language, wait_for_all)
+    print(f"DEBUG: Translated {len(done)} of {len(new)} new texts to {target_language}")
+    translated.update(done)
+    return translated, not done or get_translator_backend().cacheable
+
+# Pre-defined names are often better than machine translation for simple words
+CROP_NAMES = {
+    'tomato': {'hi': 'टमाटर', 'te': 'టమాటా', 'ta': 'தக்காளி', 'kn': 'ಟೊಮೇಟೊ', 'mr': 'टोमॅटो'},
+    'rice': {'hi': 'चावल', 'te': 'వరి', 'ta': 'அரிசி', 'kn': 'ಅಕ್ಕಿ', 'mr': 'ताಂದೂಳು'},
+    'potato': {'hi': 'आलू', 'te': 'బంగాళాదుంప', 'ta': 'உருளைக்கிழங்கு', 'kn': 'ಆಲೂಗಡ್ಡೆ', 'mr': 'बटाटा'},
+    'grape': {'hi': 'अंगूर', 'te': 'ద్రాక్ష', 'ta': 'திராட்சை', 'kn': 'ದ್ರಾಕ್ಷಿ', 'mr': 'द्राक्ष'},
+    'maize': {'hi': 'मक्का', 'te': 'మొక్కజొన్న', 'ta': 'மக்காச்சோளம்', 'kn': 'ಮೆಕ್ಕೆಜೋಳ', 'mr': 'मका'},
+}
+
+PESTICIDE_TYPES = {
+    'fungicide': {'hi': 'फफूंदनाशक', 'te': 'శిలీంద్ర నాశిని', 'ta': 'பூஞ்சைக் கொல்லி', 'kn': 'ಶಿಲೀಂಧ್ರನಾಶಕ', 'mr': 'बुरशीनाशक'},
+    'insecticide': {'hi': 'कीटनाशक', 'te': 'క్రిమి సంహారిణి', 'ta': 'பூச்சிக்கொல்லி', 'kn': 'ಕೀಟನಾಶಕ', 'mr': 'कीटकनाशक'},
+    'organic': {'hi': 'जैविक', 'te': 'సేంద్రీయ', 'ta': 'இயற்கை', 'kn': 'ಸಾವಯವ', 'mr': 'सेंद्रिय'}
+}
+
+class TranslationPlan:
+    """
+    Collects every string a response needs translated, then translates them all at once.
+
+        plan = TranslationPlan('hi')
+        info = plan.disease_info(disease_info)   # copies, filled in by run()
+        result = plan.diagnosis_result(prediction)
+        plan.run()                               # one translate_batch for everything
+
+    Seed content with a stored translation is filled in straight away, repeated strings are only
+    sent once, and cached ones not at all (translate_batch checks the cache).
+    """
+
+    def __init__(self, target_language: str, wait_for_all: bool = False):
+        self.target_language = target_language
+        self.wait_for_all = wait_for_all
+        self._slots = []  # (dict to fill, field, English text)
+        self.missed = 0        # Strings left in English by the last run (deadline, translator down)
+        self.complete = True   # Everything translated for real: safe to save what we filled in
+
+    def add(self, container: Dict, field: str, text: str = None) -> None:
+        """Put the translation of `text` (default: the field's current value) into container[field]"""
+        text = container.get(field) if text is None else text
+        if self.target_language != 'en' and isinstance(text, str) and text.strip():
+            pretranslated = get_pretranslated(text, self.target_language)
+            if pretranslated is not None:
+                container[field] = pretranslated  # Stored with the seed data, nothing to send
             else:
-                results[key] = values[i]
-            
-    except Exception as e:
-        print(f"Batch translation error: {e}") 
-        # Fallback to individual translation if batch fails
-        for key, text in texts.items():
-            results[key] = translate_text(text, target_language)
-            
-    return results
+                self._slots.append((container, field, text))
+
+    def run(self) -> int:
+        """
+        Translate everything collected; returns how many distinct strings were asked for.
+        Anything not translated stays English, and `complete` says whether the result may be saved.
+        """
+        self.missed, self.complete = 0, True
+        if not self._slots:
+            return 0
+        unique = list(dict.fromkeys(text for _, _, text in self._slots))
+        translations, storable = translate_found(unique, self.target_language, self.wait_for_all)
+        for container, field, text in self._slots:
+            container[field] = translations.get(text) or text
+        self._slots = []
+        self.missed = sum(1 for text in unique if not translations.get(text))
+        self.complete = storable and not self.missed
+        return len(unique)
+
+    def diagnosis_result(self, result: Dict) -> Dict:
+        """Disease name, stage and crop name (as *_local fields)"""
+        if self.target_language == 'en':
+            return result
+        translated = result.copy()
+        if 'disease' in result:
+            self.add(translated, 'disease_local', result['disease'].replace('___', ' - ').replace('_', ' '))
+        if 'stage' in result:
+            self.add(translated, 'stage_local', result['stage'])
+        if 'crop' in result:
+            crop = result['crop'].lower()
+            if crop in CROP_NAMES and self.target_language in CROP_NAMES[crop]:
+                translated['crop_local'] = CROP_NAMES[crop][self.target_language]
+            else:
+                self.add(translated, 'crop_local', crop)
+        return translated
+
+    def disease_info(self, disease_info: Dict) -> Dict:
+        """Description, symptoms and prevention steps"""
+        if self.target_language == 'en':
+            return disease_info
+        translated = disease_info.copy()
+        for field in ('description', 'symptoms', 'prevention_steps'):
+            if field in disease_info:
+                self.add(translated, field)
+        return translated
+
+    def pesticide_info(self, pesticide_info: Dict) -> Dict:
+        """Dosage, frequency and warnings (and the pesticide type from our own dictionary)"""
+        if self.target_language == 'en':
+            return pesticide_info
+        translated = pesticide_info.copy()
+        for field in ('dosage_per_acre', 'frequency', 'warnings'):
+            if field in pesticide_info:
+                self.add(translated, field)
+        if 'type' in pesticide_info:
+            pest_type = pesticide_info['type'].lower()
+            if pest_type in PESTICIDE_TYPES and self.target_language in PESTICIDE_TYPES[pest_type]:
+                translated['type_local'] = PESTICIDE_TYPES[pest_type][self.target_language]
+        return translated
+
+    def recommendations(self, recommendations: Dict) -> Dict:
+        """The treatment plan and each recommended pesticide"""
+        if self.target_language == 'en' or not recommendations:
+            return recommendations
+        translated = dict(recommendations)
+        for field in ('treatment_approach', 'application_note'):
+            if field in translated:
+                self.add(translated, field)
+        translated['recommended_pesticides'] = [
+            self.pesticide_info(pest) for pest in recommendations.get('recommended_pesticides', [])
+        ]
+        return translated
+
 
 def translate_diagnosis_result(result, target_language):
     """
     Translate the final diagnosis report (Disease Name, Crop Name, Stage).
     """
-    if target_language == 'en':
-        return result
-    
-    translated = result.copy()
-    
-    
-    # Translate Disease Name (make it look nice too)
-    if 'disease' in result:
-        translated['disease_local'] = translate_text(
-            result['disease'].replace('___', ' - ').replace('_', ' '),
-            target_language
-        )
-    
-    
-    # Translate Stage (Early, Moderate, Severe)
-    if 'stage' in result:
-        translated['stage_local'] = translate_text(result['stage'], target_language)
-    
-    
-    # Translate Crop Name (using our own dictionary for better accuracy)
-    if 'crop' in result:
-        # Pre-defined names are often better than machine translation for simple words
-        crop_names = {
-            'tomato': {'hi': 'टमाटर', 'te': 'టమాటా', 'ta': 'தக்காளி', 'kn': 'ಟೊಮೇಟೊ', 'mr': 'टोमॅटो'},
-            'rice': {'hi': 'चावल', 'te': 'వరి', 'ta': 'அரிசி', 'kn': 'ಅಕ್ಕಿ', 'mr': 'ताಂದೂಳು'},
-            'potato': {'hi': 'आलू', 'te': 'బంగాళాదుంప', 'ta': 'உருளைக்கிழங்கு', 'kn': 'ಆಲೂಗಡ್ಡೆ', 'mr': 'बटाटा'},
-            'grape': {'hi': 'अंगूर', 'te': 'ద్రాక్ష', 'ta': 'திராட்சை', 'kn': 'ದ್ರಾಕ್ಷಿ', 'mr': 'द्राक्ष'},
-            'maize': {'hi': 'मक्का', 'te': 'మొక్కజొన్న', 'ta': 'மக்காச்சோளம்', 'kn': 'ಮೆಕ್ಕೆಜೋಳ', 'mr': 'मका'},
-        }
-        crop = result['crop'].lower()
-        if crop in crop_names and target_language in crop_names[crop]:
-            translated['crop_local'] = crop_names[crop][target_language]
-        else:
-            translated['crop_local'] = translate_text(crop, target_language)
-    
+    plan = TranslationPlan(target_language)
+    translated = plan.diagnosis_result(result)
+    plan.run()
     return translated
 
 def translate_disease_info(disease_info: Dict, target_language: str) -> Dict:
     """
     Translate the detailed disease info (symptoms, etc.).
     """
-    if target_language == 'en':
-        return disease_info
-    
-    translated = disease_info.copy()
-    
-    
-    if 'description' in disease_info:
-        translated['description'] = translate_text(disease_info['description'], target_language)
-    
-    
-    if 'symptoms' in disease_info:
-        translated['symptoms'] = translate_text(disease_info['symptoms'], target_language)
-    
-    
-    if 'prevention_steps' in disease_info:
-        translated['prevention_steps'] = translate_text(disease_info['prevention_steps'], target_language)
-    
+    plan = TranslationPlan(target_language)
+    translated = plan.disease_info(disease_info)
+    plan.run()
     return translated
 
 def translate_pesticide_info(pesticide_info: Dict, target_language: str) -> Dict:
     """
     Translate dosage and instructions for pesticides.
     """
-    if target_language == 'en':
-        return pesticide_info
-    
-    translated = pesticide_info.copy()
-    
-    
-    if 'dosage_per_acre' in pesticide_info:
-        translated['dosage_per_acre'] = translate_text(pesticide_info['dosage_per_acre'], target_language)
-    
-    
-    if 'frequency' in pesticide_info:
-        translated['frequency'] = translate_text(pesticide_info['frequency'], target_language)
-    
-    
-    if 'warnings' in pesticide_info:
-        translated['warnings'] = translate_text(pesticide_info['warnings'], target_language)
-    
-    
-    if 'type' in pesticide_info:
-        type_translations = {
-            'fungicide': {'hi': 'फफूंदनाशक', 'te': 'శిలీంద్ర నాశిని', 'ta': 'பூஞ்சைக் கொல்லி', 'kn': 'ಶಿಲೀಂಧ್ರನಾಶಕ', 'mr': 'बुरशीनाशक'},
-            'insecticide': {'hi': 'कीटनाशक', 'te': 'క్రిమి సంహారిణి', 'ta': 'பூச்சிக்கொல்லி', 'kn': 'ಕೀಟನಾಶಕ', 'mr': 'कीटकनाशक'},
-            'organic': {'hi': 'जैविक', 'te': 'సేంద్రీయ', 'ta': 'இயற்கை', 'kn': 'ಸಾವಯವ', 'mr': 'सेंद्रिय'}
-        }
-        pest_type = pesticide_info['type'].lower()
-        if pest_type in type_translations and target_language in type_translations[pest_type]:
-            translated['type_local'] = type_translations[pest_type][target_language]
-    
+    plan = TranslationPlan(target_language)
+    translated = plan.pesticide_info(pesticide_info)
+    plan.run()
     return translated
 
+_base_translations = None
+
+def load_base_translations() -> Dict[str, Dict[str, str]]:
+    """The hand-written app labels from translations.json ({language: {key: text}})"""
+    global _base_translations
+    if _base_translations is None:
+        try:
+            with open(TRANSLATIONS_FILE, 'r', encoding='utf-8') as f:
+                _base_translations = json.load(f)
+        except Exception as e:
+            print(f"Could not load {TRANSLATIONS_FILE}: {e}")
+            _base_translations = {}
+    return _base_translations
+
 def get_ui_text(key: str, language: str = 'en') -> str:
     """
     Helper to get a single UI text string.
     """
+    base_translations = load_base_translations()
     if language in base_translations and key in base_translations[language]:
         return base_translations[language][key]
     
@@ -273,20 +366,31 @@ UI_LABELS_ENGLISH = {
 def get_translated_ui_labels(target_language: str) -> Dict[str, str]:
     """
     Get all the buttons and labels for the app in the user's language.
-    Uses batch translation to minimize API round-trips.
+    Comes from the precompiled bundle (see ui_bundle_service.py), nothing is translated here.
     """
     if target_language == 'en':
         return UI_LABELS_ENGLISH
 
-    # Use batch translation: 1 HTTP call instead of 30+
     try:
-        batch_results = translate_batch(UI_LABELS_ENGLISH, target_language)
-        # Only return labels that are actually different from English
-        return {k: v for k, v in batch_results.items() if v and v != UI_LABELS_ENGLISH.get(k)}
+        from services.ui_bundle_service import get_bundle
+        bundle = get_bundle(target_language)
+        if bundle is None:
+            return UI_LABELS_ENGLISH
+        # Only labels that are actually different from English (the app has the English ones)
+        return {k: v for k, v in bundle['labels'].items() if k in UI_LABELS_ENGLISH}
     except Exception as e:
-        print(f"DEBUG: Batch UI label translation failed: {e}, falling back to English")
+        print(f"DEBUG: UI label bundle failed: {e}, falling back to English")
         return UI_LABELS_ENGLISH
 
+def get_translation_stats() -> Dict:
+    """How well the translation cache is doing (hit ratio, evictions...) and how fast Google answers"""
+    return {
+        'cache': get_translation_cache().stats(),
+        'backend': get_translator_backend().name,
+        'executor': get_translation_executor().stats(),
+        'pretranslated': {'entries': len(_pretranslated or {}), 'hits': pretranslated_hits}
+    }
+
 def get_supported_languages() -> Dict[str, str]:
     """List of languages our app can speak"""
     return {
@@ -303,29 +407,13 @@ def get_supported_languages() -> Dict[str, str]:
 def get_all_translations(target_language: str) -> Dict[str, str]:
     """
     Get all translations for a specific language.
-    Falls back to dynamic translation if key is missing.
+    Missing keys come from the compiled bundle, or stay in English (e.g. Tulu).
     """
+    from services.ui_bundle_service import get_bundle
+
+    base_translations = load_base_translations()
     english_dict = base_translations.get('en', {})
-    
-    # Start with existing manual translations
-    if target_language in base_translations:
-        result_dict = base_translations[target_language].copy()
-    else:
-        result_dict = {}
-        
-    # Fill in missing keys
-    for key, en_text in english_dict.items():
-        if key not in result_dict:
-            # For Tulu, Google Translate doesn't support it well, fallback to English or Kannada?
-            # Using English fallback for now as per requirement or specific handling
-            if target_language == 'tcy':
-                result_dict[key] = en_text 
-            else:
-                try:
-                    # Dynamically translate
-                    translated = translate_text(en_text, target_language)
-                    result_dict[key] = translated
-                except:
-                    result_dict[key] = en_text
-                    
+    bundle = get_bundle(target_language) or {'labels': {}}
+    result_dict = dict(english_dict)
+    result_dict.update({k: v for k, v in bundle['labels'].items() if k in english_dict})
     return result_dict
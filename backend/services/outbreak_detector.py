@@ -0,0 +1,219 @@
+import sys
+import os
+import datetime
+import threading
+from array import array
+from collections import OrderedDict, deque
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import settings
+from utils import geohash
+from typing import List, Dict, Optional
+
+# Spots sudden jumps in a disease within a region, as diagnoses come in.
+# Each (region, crop, disease) gets a small ring of time buckets: the newest few form
+# the "recent window", the older ones the "baseline". Running sums for both are kept
+# up to date, so each new diagnosis is O(1) no matter how long the ring is.
+
+class RingCounter:
+    """Per-bucket counts for one (region, crop, disease), newest bucket at `head`"""
+
+    __slots__ = ('counts', 'head', 'head_bucket', 'window_sum', 'baseline_sum', 'last_alert_bucket')
+
+    def __init__(self, size: int, bucket: int):
+        self.counts = array('I', bytes(4 * size))  # Unsigned ints, 4 bytes a bucket
+        self.head = 0
+        self.head_bucket = bucket
+        self.window_sum = 0
+        self.baseline_sum = 0
+        self.last_alert_bucket = None
+
+    def advance(self, bucket: int, window: int) -> None:
+        """Move time forward to `bucket`, sliding counts from the window into the baseline"""
+        steps = bucket - self.head_bucket
+        if steps <= 0:
+            return
+        size = len(self.counts)
+        if steps >= size:
+            # Everything we had is too old to matter
+            for i in range(size):
+                self.counts[i] = 0
+            self.window_sum = self.baseline_sum = 0
+            self.head = (self.head + steps) % size
+        else:
+            for _ in range(steps):
+                self.head = (self.head + 1) % size
+                # The oldest bucket drops out of the baseline and is reused as the newest
+                self.baseline_sum -= self.counts[self.head]
+                self.counts[self.head] = 0
+                # The bucket that just left the recent window joins the baseline
+                leaving = self.counts[(self.head - window) % size]
+                self.window_sum -= leaving
+                self.baseline_sum += leaving
+        self.head_bucket = bucket
+
+    def add(self, bucket: int, window: int, amount: int = 1) -> None:
+        """Count `amount` diagnoses in `bucket` (late arrivals still land in the right place)"""
+        self.advance(bucket, window)
+        age = self.head_bucket - bucket
+        if age >= len(self.counts):
+            return
+        self.counts[(self.head - age) % len(self.counts)] += amount
+        if age < window:
+            self.window_sum += amount
+        else:
+            self.baseline_sum += amount
+
+
+class OutbreakDetector:
+    """
+    Sliding-window spike detector, small enough to live inside the API process.
+    Memory is bounded: at most `max_keys` rings (least recently seen are dropped)
+    and the last `max_alerts` alerts.
+    """
+
+    def __init__(self, bucket_minutes: int = None, window_buckets: int = None, baseline_buckets: int = None,
+                 max_keys: int = None, max_alerts: int = None, min_count: int = None,
+                 spike_ratio: float = None, precision: int = None):
+        self.bucket_seconds = 60 * (bucket_minutes or settings.OUTBREAK_BUCKET_MINUTES)
+        self.window = window_buckets or settings.OUTBREAK_WINDOW_BUCKETS
+        self.baseline = baseline_buckets or settings.OUTBREAK_BASELINE_BUCKETS
+        self.max_keys = max_keys or settings.OUTBREAK_MAX_KEYS
+        self.min_count = min_count or settings.OUTBREAK_MIN_COUNT
+        self.spike_ratio = spike_ratio or settings.OUTBREAK_SPIKE_RATIO
+        self.precision = precision or settings.OUTBREAK_GEOHASH_PRECISION
+        self._rings = OrderedDict()
+        self._alerts = deque(maxlen=max_alerts or settings.OUTBREAK_MAX_ALERTS)
+        self._lock = threading.Lock()
+
+    def _bucket(self, when: datetime.datetime) -> int:
+        return int((when - datetime.datetime(1970, 1, 1)).total_seconds() // self.bucket_seconds)
+
+    def _ring(self, key, bucket: int) -> RingCounter:
+        ring = self._rings.get(key)
+        if ring is None:
+            ring = self._rings[key] = RingCounter(self.window + self.baseline, bucket)
+            if len(self._rings) > self.max_keys:
+                self._rings.popitem(last=False)
+        else:
+            self._rings.move_to_end(key)
+        return ring
+
+    def _key(self, diagnosis: Dict):
+        latitude, longitude = diagnosis.get('latitude'), diagnosis.get('longitude')
+        disease = diagnosis.get('disease')
+        if latitude is None or longitude is None or not disease or disease == 'Healthy':
+            return None
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            return None
+        return geohash.encode(latitude, longitude, self.precision), diagnosis.get('crop'), disease
+
+    def expected_in_window(self, ring: RingCounter) -> float:
+        """What the baseline says a normal recent window looks like (+1 so a quiet region isn't 0)"""
+        return (ring.baseline_sum + 1) * self.window / self.baseline
+
+    def observe(self, diagnosis: Dict) -> Optional[Dict]:
+        """Feed one new diagnosis in; returns the alert if it tipped its region into a spike"""
+        key = self._key(diagnosis)
+        if key is None:
+            return None
+        when = diagnosis.get('created_at') or datetime.datetime.utcnow()
+        bucket = self._bucket(when)
+
+        with self._lock:
+            ring = self._ring(key, bucket)
+            ring.add(bucket, self.window)
+            if ring.head_bucket != bucket:
+                return None  # A late arrival: counted, but it's not news
+
+            expected = self.expected_in_window(ring)
+            if ring.window_sum < self.min_count or ring.window_sum < self.spike_ratio * expected:
+                return None
+            # One alert per spike: stay quiet until the window that raised it has passed
+            if ring.last_alert_bucket is not None and bucket - ring.last_alert_bucket < self.window:
+                return None
+            ring.last_alert_bucket = bucket
+
+            region, crop, disease = key
+            latitude, longitude = geohash.decode(region)
+            alert = {
+                'region': region,
+                'center': {'latitude': round(latitude, 4), 'longitude': round(longitude, 4)},
+                'crop': crop,
+                'disease': disease,
+                'recent_count': ring.window_sum,
+                'expected_count': round(expected, 2),
+                'ratio': round(ring.window_sum / expected, 1),
+                'window_hours': self.window * self.bucket_seconds / 3600,
+                'detected_at': when
+            }
+            self._alerts.append(alert)
+
+        print(f"OUTBREAK ALERT: {disease} on {crop} in region {region} - "
+              f"{alert['recent_count']} cases vs ~{alert['expected_count']} expected")
+        return alert
+
+    def prime(self, rollups: List[Dict]) -> None:
+        """
+        Fill the rings from daily rollups (e.g. after a restart), so the baseline isn't empty
+        and the first busy day doesn't look like an outbreak everywhere.
+        Each day's count is spread evenly over that day's buckets.
+        """
+        buckets_per_day = max(1, 86400 // self.bucket_seconds)
+        # Today's count can't go into buckets that haven't happened yet
+        now = self._bucket(datetime.datetime.utcnow())
+        with self._lock:
+            for rollup in sorted(rollups, key=lambda r: r['day']):
+                disease = rollup.get('disease')
+                if not disease or disease == 'Healthy':
+                    continue
+                key = (rollup['cell'][:self.precision], rollup.get('crop'), disease)
+                first = self._bucket(datetime.datetime.strptime(rollup['day'], '%Y-%m-%d'))
+                share, extra = divmod(int(rollup.get('count', 0)), buckets_per_day)
+                for i in range(buckets_per_day):
+                    amount = share + (1 if i < extra else 0)
+                    if amount:
+                        bucket = min(first + i, now)
+                        self._ring(key, bucket).add(bucket, self.window, amount)
+
+    def get_alerts(self, region_prefix: str = '', since: datetime.datetime = None) -> List[Dict]:
+        """Newest alerts first, optionally only for one area and after a time"""
+        with self._lock:
+            alerts = list(self._alerts)
+        return [
+            dict(alert)
+            for alert in reversed(alerts)
+            if alert['region'].startswith(region_prefix) and (since is None or alert['detected_at'] >= since)
+        ]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'tracked_keys': len(self._rings), 'max_keys': self.max_keys, 'alerts': len(self._alerts)}
+
+
+# The one detector the API process feeds
+detector = OutbreakDetector()
+
+def observe_diagnosis(diagnosis: Dict) -> Optional[Dict]:
+    return detector.observe(diagnosis)
+
+def get_recent_alerts(region_prefix: str = '', since: datetime.datetime = None) -> List[Dict]:
+    return detector.get_alerts(region_prefix, since)
+
+def get_detector_stats() -> Dict:
+    return detector.stats()
+
+def prime_from_rollups() -> None:
+    """Load the last baseline's worth of daily rollups into the detector"""
+    from services.rollup_service import ROLLUP_COLLECTION
+    from database.db_connection import db
+
+    span_days = detector.bucket_seconds * (detector.window + detector.baseline) / 86400
+    start_day = (datetime.datetime.utcnow() - datetime.timedelta(days=span_days)).strftime('%Y-%m-%d')
+    try:
+        rollups = db.execute_query(collection=ROLLUP_COLLECTION, mongo_query={'day': {'$gte': start_day}})
+    except Exception as e:
+        print(f"Could not prime the outbreak detector: {e}")
+        return
+    detector.prime(rollups)
+    print(f"Outbreak detector primed from {len(rollups)} rollups")
@@ -1,10 +1,193 @@
 import sys
 import os
+import threading
+import time
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
 
 from database.db_connection import db
+from database.seeding import get_seed_version
+from config.settings import settings
 from typing import List, Dict
 
+# The pesticide catalog is small and rarely changes, so we load it once and answer
+# every "what cures this disease?" question from memory instead of asking MongoDB.
+_catalog_lock = threading.Lock()
+_catalog = None         # Every pesticide, in database order
+_disease_tokens = {}    # 'early blight' -> pesticides that list it in 'target_diseases'
+_disease_index = {}     # normalized disease name -> pre-sorted lists for each ranking
+_pesticides_by_name = {}  # 'neem oil' -> full pesticide details
+_incompatibility_graph = {}  # 'bordeaux mixture' -> {'copper oxychloride', 'streptomycin sulfate', ...}
+_catalog_version = None   # Seed version the catalog was loaded from
+_version_checked_at = 0.0  # When we last asked the database for the seed version
+
+def normalize_disease_name(name: str) -> str:
+    """Turn 'Tomato___Early_blight' or ' Early  Blight' into 'tomato early blight'"""
+    cleaned = (name or '').replace('___', ' ').replace('_', ' ')
+    return ' '.join(cleaned.lower().split())
+
+def normalize_pesticide_name(name: str) -> str:
+    """Compare pesticide names without worrying about case or extra spaces"""
+    return ' '.join((name or '').lower().split())
+
+def _format_pesticide(row: Dict) -> Dict:
+    """Shape a raw pesticide document the way the rest of the app expects it"""
+    return {
+        'id': str(row.get('_id') or row.get('id')),
+        'name': row.get('name'),
+        'type': row.get('type'),
+        'dosage_per_acre': row.get('dosage_per_acre'),
+        'frequency': row.get('frequency'),
+        'cost_per_liter': row.get('cost_per_liter'),
+        'is_organic': bool(row.get('is_organic')),
+        'is_government_approved': bool(row.get('is_government_approved')),
+        'warnings': row.get('warnings'),
+        'incompatible_with': row.get('incompatible_with')
+    }
+
+def _rank_pesticides(pesticides: List[Dict]) -> Dict[str, List[Dict]]:
+    """Pre-sort one list of pesticides for every way we ever show it"""
+    return {
+        'default': pesticides,
+        # Organic first, then cheapest first
+        'organic': sorted(pesticides, key=lambda x: (not x['is_organic'], x['cost_per_liter'] or 0)),
+        'approved': [p for p in pesticides if p['is_government_approved']]
+    }
+
+def _build_incompatibility_graph(rows: List[Dict]) -> Dict[str, set]:
+    """
+    Turn every pesticide's free-text 'incompatible_with' into a two-way graph.
+    Nodes are catalog pesticides plus the products named in the text (e.g. 'lime sulfur'),
+    so a compatibility check later is just a set lookup.
+    """
+    graph = {}
+
+    def add_edge(a, b):
+        if a and b and a != b:
+            graph.setdefault(a, set()).add(b)
+            graph.setdefault(b, set()).add(a)
+
+    catalog_names = {normalize_pesticide_name(row.get('name')) for row in rows}
+    for row in rows:
+        name = normalize_pesticide_name(row.get('name'))
+        text = normalize_pesticide_name(row.get('incompatible_with'))
+        if not text:
+            continue
+        # Products listed by name: 'Lime sulfur, Bordeaux mixture'
+        for product in text.split(','):
+            add_edge(name, product.strip())
+        # Catalog pesticides mentioned anywhere in the text (same rule as the old substring check)
+        for other in catalog_names:
+            if other in text:
+                add_edge(name, other)
+    return graph
+
+def _read_seed_version():
+    try:
+        return get_seed_version(db)
+    except Exception as e:
+        print(f"Could not check the seed version: {e}")
+        return None
+
+def _seed_version_changed() -> bool:
+    """
+    Has the reference data been re-seeded since the catalog was loaded?
+    Asks the database at most once every SEED_VERSION_CHECK_SECONDS.
+    """
+    global _version_checked_at
+    now = time.monotonic()
+    if now - _version_checked_at < settings.SEED_VERSION_CHECK_SECONDS:
+        return False
+    _version_checked_at = now
+    version = _read_seed_version()
+    return version is not None and version != _catalog_version
+
+def load_pesticide_catalog(force: bool = False) -> List[Dict]:
+    """
+    Read the whole pesticides collection once and build the disease -> pesticide index
+    and the incompatibility graph.
+    Safe to call on every request; after the first load it only checks (now and then)
+    whether the data was re-seeded.
+    """
+    global _catalog, _disease_tokens, _disease_index, _pesticides_by_name, _incompatibility_graph
+    global _catalog_version, _version_checked_at
+
+    if _catalog is not None and not force and not _seed_version_changed():
+        return _catalog
+
+    with _catalog_lock:
+        version = _read_seed_version()
+        if _catalog is not None and not force and _catalog_version == version:
+            return _catalog
+
+        # Read the version first: if a re-seed lands mid-load we'll just load again next check
+        _catalog_version = version
+        _version_checked_at = time.monotonic()
+        rows = db.execute_query(collection='pesticides', mongo_query={})
+        if not rows and _catalog is not None:
+            # Keep serving what we have rather than swapping in an empty catalog
+            return _catalog
+        catalog = []
+        tokens = {}
+        by_name = {}
+        for position, row in enumerate(rows):
+            pesticide = _format_pesticide(row)
+            catalog.append(pesticide)
+            by_name[normalize_pesticide_name(pesticide['name'])] = dict(pesticide, target_diseases=row.get('target_diseases'))
+            # 'Bacterial spot, Early blight' -> ['bacterial spot', 'early blight']
+            for disease in (row.get('target_diseases') or '').split(','):
+                token = normalize_disease_name(disease)
+                if token:
+                    tokens.setdefault(token, []).append(position)
+
+        # 'leaf blight' must also pick up 'bacterial leaf blight', just like the old regex did
+        index = {}
+        for token in tokens:
+            positions = set()
+            for other, other_positions in tokens.items():
+                if token in other:
+                    positions.update(other_positions)
+            index[token] = _rank_pesticides([catalog[i] for i in sorted(positions)])
+
+        _disease_tokens = tokens
+        _disease_index = index
+        _pesticides_by_name = by_name
+        _incompatibility_graph = _build_incompatibility_graph(rows)
+        # An empty result usually means the database was unreachable, so try again next time
+        _catalog = catalog if catalog else None
+        if catalog:
+            print(f"Pesticide catalog loaded: {len(catalog)} pesticides, {len(index)} disease entries")
+        return catalog
+
+def refresh_pesticide_catalog() -> List[Dict]:
+    """Throw away the in-memory catalog and load it again (e.g. after re-seeding)"""
+    return load_pesticide_catalog(force=True)
+
+def _lookup_disease(disease_name: str) -> Dict[str, List[Dict]]:
+    """
+    Find the ranked pesticide lists for a disease.
+    Like the old `$regex` search, 'leaf blight' also matches 'Bacterial leaf blight',
+    but each distinct name is only worked out once and then remembered. Only names that match
+    something are remembered: those are pieces of catalog disease names, so there are only so
+    many, whatever the requests send us.
+    """
+    catalog = load_pesticide_catalog()
+    if not catalog:
+        return _rank_pesticides([])
+
+    key = normalize_disease_name(disease_name)
+    ranked = _disease_index.get(key)
+    if ranked is None:
+        positions = set()
+        if key:
+            for token, token_positions in _disease_tokens.items():
+                if key in token:
+                    positions.update(token_positions)
+        ranked = _rank_pesticides([catalog[i] for i in sorted(positions)])
+        if positions:
+            with _catalog_lock:
+                _disease_index.setdefault(key, ranked)
+    return ranked
+
 def get_pesticides_for_disease(disease_name: str, crop: str, prefer_organic: bool = False) -> List[Dict]:
     """
     Search for medicines (pesticides) that cure the specific disease found.
@@ -13,80 +196,48 @@ def get_pesticides_for_disease(disease_name: str, crop: str, prefer_organic: boo
         disease_name: The name of the disease (e.g., Early Blight)
         prefer_organic: If True, we show rock-salt, neem oil, etc. first!
     """
-    
-    disease_clean = disease_name.replace('___', ' ').replace('_', ' ')
-    
-    # We look in our database for any pesticide that mentions this disease in its 'target_diseases'
-    results = db.execute_query(
-        collection='pesticides',
-        mongo_query={'target_diseases': {'$regex': disease_clean, '$options': 'i'}}
-    )
-    
-    pesticides = []
-    for row in results:
-        pesticide = {
-            'id': str(row.get('_id') or row.get('id')),
-            'name': row.get('name'),
-            'type': row.get('type'),
-            'dosage_per_acre': row.get('dosage_per_acre'),
-            'frequency': row.get('frequency'),
-            'cost_per_liter': row.get('cost_per_liter'),
-            'is_organic': bool(row.get('is_organic')),
-            'is_government_approved': bool(row.get('is_government_approved')),
-            'warnings': row.get('warnings'),
-            'incompatible_with': row.get('incompatible_with')
-        }
-        pesticides.append(pesticide)
+    ranked = _lookup_disease(disease_name)
     
     # If the user loves organic, we make sure those are at the very top
-    if prefer_organic:
-        pesticides.sort(key=lambda x: (not x['is_organic'], x['cost_per_liter']))
+    pesticides = ranked['organic'] if prefer_organic else ranked['default']
     
-    return pesticides
+    # Hand out copies so callers can translate/edit them without touching the shared index
+    return [p.copy() for p in pesticides]
 
 def get_pesticide_by_name(name: str) -> Dict:
     """Find details of a specific pesticide by its name."""
-    results = db.execute_query(
-        collection='pesticides',
-        mongo_query={'name': name}
-    )
-    
-    if results:
-        row = results[0]
-        return {
-            'id': str(row.get('_id') or row.get('id')),
-            'name': row.get('name'),
-            'type': row.get('type'),
-            'target_diseases': row.get('target_diseases'),
-            'dosage_per_acre': row.get('dosage_per_acre'),
-            'frequency': row.get('frequency'),
-            'cost_per_liter': row.get('cost_per_liter'),
-            'is_organic': bool(row.get('is_organic')),
-            'is_government_approved': bool(row.get('is_government_approved')),
-            'warnings': row.get('warnings'),
-            'incompatible_with': row.get('incompatible_with')
-        }
-    return None
+    load_pesticide_catalog()
+    pesticide = _pesticides_by_name.get(normalize_pesticide_name(name))
+    return pesticide.copy() if pesticide else None
+
+def are_pesticides_compatible(name1: str, name2: str) -> bool:
+    """Can these two be sprayed together? A single set lookup in the incompatibility graph."""
+    load_pesticide_catalog()
+    return normalize_pesticide_name(name2) not in _incompatibility_graph.get(normalize_pesticide_name(name1), ())
 
 def check_pesticide_compatibility(pesticide_names: List[str]) -> Dict:
     """
-    Safety check! Can these two medicines be mixed?
+    Safety check! Can these medicines be mixed?
     Mixing the wrong ones can be dangerous (like bleach and ammonia).
+    Checks every pair in the spray plan against the pre-built incompatibility graph,
+    so no database queries and no text searching.
     """
+    load_pesticide_catalog()
+    graph = _incompatibility_graph
     incompatibilities = []
     
-    for i, name1 in enumerate(pesticide_names):
-        pesticide1 = get_pesticide_by_name(name1)
-        if not pesticide1:
-            continue
-        
-        incompatible_with = pesticide1.get('incompatible_with', '')
-        if not incompatible_with:
+    names = [n for n in pesticide_names if n]
+    normalized = [normalize_pesticide_name(n) for n in names]
+    
+    for i, name1 in enumerate(names):
+        conflicts = graph.get(normalized[i])
+        if not conflicts:
             continue
         
         # Check against every other pesticide in the list
-        for name2 in pesticide_names[i+1:]:
-            if name2.lower() in incompatible_with.lower():
+        for j in range(i + 1, len(names)):
+            if normalized[j] in conflicts:
+                name2 = names[j]
                 incompatibilities.append({
                     'pesticide1': name1,
                     'pesticide2': name2,
@@ -98,6 +249,10 @@ def check_pesticide_compatibility(pesticide_names: List[str]) -> Dict:
         'incompatibilities': incompatibilities
     }
 
+def check_recommendation_compatibility(pesticides: List[Dict]) -> Dict:
+    """Check every pair in a list of recommended pesticides (as returned by this service)"""
+    return check_pesticide_compatibility([p.get('name') for p in pesticides])
+
 def get_severity_based_recommendations(disease_name: str, severity_percent: float, crop: str) -> Dict:
     """
     Smart Doctor Logic: 
@@ -153,7 +308,9 @@ def get_severity_based_recommendations(disease_name: str, severity_percent: floa
         'recommended_pesticides': recommended,
         'treatment_approach': approach,
         'urgency': urgency,
-        'application_note': get_application_note(severity_percent)
+        'application_note': get_application_note(severity_percent),
+        # Warn the farmer if any of the suggested products must not go in the same tank
+        'compatibility': check_recommendation_compatibility(recommended)
     }
 
 def get_severity_level(severity_percent: float) -> str:
@@ -182,10 +339,8 @@ def get_application_note(severity_percent: float) -> str:
 
 def get_organic_alternatives(disease_name: str, crop: str) -> List[Dict]:
     """Get only the eco-friendly options."""
-    all_pesticides = get_pesticides_for_disease(disease_name, crop, prefer_organic=True)
-    return [p for p in all_pesticides if p['is_organic']]
+    return [p.copy() for p in _lookup_disease(disease_name)['organic'] if p['is_organic']]
 
 def get_government_approved_pesticides(disease_name: str, crop: str) -> List[Dict]:
     """Get only the certified, safe-to-use pesticides."""
-    all_pesticides = get_pesticides_for_disease(disease_name, crop)
-    return [p for p in all_pesticides if p['is_government_approved']]
+    return [p.copy() for p in _lookup_disease(disease_name)['approved']]
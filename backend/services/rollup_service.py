@@ -0,0 +1,118 @@
+import sys
+import os
+import datetime
+import itertools
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db_connection import db
+from config.settings import settings
+from utils import geohash
+from typing import List, Dict, Optional
+
+# One small document per (map cell, crop, disease, day) with running totals.
+# Dashboards read these instead of scanning every diagnosis ever made.
+ROLLUP_COLLECTION = 'disease_rollups'
+
+def rollup_key(diagnosis: Dict) -> Optional[Dict]:
+    """Which rollup a diagnosis counts towards (None if it has no usable location)"""
+    latitude, longitude = diagnosis.get('latitude'), diagnosis.get('longitude')
+    created_at = diagnosis.get('created_at')
+    if latitude is None or longitude is None or not created_at:
+        return None
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return None
+    return {
+        'cell': geohash.encode(latitude, longitude, settings.ROLLUP_GEOHASH_PRECISION),
+        'crop': diagnosis.get('crop'),
+        'disease': diagnosis.get('disease'),
+        'day': created_at.strftime('%Y-%m-%d')
+    }
+
+def _counters(diagnosis: Dict) -> Dict:
+    return {'count': 1, 'severity_sum': float(diagnosis.get('severity_percent') or 0)}
+
+def record_diagnosis(diagnosis: Dict) -> bool:
+    """Add one new diagnosis to its rollup (a single `$inc` upsert)"""
+    key = rollup_key(diagnosis)
+    if key is None:
+        return False
+    db.execute_increment(ROLLUP_COLLECTION, key, _counters(diagnosis))
+    return True
+
+def backfill_rollups(batch_size: int = 1000) -> int:
+    """
+    Rebuild every rollup from diagnosis_history and the archived months (see archive_service).
+    Totals are added up in memory (one entry per rollup, not per diagnosis) and written at
+    the end, so run it while no new diagnoses are coming in, or their counts may be lost.
+    Returns the number of rollup documents written.
+    """
+    totals = {}
+    scanned = 0
+    from services.archive_service import iter_archived_history
+
+    history = itertools.chain(db.iterate_query('diagnosis_history', {}, batch_size=batch_size),
+                              iter_archived_history())
+    for diagnosis in history:
+        scanned += 1
+        key = rollup_key(diagnosis)
+        if key is None:
+            continue
+        counters = totals.setdefault(tuple(key.items()), {'count': 0, 'severity_sum': 0.0})
+        for name, amount in _counters(diagnosis).items():
+            counters[name] += amount
+        if scanned % 10000 == 0:
+            print(f"Rollup backfill: scanned {scanned} diagnoses")
+
+    db.execute_delete(collection=ROLLUP_COLLECTION, mongo_query={})
+    for key, counters in totals.items():
+        db.execute_increment(ROLLUP_COLLECTION, dict(key), counters)
+    print(f"Rollup backfill: {scanned} diagnoses -> {len(totals)} rollups")
+    return len(totals)
+
+def _period_start(day: str, period: str) -> str:
+    """'2024-06-13' -> itself for daily numbers, or the Monday of its week for weekly ones"""
+    if period != 'week':
+        return day
+    date = datetime.datetime.strptime(day, '%Y-%m-%d').date()
+    return (date - datetime.timedelta(days=date.weekday())).isoformat()
+
+def get_prevalence(cell_prefix: str, start_day: str, end_day: str, precision: int = None,
+                   period: str = 'week', crop: str = None, disease: str = None) -> List[Dict]:
+    """
+    Disease counts per area and period, read straight from the rollups.
+    `precision` merges neighbouring cells: 4 characters is roughly a district.
+    """
+    precision = min(precision or settings.ROLLUP_GEOHASH_PRECISION, settings.ROLLUP_GEOHASH_PRECISION)
+    query = {'day': {'$gte': start_day, '$lte': end_day}}
+    if cell_prefix:
+        query['cell'] = {'$regex': f'^{cell_prefix}'}
+    if crop:
+        query['crop'] = crop.lower()
+    if disease:
+        query['disease'] = disease
+
+    groups = {}
+    for rollup in db.execute_query(collection=ROLLUP_COLLECTION, mongo_query=query):
+        key = (rollup['cell'][:precision], rollup.get('crop'), rollup.get('disease'),
+               _period_start(rollup['day'], period))
+        group = groups.setdefault(key, {'count': 0, 'severity_sum': 0.0})
+        group['count'] += rollup.get('count', 0)
+        group['severity_sum'] += rollup.get('severity_sum', 0.0)
+
+    results = []
+    for (cell, crop_name, disease_name, period_start), group in groups.items():
+        latitude, longitude = geohash.decode(cell)
+        results.append({
+            'cell': cell,
+            'center': {'latitude': round(latitude, 4), 'longitude': round(longitude, 4)},
+            'crop': crop_name,
+            'disease': disease_name,
+            'period_start': period_start,
+            'count': group['count'],
+            'avg_severity': round(group['severity_sum'] / group['count'], 1) if group['count'] else 0
+        })
+    results.sort(key=lambda r: (r['period_start'], r['cell'], -r['count']))
+    return results
+
+if __name__ == '__main__':
+    backfill_rollups()
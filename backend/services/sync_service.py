@@ -0,0 +1,93 @@
+import sys
+import os
+import json
+import base64
+import datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db_connection import db
+from config.settings import settings
+from typing import Dict, List, Optional, Tuple
+
+# Delta sync for the app's offline history.
+# Every diagnosis carries 'updated_at' (set when it's saved and whenever it changes), and changes
+# are handed out in (updated_at, _id) order. The sync token is just the position of the last
+# record the device received, so a reconnecting phone only downloads what it hasn't seen yet.
+
+# A first sync starts from here (a plain range, so it still uses the index)
+EPOCH = datetime.datetime(1970, 1, 1)
+
+def encode_sync_token(updated_at: datetime.datetime, record_id) -> str:
+    """Pack a position in the change feed into an opaque, URL-safe string"""
+    raw = json.dumps({'t': updated_at.isoformat(), 'id': str(record_id)}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_sync_token(token: str) -> Tuple[datetime.datetime, str]:
+    """Unpack a sync token; raises ValueError if it's not one of ours"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+        return datetime.datetime.fromisoformat(data['t']), str(data['id'])
+    except Exception:
+        raise ValueError('Invalid sync token')
+
+def _id_value(record_id: str):
+    """Compare ids the way they are stored (ObjectIds in MongoDB, plain strings in SQLite)"""
+    try:
+        from bson.objectid import ObjectId
+        return ObjectId(record_id) if ObjectId.is_valid(record_id) else record_id
+    except ImportError:
+        return record_id
+
+def get_changes(user_id: str, since: Optional[str] = None, limit: int = None) -> Dict:
+    """
+    The user's diagnoses created or changed after the `since` token, oldest change first.
+    Returns at most `limit` records, the token to send next time, and whether more are waiting.
+    """
+    limit = max(1, min(limit or settings.SYNC_BATCH_SIZE, settings.SYNC_MAX_BATCH_SIZE))
+    order = [('updated_at', 1), ('_id', 1)]
+
+    records: List[Dict] = []
+    if since:
+        last_time, last_id = decode_sync_token(since)
+        # Two index range scans instead of one $or: first the rest of the records that share
+        # the last timestamp, then everything newer
+        records = db.execute_query(
+            collection='diagnosis_history',
+            mongo_query={'user_id': user_id, 'updated_at': last_time, '_id': {'$gt': _id_value(last_id)}},
+            sort=order,
+            limit=limit + 1
+        )
+        newer = {'user_id': user_id, 'updated_at': {'$gt': last_time}}
+    else:
+        newer = {'user_id': user_id, 'updated_at': {'$gte': EPOCH}}
+
+    if len(records) <= limit:
+        records += db.execute_query(
+            collection='diagnosis_history',
+            mongo_query=newer,
+            sort=order,
+            limit=limit + 1 - len(records)
+        )
+
+    has_more = len(records) > limit
+    records = records[:limit]
+    next_token = encode_sync_token(records[-1]['updated_at'], records[-1]['_id']) if records else since
+    return {'records': records, 'next': next_token, 'has_more': has_more}
+
+def backfill_updated_at(batch_size: int = 500) -> int:
+    """Older records never had 'updated_at'; start them at their creation time. Safe to run again."""
+    updated = 0
+    while True:
+        batch = db.execute_query(collection='diagnosis_history', mongo_query={'updated_at': {'$exists': False}},
+                                 limit=batch_size)
+        if not batch:
+            break
+        for record in batch:
+            db.execute_update(
+                collection='diagnosis_history',
+                mongo_query={'_id': record['_id']},
+                update={'updated_at': record.get('created_at') or datetime.datetime.utcnow()}
+            )
+            updated += 1
+    return updated
@@ -0,0 +1,164 @@
+import sys
+import os
+import hashlib
+import datetime
+import threading
+from collections import OrderedDict
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import settings
+from typing import Dict, Iterable, Optional
+
+# Translations we've already paid Google for, kept in two tiers:
+#   1. a small LRU dict in this process (no I/O at all)
+#   2. a persistent store shared by every worker and kept across restarts
+#      (its own SQLite file by default, or the main database)
+# Entries are keyed by a hash of (source, target, text), so long paragraphs don't make long keys.
+
+CACHE_COLLECTION = 'translation_cache'
+
+def cache_key(text: str, source_language: str, target_language: str) -> str:
+    return hashlib.sha256(f'{source_language}\x00{target_language}\x00{text}'.encode('utf-8')).hexdigest()
+
+class TranslationCache:
+    """In-process LRU in front of a persistent store (any StorageBackend, or None for memory only)"""
+
+    def __init__(self, max_entries: int, store=None):
+        self.max_entries = max_entries
+        self.store = store
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.writes = 0
+        self.store_errors = 0
+
+    def _remember(self, key: str, translated: str) -> None:
+        # Caller holds the lock
+        self._memory[key] = translated
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def get_many(self, texts: Iterable[str], source_language: str, target_language: str) -> Dict[str, str]:
+        """The cached translations we have for these texts ({text: translation}, misses left out)"""
+        found = {}
+        missing = {}
+        with self._lock:
+            for text in set(texts):
+                key = cache_key(text, source_language, target_language)
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[text] = self._memory[key]
+                    self.memory_hits += 1
+                else:
+                    missing[key] = text
+
+        if missing and self.store is not None:
+            # One query for the whole batch
+            try:
+                rows = self.store.execute_query(collection=CACHE_COLLECTION,
+                                                mongo_query={'key': {'$in': list(missing)}})
+            except Exception as e:
+                print(f"Translation cache read failed: {e}")
+                rows = []
+                with self._lock:
+                    self.store_errors += 1
+            with self._lock:
+                for row in rows:
+                    text = missing.pop(row.get('key'), None)
+                    if text is None:
+                        continue
+                    found[text] = row['translated']
+                    self._remember(row['key'], row['translated'])
+                    self.persistent_hits += 1
+
+        with self._lock:
+            self.misses += len(missing)
+        return found
+
+    def get(self, text: str, source_language: str, target_language: str) -> Optional[str]:
+        return self.get_many([text], source_language, target_language).get(text)
+
+    def put_many(self, translations: Dict[str, str], source_language: str, target_language: str) -> None:
+        """Remember fresh translations ({text: translation}) in both tiers"""
+        rows = []
+        with self._lock:
+            for text, translated in translations.items():
+                if not translated:
+                    continue
+                key = cache_key(text, source_language, target_language)
+                self._remember(key, translated)
+                rows.append({'key': key, 'source': source_language, 'target': target_language,
+                             'translated': translated, 'created_at': datetime.datetime.utcnow()})
+            self.writes += len(rows)
+
+        if rows and self.store is not None:
+            try:
+                self.store.execute_bulk_upsert(CACHE_COLLECTION, rows, ('key',))
+            except Exception as e:
+                print(f"Translation cache write failed: {e}")
+                with self._lock:
+                    self.store_errors += 1
+
+    def put(self, text: str, translated: str, source_language: str, target_language: str) -> None:
+        self.put_many({text: translated}, source_language, target_language)
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._memory.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.memory_hits + self.persistent_hits + self.misses
+            return {
+                'entries': len(self._memory),
+                'max_entries': self.max_entries,
+                'persistent_store': getattr(self.store, 'name', None),
+                'memory_hits': self.memory_hits,
+                'persistent_hits': self.persistent_hits,
+                'misses': self.misses,
+                'hit_ratio': round((self.memory_hits + self.persistent_hits) / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+                'writes': self.writes,
+                'store_errors': self.store_errors,
+            }
+
+
+def create_translation_cache(store_type: str = None) -> TranslationCache:
+    """
+    Build the cache from settings.TRANSLATION_CACHE_STORE:
+    'sqlite' (default, a local file every worker on this machine shares),
+    'database' (the main database, shared by every server) or 'memory' (no persistence).
+    """
+    store_type = (store_type or settings.TRANSLATION_CACHE_STORE or 'sqlite').lower()
+    store = None
+    try:
+        if store_type == 'sqlite':
+            from database.sqlite_backend import SQLiteDatabase
+            store = SQLiteDatabase(settings.TRANSLATION_CACHE_PATH)
+        elif store_type == 'database':
+            from database.db_connection import db
+            store = db
+        elif store_type != 'memory':
+            print(f"Unknown TRANSLATION_CACHE_STORE '{store_type}', keeping translations in memory only")
+    except Exception as e:
+        print(f"Could not open the translation cache store, keeping translations in memory only: {e}")
+        store = None
+    return TranslationCache(settings.TRANSLATION_CACHE_SIZE, store)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_translation_cache() -> TranslationCache:
+    """The shared cache (opened on first use, so importing this module touches no files)"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = create_translation_cache()
+    return _cache
@@ -0,0 +1,151 @@
+import sys
+import os
+import time
+import threading
+import itertools
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import settings
+from typing import Callable, Dict, List, Optional
+
+# Runs translation calls on a small thread pool so one request never waits on them one by one.
+# Strings are split into chunks that are translated in parallel; the request waits until its
+# deadline and takes whatever is finished. Chunks still running carry on in the background and
+# put their results in the cache when they're done, so the next request finds them there.
+#
+# A text that is already being translated isn't sent again: when many users get the same
+# diagnosis at once, they all wait on the one call that's in flight and share its answer.
+
+class TranslationExecutor:
+    """Bounded pool of translation calls with per-request deadlines and latency numbers"""
+
+    def __init__(self, max_workers: int, chunk_size: int, max_pending: int):
+        self.chunk_size = max(1, chunk_size)
+        self.max_pending = max_pending
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='translate')
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._late = set()  # Chunks whose request stopped waiting for them
+        self._inflight = {}  # (key, text) -> (future, chunk id) of the call translating it
+        self._ids = itertools.count()
+        self._latencies = deque(maxlen=500)  # Milliseconds per provider call, most recent
+        self.calls = 0
+        self.strings = 0
+        self.timed_out = 0
+        self.late_completed = 0
+        self.errors = 0
+        self.rejected = 0
+        self.coalesced = 0     # Strings that joined a call already in flight
+        self.calls_saved = 0   # translate() calls that didn't need to send anything themselves
+
+    def _run(self, chunk_id: int, key, chunk: List[str], provider: Callable, on_done: Optional[Callable]) -> Dict[str, str]:
+        start = time.monotonic()
+        results = {}
+        try:
+            translated = provider(chunk)
+            results = {text: out for text, out in zip(chunk, translated or []) if out}
+            if on_done and results:
+                on_done(results)  # Before the request sees it, so it's in the cache from now on
+        except Exception as e:
+            print(f"Translation call failed ({len(chunk)} strings): {e}")
+            with self._lock:
+                self.errors += 1
+        finally:
+            with self._lock:
+                self._latencies.append((time.monotonic() - start) * 1000)
+                self._pending -= 1
+                for text in chunk:
+                    if self._inflight.get((key, text), (None, None))[1] == chunk_id:
+                        del self._inflight[(key, text)]
+                if chunk_id in self._late:
+                    self._late.discard(chunk_id)
+                    self.late_completed += len(results)
+        return results
+
+    def translate(self, texts: List[str], provider: Callable, on_done: Callable = None,
+                  deadline: Optional[float] = None, key=None) -> Dict[str, str]:
+        """
+        Translate `texts` with `provider(chunk) -> translated chunk`, in parallel chunks.
+        Waits at most `deadline` seconds (None = until all are done) and returns {text: translation}
+        for what finished; anything missing is the caller's to fall back on. Calls with the same
+        `key` (e.g. the language pair) share in-flight work for the same text.
+        """
+        texts = list(dict.fromkeys(texts))
+        wanted = {}  # future -> (chunk id, the texts we want from it)
+        with self._lock:
+            self.calls += 1
+            self.strings += len(texts)
+            fresh = []
+            for text in texts:
+                inflight = self._inflight.get((key, text))
+                if inflight is not None:
+                    wanted.setdefault(inflight[0], (inflight[1], []))[1].append(text)
+                    self.coalesced += 1
+                else:
+                    fresh.append(text)
+            if texts and not fresh:
+                self.calls_saved += 1
+            for i in range(0, len(fresh), self.chunk_size):
+                chunk = fresh[i:i + self.chunk_size]
+                # A stuck provider mustn't pile up work without end: past the limit we don't even try
+                if self._pending >= self.max_pending:
+                    self.rejected += len(chunk)
+                    continue
+                self._pending += 1
+                chunk_id = next(self._ids)
+                future = self._pool.submit(self._run, chunk_id, key, chunk, provider, on_done)
+                wanted[future] = (chunk_id, chunk)
+                for text in chunk:
+                    self._inflight[(key, text)] = (future, chunk_id)
+
+        done, not_done = wait(wanted, timeout=deadline)
+        results = {}
+        for future in done:
+            translated = future.result()
+            results.update((text, translated[text]) for text in wanted[future][1] if text in translated)
+        if not_done:
+            missed = sum(len(wanted[future][1]) for future in not_done)
+            with self._lock:
+                for future in not_done:
+                    self._late.add(wanted[future][0])
+                self.timed_out += missed
+            print(f"Translation deadline passed: {missed} strings left in English for now")
+        return results
+
+    def stats(self) -> Dict:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            return {
+                'calls': self.calls,
+                'strings': self.strings,
+                'timed_out': self.timed_out,
+                'late_completed': self.late_completed,
+                'errors': self.errors,
+                'rejected': self.rejected,
+                'coalesced': self.coalesced,
+                'calls_saved': self.calls_saved,
+                'pending': self._pending,
+                'in_flight': len(self._inflight),
+                'latency_ms': {
+                    'count': len(latencies),
+                    'p50': round(latencies[len(latencies) // 2], 1) if latencies else None,
+                    'p95': round(latencies[int(len(latencies) * 0.95)], 1) if latencies else None,
+                    'max': round(latencies[-1], 1) if latencies else None,
+                },
+            }
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_translation_executor() -> TranslationExecutor:
+    """The shared executor (its threads start on first use)"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = TranslationExecutor(settings.TRANSLATION_WORKERS, settings.TRANSLATION_CHUNK_SIZE,
+                                                settings.TRANSLATION_MAX_PENDING)
+    return _executor
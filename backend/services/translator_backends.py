@@ -0,0 +1,131 @@
+import sys
+import os
+import json
+import time
+import random
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from deep_translator import GoogleTranslator
+from config.settings import settings
+from typing import Dict, List, Optional
+
+# Who actually translates our text. Pick one per deployment with TRANSLATOR_BACKEND:
+#
+#   google      - Google Translate through deep-translator (needs the internet)
+#   dictionary  - offline: the hand-written app labels plus our crop/pesticide glossary
+#   stub        - pretends to be Google with a set delay, for load tests and benchmarks
+#
+# A backend takes a list of English texts and returns a list of the same length;
+# None means "don't know this one", which the caller shows in English.
+
+class GoogleBackend:
+    name = 'google'
+    cacheable = True  # Real translations, worth remembering
+
+    def translate_batch(self, texts: List[str], source_language: str, target_language: str) -> List[Optional[str]]:
+        translator = GoogleTranslator(source=source_language, target=target_language)
+        return translator.translate_batch(texts)
+
+
+class DictionaryBackend:
+    """
+    Translates only what we have on disk: translations.json (app labels, matched through
+    the English text), CROP_NAMES / PESTICIDE_TYPES and the glossary of disease and pesticide
+    names ({"hi": {"Early blight": "..."}}, database/seed/glossary.json, filled by
+    `add_translations.py --glossary`). Matching ignores case; anything else comes back None.
+    """
+    name = 'dictionary'
+    cacheable = False  # It's already a local lookup, no need to fill the cache with it
+
+    def __init__(self, translations_file: str = None, glossary_file: str = None):
+        self.translations_file = translations_file
+        self.glossary_file = glossary_file if glossary_file is not None else settings.TRANSLATOR_GLOSSARY_PATH
+        self._lookup = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict:
+        from services.language_service import CROP_NAMES, PESTICIDE_TYPES, TRANSLATIONS_FILE
+        lookup = {}  # (language, lower-case English) -> translation
+
+        def add(language, english, translated):
+            if english and translated:
+                lookup[(language, english.strip().lower())] = translated
+
+        try:
+            with open(self.translations_file or TRANSLATIONS_FILE, 'r', encoding='utf-8') as f:
+                labels = json.load(f)
+            english = labels.get('en', {})
+            for language, values in labels.items():
+                for key, translated in values.items():
+                    add(language, english.get(key), translated)
+        except Exception as e:
+            print(f"Dictionary translator could not read the app labels: {e}")
+
+        for glossary in (CROP_NAMES, PESTICIDE_TYPES):
+            for english, languages in glossary.items():
+                for language, translated in languages.items():
+                    add(language, english, translated)
+
+        if self.glossary_file and os.path.exists(self.glossary_file):
+            try:
+                with open(self.glossary_file, 'r', encoding='utf-8') as f:
+                    for language, terms in json.load(f).items():
+                        for english, translated in terms.items():
+                            add(language, english, translated)
+            except Exception as e:
+                print(f"Dictionary translator could not read the glossary {self.glossary_file}: {e}")
+
+        print(f"Dictionary translator loaded {len(lookup)} terms")
+        return lookup
+
+    def translate_batch(self, texts: List[str], source_language: str, target_language: str) -> List[Optional[str]]:
+        if self._lookup is None:
+            with self._lock:
+                if self._lookup is None:
+                    self._lookup = self._load()
+        if source_language != 'en':
+            return [None] * len(texts)
+        return [self._lookup.get((target_language, text.strip().lower())) for text in texts]
+
+
+class LatencyStubBackend:
+    """Answers '[hi] text' after TRANSLATOR_STUB_LATENCY_MS (give or take the jitter) per call"""
+    name = 'stub'
+    cacheable = False  # Fake text must never end up in the real cache
+
+    def __init__(self, latency_ms: float = None, jitter_ms: float = None):
+        self.latency_ms = settings.TRANSLATOR_STUB_LATENCY_MS if latency_ms is None else latency_ms
+        self.jitter_ms = settings.TRANSLATOR_STUB_JITTER_MS if jitter_ms is None else jitter_ms
+
+    def translate_batch(self, texts: List[str], source_language: str, target_language: str) -> List[Optional[str]]:
+        delay = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        time.sleep(max(0.0, delay) / 1000)
+        return [f'[{target_language}] {text}' for text in texts]
+
+
+BACKENDS = {
+    'google': GoogleBackend,
+    'dictionary': DictionaryBackend,
+    'stub': LatencyStubBackend,
+}
+
+def create_translator_backend(name: str = None):
+    name = (name or settings.TRANSLATOR_BACKEND or 'google').lower()
+    if name not in BACKENDS:
+        print(f"Unknown TRANSLATOR_BACKEND '{name}', using Google")
+        name = 'google'
+    return BACKENDS[name]()
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_translator_backend():
+    """The backend this deployment uses (made on first use)"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_translator_backend()
+    return _backend
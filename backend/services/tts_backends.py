@@ -0,0 +1,133 @@
+import sys
+import os
+import math
+import time
+import shutil
+import threading
+import subprocess
+from collections import deque
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gtts import gTTS
+from config.settings import settings
+from typing import Dict
+
+# Who turns text into speech. Pick one per deployment with TTS_SERVICE:
+#
+#   gtts    - Google Text-to-Speech (needs the internet)
+#   local   - espeak-ng on this machine, encoded to MP3 with ffmpeg or lame (offline boxes)
+#   silent  - writes silence as long as the text would take to say, for tests and load tests
+#
+# Every backend writes an MP3 to the path it's given and raises if it can't.
+
+# What gTTS sends too (MPEG-2 Layer III, 24 kHz, 64 kbps, mono): one frame header, and a frame
+# whose side info is all zeros decodes as 24 ms of silence
+_SILENT_FRAME = b'\xff\xf3\x84\xc4' + b'\0' * 188
+_FRAME_SECONDS = 576 / 24000
+
+class GTTSBackend:
+    name = 'gtts'
+
+    def synthesize(self, text: str, language: str, filepath: str, slow: bool = False) -> None:
+        tts = gTTS(text=text, lang=language, slow=slow, timeout=settings.VOICE_TTS_TIMEOUT)
+        tts.save(filepath)
+
+
+class LocalBackend:
+    """espeak-ng (or espeak) speaks, ffmpeg or lame turns its WAV into MP3"""
+    name = 'local'
+
+    def __init__(self):
+        self.speaker = shutil.which('espeak-ng') or shutil.which('espeak')
+        self.encoder = shutil.which('ffmpeg') or shutil.which('lame')
+        if not self.available():
+            print("Warning: TTS_SERVICE=local needs espeak-ng and ffmpeg (or lame); voice files will fail")
+
+    def available(self) -> bool:
+        return bool(self.speaker and self.encoder)
+
+    def synthesize(self, text: str, language: str, filepath: str, slow: bool = False) -> None:
+        if not self.available():
+            raise RuntimeError('espeak-ng and ffmpeg/lame are not installed')
+        timeout = settings.VOICE_TTS_TIMEOUT
+        wav = subprocess.run([self.speaker, '-v', language, '-s', '120' if slow else '160', '--stdout', text],
+                             capture_output=True, check=True, timeout=timeout).stdout
+        if os.path.basename(self.encoder).startswith('ffmpeg'):
+            command = [self.encoder, '-loglevel', 'error', '-y', '-f', 'wav', '-i', '-',
+                       '-ar', '24000', '-ac', '1', '-b:a', '64k', '-f', 'mp3', filepath]
+        else:
+            command = [self.encoder, '--quiet', '--resample', '24', '-m', 'm', '-b', '64', '-', filepath]
+        subprocess.run(command, input=wav, capture_output=True, check=True, timeout=timeout)
+
+
+class SilentBackend:
+    """Silence about as long as the text takes to say (~70 ms a character), same bytes every time"""
+    name = 'silent'
+
+    def synthesize(self, text: str, language: str, filepath: str, slow: bool = False) -> None:
+        seconds = max(0.3, len(text) * (0.1 if slow else 0.07))
+        with open(filepath, 'wb') as f:
+            f.write(_SILENT_FRAME * math.ceil(seconds / _FRAME_SECONDS))
+
+
+BACKENDS = {
+    'gtts': GTTSBackend,
+    'local': LocalBackend,
+    'silent': SilentBackend,
+}
+
+def create_tts_backend(name: str = None):
+    name = (name or settings.TTS_SERVICE or 'gtts').lower()
+    if name not in BACKENDS:
+        print(f"Unknown TTS_SERVICE '{name}', using gTTS")
+        name = 'gtts'
+    return BACKENDS[name]()
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_tts_backend():
+    """The backend this deployment uses (made on first use)"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_tts_backend()
+    return _backend
+
+
+# How long each backend takes, per call (milliseconds, most recent 500)
+_stats_lock = threading.Lock()
+_latencies = {}
+_calls = {}
+_errors = {}
+
+def synthesize(text: str, language: str, filepath: str, slow: bool = False) -> None:
+    """Speak `text` into `filepath` with the configured backend, timing the call"""
+    backend = get_tts_backend()
+    start = time.monotonic()
+    try:
+        backend.synthesize(text, language, filepath, slow)
+    except Exception:
+        with _stats_lock:
+            _errors[backend.name] = _errors.get(backend.name, 0) + 1
+        raise
+    finally:
+        with _stats_lock:
+            _calls[backend.name] = _calls.get(backend.name, 0) + 1
+            _latencies.setdefault(backend.name, deque(maxlen=500)).append((time.monotonic() - start) * 1000)
+
+def tts_stats() -> Dict:
+    stats = {'backend': get_tts_backend().name}
+    with _stats_lock:
+        for name, latencies in _latencies.items():
+            ordered = sorted(latencies)
+            stats[name] = {
+                'calls': _calls.get(name, 0),
+                'errors': _errors.get(name, 0),
+                'p50_ms': round(ordered[len(ordered) // 2], 1),
+                'p95_ms': round(ordered[int(len(ordered) * 0.95)], 1),
+                'max_ms': round(ordered[-1], 1),
+            }
+        return stats
@@ -0,0 +1,200 @@
+import sys
+import os
+import json
+import hashlib
+import time
+import datetime
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import settings
+from services.language_service import (TranslationPlan, UI_LABELS_ENGLISH, get_supported_languages,
+                                       load_base_translations)
+from typing import Dict, List, Optional
+
+# The app's labels (translations.json + the results screen labels), compiled once per language
+# into a "bundle" file with a content hash:
+#
+#   ui_bundles/hi.json  ->  {"language": "hi", "version": "3f2a...", "labels": {...}}
+#
+# Run this file at deploy time to compile them all. The version is what diagnosis responses carry
+# and what /api/translations sends as its ETag, so the app only downloads labels when they change.
+#
+# A request never waits for a compile: if a bundle is missing or out of date, the request gets
+# the hand-written labels (or the old file) and the bundle is compiled in the background. Labels
+# the translator couldn't do are listed under "missing" and tried again later.
+
+# Languages Google doesn't translate well: keep their hand-written labels and let the app fall back
+NO_MACHINE_TRANSLATION = {'tcy'}
+
+_bundles = {}
+_bundles_lock = threading.Lock()
+_language_locks = {}   # language -> lock, so reading one language's file never holds up another
+_outdated = set()      # Languages served from an out-of-date file until their compile is done
+_compiling = {}        # language -> background compile thread
+_retry_at = {}         # language -> time.monotonic() before which we don't compile it again
+
+def _hash(data) -> str:
+    canonical = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+def english_labels() -> Dict[str, str]:
+    return {**load_base_translations().get('en', {}), **UI_LABELS_ENGLISH}
+
+def source_version(language: str) -> str:
+    """Changes whenever the English labels or this language's hand-written ones change"""
+    return _hash([english_labels(), load_base_translations().get(language, {})])
+
+def build_bundle(language: str, previous: Dict = None, translate: bool = True) -> Dict:
+    """
+    Translate every label into `language` (one batch). Hand-written translations win;
+    labels that would just be the English are left out, the app already has those.
+    Labels the translator didn't do are listed in 'missing'. With a `previous` bundle of the
+    same source only its missing labels are sent again; with translate=False nothing is sent.
+    """
+    english = english_labels()
+    missing = []
+    if language == 'en':
+        labels = dict(english)
+    else:
+        manual = load_base_translations().get(language, {})
+        source = source_version(language)
+        done = previous['labels'] if previous and previous.get('source_version') == source else {}
+        labels = {}
+        asked = []
+        plan = TranslationPlan(language, wait_for_all=True)  # A bundle is saved, so no English gaps
+        for key, text in english.items():
+            if key in manual:
+                labels[key] = manual[key]
+            elif language in NO_MACHINE_TRANSLATION:
+                continue
+            elif key in done:
+                labels[key] = done[key]
+            elif translate:
+                labels[key] = text
+                plan.add(labels, key)
+                asked.append(key)
+            else:
+                missing.append(key)
+        plan.run()
+        # The translator gives the English back when it fails
+        missing += [key for key in asked if not labels.get(key) or labels[key] == english[key]]
+        labels = {k: v for k, v in labels.items() if v and v != english.get(k)}
+    return {
+        'language': language,
+        'version': _hash(labels),
+        'source_version': source_version(language),
+        'compiled_at': datetime.datetime.utcnow().isoformat(),
+        'labels': labels,
+        'missing': sorted(missing),
+    }
+
+def _bundle_path(language: str, folder: str = None) -> str:
+    return os.path.join(folder or settings.UI_BUNDLE_FOLDER, f'{language}.json')
+
+def save_bundle(bundle: Dict, folder: str = None) -> str:
+    path = _bundle_path(bundle['language'], folder)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Write then rename, so another worker never reads half a file
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(bundle, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+    return path
+
+def load_bundle_file(language: str, folder: str = None) -> Optional[Dict]:
+    path = _bundle_path(language, folder)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Could not read UI bundle {path}: {e}")
+        return None
+
+def compile_bundles(languages: List[str] = None, folder: str = None) -> Dict[str, str]:
+    """Build and save the bundle of every language; returns {language: version}"""
+    versions = {}
+    for language in languages or get_supported_languages():
+        bundle = build_bundle(language)
+        print(f"Compiled '{language}' UI bundle: {len(bundle['labels'])} labels "
+              f"({len(bundle['missing'])} missing), version {bundle['version']}")
+        save_bundle(bundle, folder)
+        with _bundles_lock:
+            _bundles[language] = bundle
+            _outdated.discard(language)
+            _retry_at.pop(language, None)
+        versions[language] = bundle['version']
+    return versions
+
+def _compile(language: str, previous: Optional[Dict]) -> None:
+    """Background compile of one language; the request that noticed it has long been answered"""
+    bundle = None
+    try:
+        bundle = build_bundle(language, previous)
+        save_bundle(bundle)
+        with _bundles_lock:
+            _bundles[language] = bundle
+            _outdated.discard(language)
+        print(f"Compiled '{language}' UI bundle in the background ({len(bundle['missing'])} labels missing)")
+    except Exception as e:
+        print(f"Could not compile the '{language}' UI bundle: {e}")
+    finally:
+        with _bundles_lock:
+            _compiling.pop(language, None)
+            if bundle is None or bundle['missing']:
+                _retry_at[language] = time.monotonic() + settings.UI_BUNDLE_RETRY_SECONDS
+
+def _schedule_compile(language: str) -> None:
+    with _bundles_lock:
+        if language in _compiling or time.monotonic() < _retry_at.get(language, 0):
+            return
+        thread = threading.Thread(target=_compile, args=(language, _bundles.get(language)),
+                                  name=f'ui-bundle-{language}', daemon=True)
+        _compiling[language] = thread
+    thread.start()
+
+def _load(language: str) -> Dict:
+    """The bundle file if it's current; otherwise something to serve until the compile is done"""
+    if language == 'en':
+        return build_bundle('en')  # English needs no translating, it's rebuilt for free
+    bundle = load_bundle_file(language)
+    if bundle is not None and bundle.get('source_version') == source_version(language):
+        bundle.setdefault('missing', [])
+        return bundle
+    print(f"UI bundle for '{language}' missing or out of date, compiling it in the background")
+    if bundle is not None:
+        _outdated.add(language)  # Old labels beat English ones while we wait
+        bundle.setdefault('missing', [])
+        return bundle
+    return build_bundle(language, translate=False)  # Hand-written labels only
+
+def get_bundle(language: str) -> Optional[Dict]:
+    """
+    The compiled bundle for a supported language (None otherwise). Kept in memory after the
+    first read. Never translates: a missing, out-of-date or incomplete bundle is compiled in
+    the background and served as it is until then.
+    """
+    if language not in get_supported_languages():
+        return None
+    bundle = _bundles.get(language)
+    if bundle is None:
+        with _bundles_lock:
+            lock = _language_locks.setdefault(language, threading.Lock())
+        with lock:
+            bundle = _bundles.get(language)
+            if bundle is None:
+                bundle = _load(language)
+                with _bundles_lock:
+                    _bundles[language] = bundle
+    if bundle['missing'] or language in _outdated:
+        _schedule_compile(language)
+    return bundle
+
+def get_bundle_version(language: str) -> Optional[str]:
+    bundle = get_bundle(language)
+    return bundle['version'] if bundle else None
+
+if __name__ == '__main__':
+    compile_bundles()
@@ -0,0 +1,117 @@
+import sys
+import os
+import datetime
+import itertools
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db_connection import db
+from typing import Dict, Optional
+
+# One small summary document per user, kept up to date as diagnoses are saved,
+# so the profile screen never has to read the whole history.
+STATS_COLLECTION = 'user_stats'
+
+def get_season(when: datetime.datetime) -> str:
+    """
+    The Indian cropping season a date falls in:
+    Kharif (June-October), Rabi (November-February), Zaid (March-May).
+    Rabi crosses New Year, so it's named after both years: 'rabi_2024-25'.
+    """
+    month, year = when.month, when.year
+    if 6 <= month <= 10:
+        return f'kharif_{year}'
+    if month >= 11:
+        return f'rabi_{year}-{str(year + 1)[-2:]}'
+    if month <= 2:
+        return f'rabi_{year - 1}-{str(year)[-2:]}'
+    return f'zaid_{year}'
+
+def _field_key(name) -> str:
+    """Crop/disease names become field names, which can't contain '.' or start with '$'"""
+    key = str(name or 'unknown').replace('.', '_').lstrip('$')
+    return key or 'unknown'
+
+def _stat_increments(diagnosis: Dict) -> Dict:
+    """Every counter one diagnosis adds to, as dotted paths"""
+    crop = _field_key(diagnosis.get('crop'))
+    disease = _field_key(diagnosis.get('disease'))
+    stage = _field_key(diagnosis.get('stage'))
+    season = get_season(diagnosis.get('created_at') or datetime.datetime.utcnow())
+    return {
+        'total': 1,
+        'severity_sum': float(diagnosis.get('severity_percent') or 0),
+        f'by_crop.{crop}': 1,
+        f'by_disease.{disease}': 1,
+        f'by_stage.{stage}': 1,
+        f'seasons.{season}.total': 1,
+        f'seasons.{season}.by_crop.{crop}': 1,
+        f'seasons.{season}.by_disease.{disease}': 1
+    }
+
+def record_user_diagnosis(diagnosis: Dict) -> None:
+    """Add one saved diagnosis to its owner's stats (a single upsert, no reads)"""
+    user_id = diagnosis.get('user_id')
+    if not user_id:
+        return
+    db.execute_increment(
+        STATS_COLLECTION,
+        {'user_id': user_id},
+        _stat_increments(diagnosis),
+        set_fields={'last_diagnosis_at': diagnosis.get('created_at') or datetime.datetime.utcnow()}
+    )
+
+def get_user_stats(user_id: str, season: str = None) -> Dict:
+    """
+    The user's summary, ready to show: totals, counts by crop/disease/stage,
+    average severity, last diagnosis time and this season's numbers.
+    """
+    rows = db.execute_query(collection=STATS_COLLECTION, mongo_query={'user_id': user_id}, limit=1)
+    stats = rows[0] if rows else {}
+    total = stats.get('total', 0)
+    season = season or get_season(datetime.datetime.utcnow())
+    this_season = stats.get('seasons', {}).get(season, {})
+    return {
+        'total_diagnoses': total,
+        'by_crop': stats.get('by_crop', {}),
+        'by_disease': stats.get('by_disease', {}),
+        'by_stage': stats.get('by_stage', {}),
+        'average_severity': round(stats.get('severity_sum', 0) / total, 1) if total else 0,
+        'last_diagnosis_at': stats.get('last_diagnosis_at'),
+        'season': {
+            'name': season,
+            'total_diagnoses': this_season.get('total', 0),
+            'by_crop': this_season.get('by_crop', {}),
+            'by_disease': this_season.get('by_disease', {})
+        }
+    }
+
+def rebuild_user_stats(user_id: Optional[str] = None) -> int:
+    """
+    Recompute stats from diagnosis_history and the archived months (one user, or everyone when
+    user_id is None). For existing data, or if the numbers ever drift. Returns how many users were rebuilt.
+    """
+    from services.archive_service import iter_archived_history
+
+    query = {'user_id': user_id} if user_id else {}
+    totals = {}
+    latest = {}
+    for diagnosis in itertools.chain(db.iterate_query('diagnosis_history', query), iter_archived_history()):
+        owner = diagnosis.get('user_id')
+        if not owner or (user_id and owner != user_id):
+            continue
+        counters = totals.setdefault(owner, {})
+        for path, amount in _stat_increments(diagnosis).items():
+            counters[path] = counters.get(path, 0) + amount
+        created_at = diagnosis.get('created_at')
+        if created_at and (owner not in latest or created_at > latest[owner]):
+            latest[owner] = created_at
+
+    db.execute_delete(collection=STATS_COLLECTION, mongo_query=query)
+    for owner, counters in totals.items():
+        db.execute_increment(STATS_COLLECTION, {'user_id': owner}, counters,
+                             set_fields={'last_diagnosis_at': latest.get(owner)})
+    print(f"User stats rebuilt for {len(totals)} users")
+    return len(totals)
+
+if __name__ == '__main__':
+    rebuild_user_stats()
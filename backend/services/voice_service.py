@@ -1,105 +1,300 @@
-from gtts import gTTS
 import os
+import re
 import hashlib
 import threading
-from typing import Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
 from config.settings import settings
+from utils import mp3
+from services import tts_backends
+from services.voice_store import get_voice_store
 
-def generate_voice(text: str, language: str = 'en', slow: bool = False) -> Optional[str]:
-    """
-    Turn text into an MP3 audio file using Google Text-to-Speech (gTTS).
-    We save these files so the app can play them for farmers who prefer listening.
-    """
+# Making the audio takes a few seconds (gTTS is a web call), so it never happens inside a request.
+# The request works out the file name (a hash of the text, so the same message always gets the
+# same file), queues the job and answers straight away; a few worker threads make the files and
+# /api/diagnosis/voice/<filename> says "202, try again shortly" until the file is there.
+#
+# Diagnosis messages are a template filled with a crop, a disease, two numbers and a stage, so
+# they're spoken in pieces ("segments"): each piece is made once per language and kept in
+# VOICE_SEGMENT_FOLDER, and a message is those MP3s joined together. After a while every piece
+# is already there and a new message costs no gTTS call at all.
+#
+# Finished messages are kept in the voice store (voice_store.py: sharded folders, an index,
+# a size limit); the segments stay in their own folder, there's only so many of them.
+
+VOICE_FILENAME = re.compile(r'^voice_[0-9a-f]{32}\.mp3$')
+
+# Map our app's language codes to what Google understands
+GTTS_LANGUAGES = {
+    'en': 'en',
+    'hi': 'hi',
+    'te': 'te',
+    'ta': 'ta',
+    'kn': 'kn',
+    'mr': 'mr'
+}
+
+def _audio_key(key: str) -> str:
+    """Hash naming a piece of audio; a TTS backend other than gTTS gets names of its own"""
+    backend = tts_backends.get_tts_backend().name
+    if backend != 'gtts':
+        key = f"{key}_{backend}"
+    return hashlib.md5(key.encode()).hexdigest()
+
+def voice_filename(text: str, language: str) -> str:
+    """Same text and language, same file name (so we don't generate the same audio twice - saves time!)"""
+    return f"voice_{_audio_key(f'{text}_{language}')}.mp3"
+
+def _write_file(filepath: str, write) -> None:
+    """Write next to the real name and rename, so nobody is ever served half a file"""
+    temp_path = f'{filepath}.{threading.get_ident()}.tmp'
     try:
-        # Create the folder if it doesn't exist
-        os.makedirs(settings.VOICE_OUTPUT_FOLDER, exist_ok=True)
-        
-        # Create a unique filename based on the text 
-        # (so we don't generate the same audio twice - saves time!)
-        text_hash = hashlib.md5(f"{text}_{language}".encode()).hexdigest()
-        filename = f"voice_{text_hash}.mp3"
-        filepath = os.path.join(settings.VOICE_OUTPUT_FOLDER, filename)
-        
-        # If we already made this audio before, just return it
-        if os.path.exists(filepath):
-            return filepath
-        
-        # Map our app's language codes to what Google understands
-        lang_map = {
-            'en': 'en',
-            'hi': 'hi',
-            'te': 'te',
-            'ta': 'ta',
-            'kn': 'kn',
-            'mr': 'mr'
-        }
-        
-        gtts_lang = lang_map.get(language, 'en')
-        
-        # Generate the audio with a timeout so it doesn't block the response
-        result_holder = [None]
-        error_holder = [None]
-
-        def _generate():
+        write(temp_path)
+        os.replace(temp_path, filepath)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def synthesize_voice(text: str, language: str, filepath: str, slow: bool = False) -> None:
+    """Turn text into an MP3 file with the TTS_SERVICE backend (gTTS by default). Raises if it fails."""
+    lang = GTTS_LANGUAGES.get(language, 'en')
+    _write_file(filepath, lambda path: tts_backends.synthesize(text, lang, path, slow))
+
+_segment_lock = threading.Lock()
+segment_hits = 0
+segment_misses = 0
+
+def speakable_segments(segments: List[str]) -> List[str]:
+    """Pieces with nothing to say (an empty stage, a lone full stop) are left out"""
+    return [segment.strip() for segment in segments if any(c.isalnum() for c in segment)]
+
+def segment_path(text: str, language: str, slow: bool = False) -> str:
+    key = _audio_key(f"{text}_{language}_{slow}")
+    return os.path.join(settings.VOICE_SEGMENT_FOLDER, language, f"{key}.mp3")
+
+def segments_ready(segments: List[str], language: str, slow: bool = False) -> bool:
+    return all(os.path.exists(segment_path(segment, language, slow)) for segment in segments)
+
+def segment_audio(text: str, language: str, slow: bool = False) -> str:
+    """Path of the MP3 for one piece of a message, made the first time it's needed"""
+    global segment_hits, segment_misses
+    filepath = segment_path(text, language, slow)
+    if os.path.exists(filepath):
+        with _segment_lock:
+            segment_hits += 1
+        return filepath
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    synthesize_voice(text, language, filepath, slow)
+    with _segment_lock:
+        segment_misses += 1
+    return filepath
+
+def render_voice(segments: List[str], language: str, filepath: str, slow: bool = False) -> None:
+    """Make the MP3 of a message: one piece is spoken as it is, more are joined from the segment cache"""
+    if len(segments) == 1:
+        synthesize_voice(segments[0], language, filepath, slow)  # Free text, nothing to reuse
+        return
+    clips = []
+    for segment in segments:
+        with open(segment_audio(segment, language, slow), 'rb') as f:
+            clips.append(f.read())
+    audio = mp3.join(clips)
+    if not audio:
+        raise ValueError('Voice segments contained no audio')
+
+    def write(path):
+        with open(path, 'wb') as f:
+            f.write(audio)
+    _write_file(filepath, write)
+
+def build_voice_file(filename: str, segments: List[str], language: str, slow: bool = False) -> str:
+    """Make a message's MP3 and put it in the voice store; returns where it ended up"""
+    os.makedirs(settings.VOICE_OUTPUT_FOLDER, exist_ok=True)
+    part_path = os.path.join(settings.VOICE_OUTPUT_FOLDER, f'{filename}.{threading.get_ident()}.part')
+    try:
+        render_voice(segments, language, part_path, slow)
+        return get_voice_store().add(filename, part_path)
+    finally:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+
+class VoiceJobQueue:
+    """A few worker threads making voice files; remembers which files are on their way"""
+
+    max_failed = 256  # Failures remembered for voice_status; the oldest are forgotten
+
+    def __init__(self, workers: int, max_queued: int):
+        self.max_queued = max_queued
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='voice')
+        self._lock = threading.Lock()
+        self._jobs = {}  # filename -> 'queued' / 'running'; only live jobs, so len() is the queue length
+        self._failed = OrderedDict()  # filename -> None, oldest first
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.assembled = 0  # Made on the spot from segments we already had
+
+    def _run(self, filename: str, segments: List[str], language: str, slow: bool) -> None:
+        with self._lock:
+            self._jobs[filename] = 'running'
+        try:
+            build_voice_file(filename, segments, language, slow)
+            with self._lock:
+                self._jobs.pop(filename, None)  # The store says it's done now
+                self.completed += 1
+        except Exception as e:
+            print(f"Error generating voice: {e}")
+            with self._lock:
+                self._jobs.pop(filename, None)
+                self._failed[filename] = None
+                self._failed.move_to_end(filename)
+                while len(self._failed) > self.max_failed:
+                    self._failed.popitem(last=False)
+                self.failed += 1
+
+    def submit(self, segments: List[str], language: str, slow: bool = False) -> Optional[str]:
+        """Queue the audio for a message (unless it exists or is on its way); returns its file name"""
+        filename = voice_filename(' '.join(segments), language)
+        if get_voice_store().contains(filename):
+            return filename
+        if len(segments) > 1 and segments_ready(segments, language, slow):
+            # Every piece is already spoken (see voice_warmup.py): joining them takes milliseconds
             try:
-                tts = gTTS(text=text, lang=gtts_lang, slow=slow)
-                tts.save(filepath)
-                result_holder[0] = filepath
-            except Exception as ex:
-                error_holder[0] = ex
+                build_voice_file(filename, segments, language, slow)
+                with self._lock:
+                    self.assembled += 1
+                return filename
+            except Exception as e:
+                print(f"Could not join voice segments, queueing it instead: {e}")
+        with self._lock:
+            if filename in self._jobs:
+                return filename
+            if len(self._jobs) >= self.max_queued:
+                # Too much waiting already: this answer goes without audio rather than piling up
+                self.rejected += 1
+                print("Warning: voice queue is full, skipping voice generation.")
+                return None
+            self._failed.pop(filename, None)  # A failed one gets another try
+            self._jobs[filename] = 'queued'
+        self._pool.submit(self._run, filename, segments, language, slow)
+        return filename
+
+    def status(self, filename: str) -> Optional[str]:
+        """'ready', 'pending', 'failed' or None (never heard of it)"""
+        if get_voice_store().contains(filename):
+            return 'ready'
+        with self._lock:
+            if filename in self._jobs:
+                return 'pending'
+            return 'failed' if filename in self._failed else None
 
-        thread = threading.Thread(target=_generate)
-        thread.daemon = True
-        thread.start()
-        thread.join(timeout=8)  # Wait at most 8 seconds for gTTS
+    def stats(self) -> Dict:
+        with self._lock:
+            states = list(self._jobs.values())
+        return {
+            'queued': states.count('queued'),
+            'running': states.count('running'),
+            'completed': self.completed,
+            'failed': self.failed,
+            'rejected': self.rejected,
+            'assembled': self.assembled,
+            'segments': {
+                'hits': segment_hits,
+                'misses': segment_misses,
+                'hit_ratio': round(segment_hits / (segment_hits + segment_misses), 3) if segment_hits + segment_misses else None,
+            },
+        }
 
-        if thread.is_alive():
-            # gTTS took too long — skip voice to avoid blocking the response
-            print("Warning: gTTS timed out after 8s, skipping voice generation.")
-            return None
 
-        if error_holder[0]:
-            print(f"Error generating voice: {error_holder[0]}")
-            return None
+_jobs = None
+_jobs_lock = threading.Lock()
 
-        return result_holder[0]
+def get_voice_jobs() -> VoiceJobQueue:
+    """The shared voice queue (its threads start on first use)"""
+    global _jobs
+    if _jobs is None:
+        with _jobs_lock:
+            if _jobs is None:
+                _jobs = VoiceJobQueue(settings.VOICE_WORKERS, settings.VOICE_MAX_QUEUED)
+    return _jobs
 
+def generate_segmented_voice(segments: List[str], language: str = 'en', slow: bool = False) -> Optional[str]:
+    """
+    Queue an MP3 of the message made of `segments` for farmers who prefer listening.
+    Returns the path the file will have (it may not be there yet), or None if it can't be made.
+    """
+    segments = speakable_segments(segments)
+    if not segments:
+        return None
+    try:
+        filename = get_voice_jobs().submit(segments, language, slow)
+        return get_voice_store().path_for(filename) if filename else None
     except Exception as e:
         print(f"Error generating voice: {e}")
         return None
 
-def generate_diagnosis_voice(diagnosis_result: dict, language: str = 'en') -> Optional[str]:
-    """
-    Create a spoken summary of the diagnosis.
-    "Good news! Your plant is healthy." or "Disease detected: Early Blight."
-    """
-    
+def generate_voice(text: str, language: str = 'en', slow: bool = False) -> Optional[str]:
+    """Queue an MP3 of `text`, spoken in one go (see generate_segmented_voice)"""
+    return generate_segmented_voice([text or ''], language, slow)
+
+def voice_status(filename: str) -> Optional[str]:
+    """Where a voice file is at: 'ready', 'pending', 'failed' or None (unknown / not a voice file)"""
+    if not VOICE_FILENAME.match(filename or ''):
+        return None
+    return get_voice_jobs().status(filename)
+
+def voice_file_path(filename: str) -> Optional[str]:
+    """Where a finished voice file is on disk (None if it isn't finished or isn't a voice file)"""
+    if not VOICE_FILENAME.match(filename or ''):
+        return None
+    return get_voice_store().lookup(filename)
+
+def get_voice_stats() -> Dict:
+    """How the voice queue, the segment cache, the store and the TTS backend are doing"""
+    return {
+        'jobs': get_voice_jobs().stats(),
+        'store': get_voice_store().stats(),
+        'tts': tts_backends.tts_stats(),
+    }
+
+def _whole_number(value) -> int:
+    """91.37 -> 91: nobody needs the decimals read out, and whole numbers are reusable segments"""
+    try:
+        return int(round(float(value or 0)))
+    except (TypeError, ValueError):
+        return 0
+
+def diagnosis_voice_segments(diagnosis_result: dict, language: str = 'en') -> List[str]:
+    """The diagnosis summary as the pieces it is spoken in (fixed phrases, names and numbers)"""
     crop = diagnosis_result.get('crop_local', diagnosis_result.get('crop', ''))
     disease = diagnosis_result.get('disease_local', diagnosis_result.get('disease', ''))
-    confidence = diagnosis_result.get('confidence', 0)
-    severity = diagnosis_result.get('severity_percent', 0)
+    confidence = _whole_number(diagnosis_result.get('confidence'))
+    severity = _whole_number(diagnosis_result.get('severity_percent'))
     stage = diagnosis_result.get('stage_local', diagnosis_result.get('stage', ''))
-    
+
     # English script
     if language == 'en':
         if 'Healthy' in disease:
-            message = f"Good news! Your {crop} plant is healthy. No disease detected. Confidence: {confidence} percent."
-        else:
-            message = f"Disease detected in your {crop} plant. Disease name: {disease}. Confidence: {confidence} percent. Severity: {severity} percent. Stage: {stage}."
-    else:
-        # Simple localized script (just key facts)
-        if 'Healthy' in disease:
-            message = f"{crop} {disease}। {confidence}%"
-        else:
-            message = f"{crop} {disease}। {confidence}%। {severity}%। {stage}"
-    
-    return generate_voice(message, language)
+            return ["Good news! Your", crop, "plant is healthy. No disease detected. Confidence:",
+                    f"{confidence} percent."]
+        return ["Disease detected in your", crop, "plant. Disease name:", f"{disease}.",
+                "Confidence:", f"{confidence} percent.", "Severity:", f"{severity} percent.",
+                "Stage:", f"{stage}."]
+    # Simple localized script (just key facts)
+    if 'Healthy' in disease:
+        return [crop, f"{disease}।", f"{confidence}%"]
+    return [crop, f"{disease}।", f"{confidence}%।", f"{severity}%।", stage]
 
-def generate_pesticide_voice(pesticide_info: dict, language: str = 'en') -> Optional[str]:
+def generate_diagnosis_voice(diagnosis_result: dict, language: str = 'en') -> Optional[str]:
     """
-    Read out the pesticide instructions.
-    Important for safety!
+    Create a spoken summary of the diagnosis.
+    "Good news! Your plant is healthy." or "Disease detected: Early Blight."
     """
+    return generate_segmented_voice(diagnosis_voice_segments(diagnosis_result, language), language)
+
+def pesticide_voice_message(pesticide_info: dict, language: str = 'en') -> str:
+    """The pesticide instructions as one sentence to read out"""
     name = pesticide_info.get('name', '')
     dosage = pesticide_info.get('dosage_per_acre', '')
     frequency = pesticide_info.get('frequency', '')
@@ -109,8 +304,14 @@ def generate_pesticide_voice(pesticide_info: dict, language: str = 'en') -> Opti
         message = f"Pesticide: {name}. Dosage: {dosage}. Frequency: {frequency}. Warning: {warnings}"
     else:
         message = f"{name}। {dosage}। {frequency}। {warnings}"
-    
-    return generate_voice(message, language)
+    return message
+
+def generate_pesticide_voice(pesticide_info: dict, language: str = 'en') -> Optional[str]:
+    """
+    Read out the pesticide instructions.
+    Important for safety!
+    """
+    return generate_voice(pesticide_voice_message(pesticide_info, language), language)
 
 def generate_prevention_voice(prevention_steps: str, language: str = 'en') -> Optional[str]:
     """
@@ -147,19 +348,14 @@ def generate_cost_voice(cost_info: dict, language: str = 'en') -> Optional[str]:
 
 def cleanup_old_voice_files(days: int = 7):
     """
-    Housekeeping! Delete audio files older than a week to save space.
+    Housekeeping! Delete audio files nobody has played for a week to save space.
+    (The store also keeps itself under VOICE_STORE_MAX_MB, so this is optional.)
     """
     try:
         import time
-        current_time = time.time()
-        max_age = days * 24 * 60 * 60  
-        
-        for filename in os.listdir(settings.VOICE_OUTPUT_FOLDER):
-            filepath = os.path.join(settings.VOICE_OUTPUT_FOLDER, filename)
-            if os.path.isfile(filepath):
-                file_age = current_time - os.path.getmtime(filepath)
-                if file_age > max_age:
-                    os.remove(filepath)
-                    print(f"Deleted old voice file: {filename}")
+        removed = get_voice_store().remove_unused_since(time.time() - days * 24 * 60 * 60)
+        print(f"Deleted {removed} old voice files")
+        return removed
     except Exception as e:
         print(f"Error cleaning up voice files: {e}")
+        return 0
@@ -0,0 +1,184 @@
+import sys
+import os
+import time
+import hashlib
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.settings import settings
+from typing import Dict, Optional
+
+# Where the finished voice files live. One flat folder grows forever and gets slow to look
+# through, so files are spread over hashed subfolders and a small SQLite index remembers
+# every file's size and when it was last played:
+#
+#   voice_outputs/3f/a2/voice_<md5>.mp3      index: {name, size, last_access}
+#
+# "Is it there?" is answered from the index, never from the folder. When the total size
+# passes VOICE_STORE_MAX_MB the files played longest ago are deleted first.
+#
+# Files from before the index sit in the top folder and are simply made again when asked for;
+# run this file once after upgrading to move them into the store instead.
+
+COLLECTION = 'voice_assets'
+
+class VoiceStore:
+    def __init__(self, folder: str, index, max_bytes: int, touch_interval: float = 60):
+        self.folder = folder
+        self.index = index  # A storage backend (SQLiteDatabase) holding the voice_assets collection
+        self.max_bytes = max_bytes
+        self.touch_interval = touch_interval
+        self._lock = threading.Lock()
+        self._touched = {}  # name -> when we last wrote its last_access (saves a write per play)
+        self._total = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+
+    def path_for(self, name: str) -> str:
+        digest = hashlib.md5(name.encode()).hexdigest()
+        return os.path.join(self.folder, digest[:2], digest[2:4], name)
+
+    def _find(self, name: str) -> Optional[Dict]:
+        rows = self.index.execute_query(collection=COLLECTION, mongo_query={'name': name}, limit=1)
+        return rows[0] if rows else None
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            if self._total is None:
+                self._total = sum(row.get('size', 0) for row in self.index.iterate_query(COLLECTION, {}))
+            return self._total
+
+    def contains(self, name: str) -> bool:
+        return self._find(name) is not None
+
+    def lookup(self, name: str) -> Optional[str]:
+        """Path of a stored file (and remember it was just used), None if we don't have it"""
+        row = self._find(name)
+        if row is not None and not os.path.exists(self.path_for(name)):
+            # Deleted behind our back: forget it so the next submit makes it again
+            self.remove(name)
+            row = None
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        now = time.time()
+        with self._lock:
+            self.hits += 1
+            touch = now - self._touched.get(name, row.get('last_access', 0)) >= self.touch_interval
+            if touch:
+                self._touched[name] = now
+        if touch:
+            self.index.execute_update(collection=COLLECTION, mongo_query={'name': name},
+                                      update={'last_access': now})
+        return self.path_for(name)
+
+    def add(self, name: str, source_path: str) -> str:
+        """Move a finished file into the store, then make room if we're over the limit"""
+        path = self.path_for(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(source_path, path)
+        size = os.path.getsize(path)
+        previous = self._find(name)
+        self.total_bytes()  # Counted before this file is in the index
+        now = time.time()
+        self.index.execute_bulk_upsert(COLLECTION, [{'name': name, 'size': size, 'last_access': now}], ('name',))
+        with self._lock:
+            self._touched[name] = now
+            self._total += size - (previous.get('size', 0) if previous else 0)
+            over = self._total > self.max_bytes
+        if over:
+            self.evict()
+        return path
+
+    def remove(self, name: str) -> None:
+        row = self._find(name)
+        if row is None:
+            return
+        try:
+            os.remove(self.path_for(name))
+        except FileNotFoundError:
+            pass
+        self.index.execute_delete(collection=COLLECTION, mongo_query={'name': name})
+        with self._lock:
+            self._touched.pop(name, None)
+            if self._total is not None:
+                self._total -= row.get('size', 0)
+
+    def evict(self) -> int:
+        """Delete the least recently played files until we're back under the limit"""
+        removed = 0
+        while self.total_bytes() > self.max_bytes:
+            oldest = self.index.execute_query(collection=COLLECTION, mongo_query={},
+                                              sort=[('last_access', 1)], limit=50)
+            if not oldest:
+                break
+            for row in oldest:
+                if self.total_bytes() <= self.max_bytes:
+                    break
+                self.remove(row['name'])
+                removed += 1
+                with self._lock:
+                    self.evictions += 1
+                    self.evicted_bytes += row.get('size', 0)
+        if removed:
+            print(f"Voice store: removed {removed} least recently played files")
+        return removed
+
+    def remove_unused_since(self, cutoff: float) -> int:
+        """Delete every file not played since `cutoff` (a time.time() value)"""
+        rows = self.index.execute_query(collection=COLLECTION, mongo_query={'last_access': {'$lt': cutoff}})
+        for row in rows:
+            self.remove(row['name'])
+        return len(rows)
+
+    def import_flat_files(self) -> int:
+        """Move voice files from the old flat folder into their subfolders and the index"""
+        moved = 0
+        for filename in os.listdir(self.folder):
+            path = os.path.join(self.folder, filename)
+            if filename.endswith('.mp3') and os.path.isfile(path):
+                self.add(filename, path)
+                moved += 1
+        if moved:
+            print(f"Voice store: moved {moved} existing voice files into the index")
+        return moved
+
+    def stats(self) -> Dict:
+        total = self.total_bytes()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'bytes': total,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 3) if lookups else None,
+                'evictions': self.evictions,
+                'evicted_bytes': self.evicted_bytes,
+            }
+
+
+def create_voice_store() -> VoiceStore:
+    from database.sqlite_backend import SQLiteDatabase
+    os.makedirs(settings.VOICE_OUTPUT_FOLDER, exist_ok=True)
+    return VoiceStore(settings.VOICE_OUTPUT_FOLDER, SQLiteDatabase(settings.VOICE_INDEX_PATH),
+                      settings.VOICE_STORE_MAX_MB * 1024 * 1024)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_voice_store() -> VoiceStore:
+    """The shared voice store (opened on first use)"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = create_voice_store()
+    return _store
+
+if __name__ == '__main__':
+    get_voice_store().import_flat_files()
@@ -0,0 +1,111 @@
+import sys
+import os
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'ml'))
+
+from config.settings import settings
+from services.language_service import TranslationPlan
+from services.voice_service import (GTTS_LANGUAGES, diagnosis_voice_segments, pesticide_voice_message,
+                                    segment_audio, segment_path, speakable_segments, build_voice_file,
+                                    voice_filename)
+from services.voice_store import get_voice_store
+from typing import Dict, List, Set, Tuple
+
+# Speak everything a diagnosis can say before the first farmer asks. There are only so many
+# crops, diseases, stages and languages, and confidence/severity are whole numbers 0-100, so
+# the pieces of every possible diagnosis message fit in a few thousand small segments. After
+# this job a diagnosis voice is just segments joined together, with no gTTS call in between.
+#
+#   python services/voice_warmup.py                      # everything, every language
+#   python services/voice_warmup.py --languages hi te --workers 8
+#
+# Anything already there is skipped, so it can be stopped and started again at any time.
+
+STAGES = ['Healthy Stage', 'Early Stage', 'Moderate Stage', 'Severe Stage']
+
+def diagnosis_combinations(class_names: Dict[str, List[str]] = None) -> List[Dict]:
+    """Every (crop, disease, stage) the predictor can come up with"""
+    if class_names is None:
+        from final_predictor import CLASS_NAMES
+        class_names = CLASS_NAMES
+    return [{'crop': crop, 'disease': disease, 'stage': stage}
+            for crop, diseases in class_names.items() for disease in diseases for stage in STAGES]
+
+def diagnosis_segments(language: str, combinations: List[Dict]) -> Set[str]:
+    """Every segment a diagnosis message in `language` can be made of"""
+    plan = TranslationPlan(language, wait_for_all=True)  # Names translated just like /detect does
+    results = [plan.diagnosis_result(combination) for combination in combinations]
+    plan.run()
+    segments = set()
+    for result in results:
+        for number in range(101):
+            sample = dict(result, confidence=number, severity_percent=number)
+            segments.update(speakable_segments(diagnosis_voice_segments(sample, language)))
+    return segments
+
+def pesticide_messages(language: str, combinations: List[Dict]) -> Set[str]:
+    """The instructions of every pesticide we could recommend for these diseases, in `language`"""
+    from services.pesticide_service import get_pesticides_for_disease
+    pesticides = {}
+    for crop, disease in {(c['crop'], c['disease']) for c in combinations}:
+        for pesticide in get_pesticides_for_disease(disease, crop):
+            pesticides.setdefault(pesticide['name'], pesticide)
+    plan = TranslationPlan(language, wait_for_all=True)
+    translated = [plan.pesticide_info(pesticide) for pesticide in pesticides.values()]
+    plan.run()
+    return {pesticide_voice_message(pesticide, language) for pesticide in translated}
+
+def _make(kind: str, text: str, language: str) -> None:
+    if kind == 'segment':
+        segment_audio(text, language)
+    else:
+        build_voice_file(voice_filename(text, language), [text], language)
+
+def warm_up(languages: List[str] = None, workers: int = None, pesticides: bool = True,
+            class_names: Dict[str, List[str]] = None) -> Dict:
+    """Make every missing segment (and pesticide clip); returns counts of what happened"""
+    languages = languages or list(GTTS_LANGUAGES)
+    combinations = diagnosis_combinations(class_names)
+    store = get_voice_store()
+    todo: List[Tuple[str, str, str]] = []
+    skipped = 0
+    for language in languages:
+        for segment in sorted(diagnosis_segments(language, combinations)):
+            if os.path.exists(segment_path(segment, language)):
+                skipped += 1
+            else:
+                todo.append(('segment', segment, language))
+        if pesticides:
+            for message in sorted(pesticide_messages(language, combinations)):
+                if store.contains(voice_filename(message, language)):
+                    skipped += 1
+                else:
+                    todo.append(('clip', message, language))
+    print(f"Voice warm-up: {len(todo)} to make, {skipped} already there ({', '.join(languages)})")
+
+    made, failed = 0, 0
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers or settings.VOICE_WARMUP_WORKERS) as pool:
+        futures = {pool.submit(_make, *item): item for item in todo}
+        for future in as_completed(futures):
+            try:
+                future.result()
+                made += 1
+            except Exception as e:
+                failed += 1  # Left for the next run
+                print(f"Voice warm-up: could not make {futures[future][0]} '{futures[future][1]}': {e}")
+            if (made + failed) % 100 == 0:
+                print(f"Voice warm-up: {made + failed}/{len(todo)} done")
+    print(f"Voice warm-up finished in {time.monotonic() - start:.0f}s: {made} made, {failed} failed, {skipped} skipped")
+    return {'made': made, 'failed': failed, 'skipped': skipped}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Pre-generate the voice segments of every diagnosis message')
+    parser.add_argument('--languages', nargs='+', help='Language codes (default: every voice language)')
+    parser.add_argument('--workers', type=int, help='Parallel gTTS calls (default: VOICE_WARMUP_WORKERS)')
+    parser.add_argument('--no-pesticides', action='store_true', help='Skip the pesticide instruction clips')
+    args = parser.parse_args()
+    warm_up(args.languages, args.workers, pesticides=not args.no_pesticides)
@@ -0,0 +1,116 @@
+import datetime
+import os
+import time
+import pytest
+from unittest.mock import patch
+from PIL import Image
+from database.sqlite_backend import SQLiteDatabase
+from services import archive_service, rollup_service, user_stats_service
+
+@pytest.fixture
+def store(tmp_path):
+    db = SQLiteDatabase(str(tmp_path / 'archive.sqlite3'))
+    with patch.object(archive_service, 'db', db):
+        yield db
+    db.close()
+
+@pytest.fixture
+def folders(tmp_path):
+    uploads = tmp_path / 'uploads'
+    archive = tmp_path / 'archive'
+    uploads.mkdir()
+    return str(uploads), str(archive)
+
+def make_photo(folder, name, side=1600):
+    path = os.path.join(folder, name)
+    Image.new('RGB', (side, side), (40, 160, 60)).save(path, 'PNG')
+    return path
+
+def add_diagnosis(store, user_id, created_at, image_path=None, with_month=True):
+    doc = {'user_id': user_id, 'crop': 'tomato', 'disease': 'Early blight',
+           'image_path': image_path, 'created_at': created_at}
+    if with_month:
+        doc['month'] = archive_service.month_key(created_at)
+    return store.execute_insert(collection='diagnosis_history', document=doc)
+
+def test_old_months_move_to_compressed_archive(store, folders):
+    uploads, archive = folders
+    now = datetime.datetime.utcnow()
+    old = now - datetime.timedelta(days=400)
+    photo = make_photo(uploads, 'u1_20230101_leaf.png')
+    old_id = add_diagnosis(store, 'u1', old, photo)
+    add_diagnosis(store, 'u1', old + datetime.timedelta(hours=1), with_month=False)  # Pre-partitioning record
+    recent_id = add_diagnosis(store, 'u1', now)
+    store.execute_insert(collection='pesticide_recommendations', document={'diagnosis_id': old_id, 'pesticide_name': 'Neem'})
+
+    assert archive_service.archive_old_history(max_age_days=180, archive_folder=archive) == 2
+
+    hot = store.execute_query(collection='diagnosis_history', mongo_query={})
+    assert [r['_id'] for r in hot] == [recent_id]
+    assert store.execute_query(collection='pesticide_recommendations', mongo_query={}) == []
+    assert not os.path.exists(photo)
+
+    archived = archive_service.read_archived_month(archive_service.month_key(old), archive)
+    assert len(archived) == 2
+    record = next(r for r in archived if r['_id'] == old_id)
+    with Image.open(record['image_path']) as small:
+        assert max(small.size) <= 512 and small.format == 'JPEG'
+    manifest = store.execute_query(collection='archive_manifest', mongo_query={'month': archive_service.month_key(old)})
+    assert manifest[0]['records'] == 2
+
+def test_old_months_are_found_without_reading_old_records(store, folders):
+    _, archive = folders
+    now = datetime.datetime.utcnow()
+    for days in (400, 370, 300, 0):
+        add_diagnosis(store, 'u1', now - datetime.timedelta(days=days))
+    with patch.object(store, 'iterate_query', side_effect=AssertionError('full scan')):
+        assert archive_service.archive_old_history(max_age_days=180, archive_folder=archive) == 3
+    assert len(store.execute_query(collection='diagnosis_history', mongo_query={})) == 1
+
+def test_rebuilt_totals_still_count_archived_months(store, folders):
+    _, archive = folders
+    now = datetime.datetime.utcnow()
+    for days in (400, 0):
+        doc = {'user_id': 'u1', 'crop': 'tomato', 'disease': 'Early blight', 'severity_percent': 20.0,
+               'latitude': 16.3067, 'longitude': 80.4365, 'created_at': now - datetime.timedelta(days=days)}
+        doc['month'] = archive_service.month_key(doc['created_at'])
+        store.execute_insert(collection='diagnosis_history', document=doc)
+    assert archive_service.archive_old_history(max_age_days=180, archive_folder=archive) == 1
+
+    with patch.object(archive_service.settings, 'ARCHIVE_FOLDER', archive), \
+         patch.object(rollup_service, 'db', store), patch.object(user_stats_service, 'db', store):
+        rollup_service.backfill_rollups()
+        user_stats_service.rebuild_user_stats('u1')
+        rollups = store.execute_query(collection='disease_rollups', mongo_query={})
+        assert sorted(r['day'] for r in rollups) == sorted(
+            (now - datetime.timedelta(days=days)).strftime('%Y-%m-%d') for days in (400, 0))
+        assert user_stats_service.get_user_stats('u1')['total_diagnoses'] == 2
+
+    # Nothing left to do the second time
+    assert archive_service.archive_old_history(max_age_days=180, archive_folder=archive) == 0
+
+def test_upload_folder_stays_under_limit(store, folders):
+    uploads, archive = folders
+    stale_guest = make_photo(uploads, 'anonymous_20240101_leaf.png', side=64)
+    two_days_ago = time.time() - 48 * 3600
+    os.utime(stale_guest, (two_days_ago, two_days_ago))
+    fresh_guest = make_photo(uploads, 'anonymous_20240102_leaf.png', side=64)
+
+    saved = []
+    for i in range(3):
+        path = make_photo(uploads, f'u1_2024010{i}_leaf.png', side=400)
+        os.utime(path, (two_days_ago + i, two_days_ago + i))
+        add_diagnosis(store, 'u1', datetime.datetime.utcnow(), path)
+        saved.append(path)
+    limit = os.path.getsize(saved[2]) + os.path.getsize(fresh_guest) + 1
+
+    result = archive_service.enforce_upload_limit(uploads, max_bytes=limit, temporary_max_age_hours=24,
+                                                  archive_folder=archive)
+    assert result['temporary_removed'] == 1 and result['archived'] == 2
+    assert sorted(os.listdir(uploads)) == ['anonymous_20240102_leaf.png', 'u1_20240102_leaf.png']
+    assert result['bytes'] <= limit
+
+    # Records follow their photos into the archive
+    paths = {r['image_path'] for r in store.execute_query(collection='diagnosis_history', mongo_query={})}
+    assert saved[2] in paths
+    assert all(os.path.exists(p) for p in paths)
@@ -54,3 +54,63 @@ def test_disease_prediction(client):
         
         # Ensure the AI function was actually called
         mock_prediction.assert_called_once()
+
+USER_ID = '65f000000000000000000001'
+
+class PrefixTranslator:
+    """Stands in for Google: '[te] ' in front of every text"""
+    def __init__(self, source='en', target='hi'):
+        self.target = target
+
+    def translate_batch(self, texts):
+        return [f'[{self.target}] {t}' for t in texts]
+
+@pytest.fixture
+def history(tmp_path):
+    """A throwaway diagnosis_history and a signed-in user who reads Telugu"""
+    from api import request_context
+    from api.routes import user as user_routes
+    from database.sqlite_backend import SQLiteDatabase
+    from services import language_service, translator_backends
+    from services.translation_cache import TranslationCache
+
+    store = SQLiteDatabase(str(tmp_path / 'history.sqlite3'))
+    request_context.remember_user_language(USER_ID, 'te')
+    with patch('api.routes.diagnosis.db', store), \
+         patch.object(translator_backends, 'GoogleTranslator', PrefixTranslator), \
+         patch.object(language_service, 'get_translation_cache', return_value=TranslationCache(max_entries=10)):
+        yield store, {'Authorization': f'Bearer {user_routes.generate_token(USER_ID)}'}
+    request_context.forget_user_language(USER_ID)
+    store.close()
+
+def test_details_are_served_from_the_saved_snapshot(client, history):
+    store, headers = history
+    saved = {'prediction': {'disease': 'Early blight', 'disease_local': 'ముందస్తు ఆకుమచ్చ'},
+             'disease_info': {'symptoms': 'ఆకులపై మచ్చలు'}, 'pesticide_recommendations': {}}
+    diagnosis_id = store.execute_insert(collection='diagnosis_history', document={
+        'user_id': USER_ID, 'crop': 'tomato', 'disease': 'Early blight', 'cost': None,
+        'snapshots': {'en': {'prediction': {'disease': 'Early blight'}}, 'te': saved}})
+
+    with patch('api.routes.diagnosis.build_legacy_snapshot') as legacy, \
+         patch('api.routes.diagnosis.TranslationPlan') as plan:
+        response = client.get(f'/api/diagnosis/{diagnosis_id}', headers=headers)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['prediction'] == saved['prediction'] and data['disease_info'] == saved['disease_info']
+    legacy.assert_not_called()  # Nothing rebuilt or translated: one read
+    plan.assert_not_called()
+
+def test_old_diagnosis_gets_its_snapshots_on_first_read(client, history):
+    store, headers = history
+    diagnosis_id = store.execute_insert(collection='diagnosis_history', document={
+        'user_id': USER_ID, 'crop': 'tomato', 'disease': 'Early blight', 'severity_percent': 20.0, 'cost': None})
+
+    with patch('api.routes.diagnosis.get_disease_info', return_value={'symptoms': 'Brown spots'}), \
+         patch('api.routes.diagnosis.get_severity_based_recommendations', return_value={'recommended_pesticides': []}):
+        response = client.get(f'/api/diagnosis/{diagnosis_id}', headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['disease_info']['symptoms'] == '[te] Brown spots'
+
+    snapshots = store.execute_query(collection='diagnosis_history', mongo_query={'_id': diagnosis_id})[0]['snapshots']
+    assert snapshots['en']['disease_info'] == {'symptoms': 'Brown spots'}
+    assert snapshots['te']['disease_info'] == {'symptoms': '[te] Brown spots'}
@@ -0,0 +1,73 @@
+import datetime
+import pytest
+from unittest.mock import patch
+from app import app
+from database.sqlite_backend import SQLiteDatabase
+from services import geo_service
+from utils.geo import haversine_km, make_point
+
+# A farm near Guntur, and a few places around it
+FARM = (16.3067, 80.4365)
+NEARBY = (16.35, 80.45)       # ~5 km away
+TOWN = (16.5062, 80.6480)     # Vijayawada, ~31 km away
+FAR_AWAY = (17.3850, 78.4867)  # Hyderabad, ~230 km away
+
+@pytest.fixture
+def store(tmp_path):
+    db = SQLiteDatabase(str(tmp_path / 'geo.sqlite3'))
+    with patch.object(geo_service, 'db', db):
+        yield db
+    db.close()
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+def add_diagnosis(store, place, disease='Early blight', crop='tomato', days_ago=1, with_location=True):
+    doc = {
+        'user_id': 'u1', 'crop': crop, 'disease': disease,
+        'latitude': place[0], 'longitude': place[1],
+        'created_at': datetime.datetime.utcnow() - datetime.timedelta(days=days_ago)
+    }
+    if with_location:
+        doc['location'] = make_point(*place)
+    return store.execute_insert(collection='diagnosis_history', document=doc)
+
+def test_haversine_distance():
+    assert haversine_km(*FARM, *TOWN) == pytest.approx(31, abs=1.5)
+    assert make_point(FARM[0], FARM[1]) == {'type': 'Point', 'coordinates': [FARM[1], FARM[0]]}
+    assert make_point(None, 80.0) is None
+
+def test_nearby_counts_recent_detections_in_radius(store, client):
+    add_diagnosis(store, NEARBY)
+    add_diagnosis(store, NEARBY)
+    add_diagnosis(store, TOWN, disease='Late blight')
+    add_diagnosis(store, NEARBY, disease='Healthy')
+    add_diagnosis(store, NEARBY, days_ago=40)   # Too old
+    add_diagnosis(store, FAR_AWAY)              # Too far
+
+    response = client.get(f'/api/diagnosis/nearby?latitude={FARM[0]}&longitude={FARM[1]}&radius_km=50&days=14')
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['outbreaks'][0] == {'crop': 'tomato', 'disease': 'Early blight', 'count': 2, 'nearest_km': pytest.approx(5, abs=1)}
+    assert [o['disease'] for o in data['outbreaks']] == ['Early blight', 'Late blight']
+    assert data['total_detections'] == 3
+
+    small = client.get(f'/api/diagnosis/nearby?latitude={FARM[0]}&longitude={FARM[1]}&radius_km=10').get_json()
+    assert [o['disease'] for o in small['outbreaks']] == ['Early blight']
+
+def test_nearby_requires_coordinates(client):
+    assert client.get('/api/diagnosis/nearby?latitude=16.3').status_code == 400
+    assert client.get('/api/diagnosis/nearby?latitude=120&longitude=80').status_code == 400
+
+def test_backfill_adds_location_to_old_records(store):
+    add_diagnosis(store, NEARBY, with_location=False)
+    store.execute_insert(collection='diagnosis_history', document={
+        'user_id': 'u1', 'crop': 'rice', 'disease': 'Blast', 'latitude': None, 'longitude': None,
+        'created_at': datetime.datetime.utcnow()
+    })
+    assert geo_service.backfill_locations(batch_size=1) == 1
+    assert geo_service.backfill_locations() == 0
+    assert len(geo_service.get_nearby_outbreaks(*FARM, radius_km=10)) == 1
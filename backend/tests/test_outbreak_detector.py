@@ -0,0 +1,82 @@
+import datetime
+import pytest
+from unittest.mock import patch
+from app import app
+from services import outbreak_detector
+from services.outbreak_detector import OutbreakDetector, RingCounter
+from utils import geohash
+
+GUNTUR = (16.3067, 80.4365)
+HYDERABAD = (17.3850, 78.4867)
+NOW = datetime.datetime(2024, 6, 20, 12, 0)
+
+def diagnosis(place, when, disease='Early blight'):
+    return {'crop': 'tomato', 'disease': disease, 'latitude': place[0], 'longitude': place[1], 'created_at': when}
+
+def make_detector(**overrides):
+    options = dict(bucket_minutes=60, window_buckets=2, baseline_buckets=10, max_keys=100,
+                   max_alerts=10, min_count=3, spike_ratio=3.0, precision=4)
+    options.update(overrides)
+    return OutbreakDetector(**options)
+
+def test_ring_keeps_window_and_baseline_sums():
+    ring = RingCounter(size=5, bucket=100)
+    for bucket, amount in [(100, 1), (101, 2), (102, 3), (103, 4)]:
+        ring.add(bucket, window=2, amount=amount)
+    assert (ring.window_sum, ring.baseline_sum) == (7, 3)
+    ring.add(101, window=2)                      # Late arrival goes to the baseline
+    assert (ring.window_sum, ring.baseline_sum) == (7, 4)
+    ring.advance(106, window=2)                  # Buckets 100-101 fall off the end
+    assert (ring.window_sum, ring.baseline_sum) == (0, 7)
+    assert sum(ring.counts) == 7
+    ring.advance(200, window=2)
+    assert (ring.window_sum, ring.baseline_sum) == (0, 0)
+
+def test_spike_raises_one_alert():
+    detector = make_detector()
+    # A quiet week: one case every other hour
+    for hour in range(0, 10, 2):
+        assert detector.observe(diagnosis(GUNTUR, NOW - datetime.timedelta(hours=12 - hour))) is None
+    alerts = [detector.observe(diagnosis(GUNTUR, NOW + datetime.timedelta(minutes=m))) for m in range(6)]
+    raised = [a for a in alerts if a]
+    assert len(raised) == 1
+    assert raised[0]['crop'] == 'tomato' and raised[0]['disease'] == 'Early blight'
+    assert raised[0]['recent_count'] >= 3
+    assert detector.get_alerts(region_prefix=raised[0]['region'][:2]) == raised
+    assert detector.get_alerts(region_prefix='zz') == []
+
+def test_healthy_and_unlocated_results_are_ignored():
+    detector = make_detector(min_count=1, spike_ratio=0.1)
+    assert detector.observe(diagnosis(GUNTUR, NOW, disease='Healthy')) is None
+    assert detector.observe(dict(diagnosis(GUNTUR, NOW), latitude=None)) is None
+    assert detector.stats()['tracked_keys'] == 0
+
+def test_memory_is_bounded():
+    detector = make_detector(max_keys=3, min_count=1000)
+    diseases = ['A', 'B', 'C', 'D', 'E']
+    for disease in diseases:
+        detector.observe(diagnosis(GUNTUR, NOW, disease=disease))
+    assert detector.stats()['tracked_keys'] == 3
+    assert [key[2] for key in detector._rings] == ['C', 'D', 'E']
+
+def test_priming_from_rollups_sets_a_baseline():
+    cell = geohash.encode(*GUNTUR, 5)
+    rollups = [{'cell': cell, 'crop': 'tomato', 'disease': 'Early blight', 'day': day, 'count': 40}
+               for day in ('2024-06-17', '2024-06-18', '2024-06-19')]
+    primed = make_detector(bucket_minutes=360, window_buckets=4, baseline_buckets=28)
+    with patch.object(outbreak_detector.datetime, 'datetime', wraps=datetime.datetime) as fake_datetime:
+        fake_datetime.utcnow.return_value = NOW
+        primed.prime(rollups)
+    # 5 cases is normal for a region that usually sees ~40 a day
+    assert all(primed.observe(diagnosis(GUNTUR, NOW)) is None for _ in range(5))
+
+def test_alerts_endpoint():
+    app.config['TESTING'] = True
+    detector = make_detector(min_count=1, spike_ratio=1.0)
+    detector.observe(diagnosis(HYDERABAD, datetime.datetime.utcnow()))
+    with patch.object(outbreak_detector, 'detector', detector), app.test_client() as client:
+        data = client.get('/api/analytics/alerts?hours=1').get_json()
+        assert len(data['alerts']) == 1
+        assert data['alerts'][0]['region'].startswith('t')
+        assert data['detector']['tracked_keys'] == 1
+        assert client.get('/api/analytics/alerts?geohash=!!').status_code == 400
@@ -0,0 +1,84 @@
+import json
+import os
+import pytest
+from unittest.mock import patch
+
+from services import pesticide_service
+
+SEED_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'database', 'seed', 'pesticides.json'
+)
+
+@pytest.fixture
+def catalog_db():
+    """Serve the seed pesticides from a fake database and count how often it is asked"""
+    with open(SEED_FILE, 'r', encoding='utf-8') as f:
+        rows = json.load(f)
+    with patch.object(pesticide_service, 'db') as mock_db:
+        mock_db.execute_query.return_value = rows
+        pesticide_service.refresh_pesticide_catalog()
+        mock_db.execute_query.reset_mock()
+        yield mock_db
+    pesticide_service._catalog = None
+
+def test_lookup_matches_like_the_old_regex(catalog_db):
+    """'Leaf Blight' should also find pesticides listing 'Bacterial leaf blight' etc."""
+    names = [p['name'] for p in pesticide_service.get_pesticides_for_disease('Leaf Blight', 'grape')]
+    assert 'Copper Oxychloride' in names
+    assert 'Mancozeb' in names        # Bacterial leaf blight
+    assert 'Carbendazim' in names     # Leaf Blight (Grape)
+    assert 'Neem Oil' not in names
+
+def test_separators_and_case_are_ignored(catalog_db):
+    a = pesticide_service.get_pesticides_for_disease('Common_Rust', 'maize')
+    b = pesticide_service.get_pesticides_for_disease('common rust', 'maize')
+    assert [p['name'] for p in a] == [p['name'] for p in b]
+    assert 'Neem Oil' in [p['name'] for p in a]
+
+def test_unknown_names_are_not_remembered(catalog_db):
+    size = len(pesticide_service._disease_index)
+    for i in range(50):
+        assert pesticide_service.get_pesticides_for_disease(f'made up disease {i}', 'tomato') == []
+    pesticide_service.get_pesticides_for_disease('blight', 'tomato')  # Part of a real name: kept
+    assert len(pesticide_service._disease_index) == size + 1
+
+def test_ranked_variants(catalog_db):
+    organic_first = pesticide_service.get_pesticides_for_disease('Early blight', 'tomato', prefer_organic=True)
+    flags = [p['is_organic'] for p in organic_first]
+    assert flags == sorted(flags, reverse=True)
+
+    organic = pesticide_service.get_organic_alternatives('Early blight', 'tomato')
+    assert organic and all(p['is_organic'] for p in organic)
+
+    approved = pesticide_service.get_government_approved_pesticides('Early blight', 'tomato')
+    assert approved and all(p['is_government_approved'] for p in approved)
+
+def test_recommendations_do_not_touch_the_database(catalog_db):
+    for severity in (2, 15, 40, 80):
+        result = pesticide_service.get_severity_based_recommendations('Late blight', severity, 'potato')
+        assert result['recommended_pesticides']
+    catalog_db.execute_query.assert_not_called()
+
+def test_callers_get_copies(catalog_db):
+    first = pesticide_service.get_pesticides_for_disease('Late blight', 'potato')
+    first[0]['name'] = 'changed'
+    again = pesticide_service.get_pesticides_for_disease('Late blight', 'potato')
+    assert again[0]['name'] != 'changed'
+
+def test_incompatibility_graph_is_two_way(catalog_db):
+    assert not pesticide_service.are_pesticides_compatible('Copper Oxychloride', 'Bordeaux Mixture')
+    assert not pesticide_service.are_pesticides_compatible('bordeaux mixture', 'copper oxychloride')
+    assert pesticide_service.are_pesticides_compatible('Mancozeb', 'Neem Oil')
+
+def test_spray_plan_check(catalog_db):
+    plan = ['Copper Oxychloride', 'Mancozeb', 'Lime sulfur', 'Neem Oil']
+    result = pesticide_service.check_pesticide_compatibility(plan)
+    assert not result['is_compatible']
+    pairs = {(c['pesticide1'], c['pesticide2']) for c in result['incompatibilities']}
+    assert pairs == {('Copper Oxychloride', 'Lime sulfur')}
+    catalog_db.execute_query.assert_not_called()
+
+def test_recommendations_carry_compatibility(catalog_db):
+    result = pesticide_service.get_severity_based_recommendations('Late blight', 40, 'tomato')
+    assert 'is_compatible' in result['compatibility']
@@ -0,0 +1,62 @@
+import pytest
+from unittest.mock import patch
+from app import app
+from api import request_context
+from api.routes import user as user_routes
+
+USER_ID = '65a1b2c3d4e5f6a7b8c9d0e1'
+
+@pytest.fixture
+def users_db():
+    """A fake 'users' collection that counts how often it is read"""
+    with patch.object(request_context, 'db') as mock_db:
+        mock_db.execute_query.return_value = [{'_id': USER_ID, 'preferred_language': 'hi'}]
+        request_context.forget_user_language(USER_ID)
+        yield mock_db
+    request_context.forget_user_language(USER_ID)
+
+def auth_headers():
+    return {'Authorization': f'Bearer {user_routes.generate_token(USER_ID)}'}
+
+def test_token_is_checked_once_per_request(users_db):
+    with app.test_request_context(headers=auth_headers()):
+        with patch.object(user_routes, 'verify_token', wraps=user_routes.verify_token) as spy:
+            first = request_context.get_user_context()
+            second = request_context.get_user_context()
+        assert first is second
+        assert first['valid'] and first['user_id'] == USER_ID
+        assert spy.call_count == 1
+
+def test_language_is_cached_across_requests(users_db):
+    for _ in range(3):
+        with app.test_request_context(headers=auth_headers()):
+            assert request_context.get_user_language() == 'hi'
+    assert users_db.execute_query.call_count == 1
+
+def test_language_update_replaces_cached_value(users_db):
+    with app.test_request_context(headers=auth_headers()):
+        assert request_context.get_user_language() == 'hi'
+    request_context.remember_user_language(USER_ID, 'te')
+    with app.test_request_context(headers=auth_headers()):
+        assert request_context.get_user_language() == 'te'
+    assert users_db.execute_query.call_count == 1
+
+def test_guests_get_the_default(users_db):
+    with app.test_request_context():
+        context = request_context.get_user_context()
+        assert not context['valid']
+        assert context['error'] == 'No token provided'
+        assert request_context.get_user_language() == 'en'
+    users_db.execute_query.assert_not_called()
+
+def test_failed_lookups_are_not_remembered(users_db):
+    users_db.execute_query.side_effect = ConnectionError('database down')
+    assert request_context.get_cached_user_language(USER_ID) == 'en'
+    users_db.execute_query.side_effect = None
+    users_db.execute_query.return_value = []  # Not there (yet)
+    assert request_context.get_cached_user_language(USER_ID) == 'en'
+
+    users_db.execute_query.return_value = [{'_id': USER_ID, 'preferred_language': 'hi'}]
+    assert request_context.get_cached_user_language(USER_ID) == 'hi'  # Recovered: asked again
+    assert request_context.get_cached_user_language(USER_ID) == 'hi'
+    assert users_db.execute_query.call_count == 3
@@ -0,0 +1,84 @@
+import datetime
+import pytest
+from unittest.mock import patch
+from app import app
+from database.sqlite_backend import SQLiteDatabase
+from services import rollup_service
+from utils import geohash
+
+GUNTUR = (16.3067, 80.4365)
+NEARBY_VILLAGE = (16.2400, 80.2500)  # Same district-sized cell, different 5 km cell
+HYDERABAD = (17.3850, 78.4867)
+
+@pytest.fixture
+def store(tmp_path):
+    db = SQLiteDatabase(str(tmp_path / 'rollups.sqlite3'))
+    with patch.object(rollup_service, 'db', db):
+        yield db
+    db.close()
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+def diagnosis(place, day, disease='Early blight', severity=20.0):
+    return {
+        'user_id': 'u1', 'crop': 'tomato', 'disease': disease, 'severity_percent': severity,
+        'latitude': place[0], 'longitude': place[1],
+        'created_at': datetime.datetime.strptime(day, '%Y-%m-%d') + datetime.timedelta(hours=9)
+    }
+
+def test_geohash_round_trip():
+    assert geohash.encode(57.64911, 10.40744, 11) == 'u4pruydqqvj'
+    latitude, longitude = geohash.decode(geohash.encode(*GUNTUR, 7))
+    assert latitude == pytest.approx(GUNTUR[0], abs=0.001)
+    assert longitude == pytest.approx(GUNTUR[1], abs=0.001)
+    assert geohash.encode(*GUNTUR, 4) == geohash.encode(*NEARBY_VILLAGE, 4)
+    assert geohash.encode(*GUNTUR, 5) != geohash.encode(*NEARBY_VILLAGE, 5)
+
+def test_each_diagnosis_increments_one_rollup(store):
+    for severity in (10.0, 30.0):
+        assert rollup_service.record_diagnosis(diagnosis(GUNTUR, '2024-06-10', severity=severity))
+    assert not rollup_service.record_diagnosis(dict(diagnosis(GUNTUR, '2024-06-10'), latitude=None))
+
+    rollups = store.execute_query(collection='disease_rollups', mongo_query={})
+    assert len(rollups) == 1
+    assert rollups[0]['count'] == 2 and rollups[0]['severity_sum'] == 40.0
+    assert rollups[0]['day'] == '2024-06-10'
+
+def test_prevalence_merges_cells_and_weeks(store, client):
+    rollup_service.record_diagnosis(diagnosis(GUNTUR, '2024-06-10'))          # Monday
+    rollup_service.record_diagnosis(diagnosis(NEARBY_VILLAGE, '2024-06-12', severity=40.0))
+    rollup_service.record_diagnosis(diagnosis(GUNTUR, '2024-06-18'))          # Next week
+    rollup_service.record_diagnosis(diagnosis(HYDERABAD, '2024-06-11'))
+    rollup_service.record_diagnosis(diagnosis(GUNTUR, '2024-05-01'))          # Outside range
+
+    district = geohash.encode(*GUNTUR, 4)
+    response = client.get(f'/api/analytics/prevalence?geohash={district}&precision=4&period=week'
+                          '&from=2024-06-01&to=2024-06-30')
+    assert response.status_code == 200
+    rows = response.get_json()['prevalence']
+    assert [(r['cell'], r['period_start'], r['count']) for r in rows] == [
+        (district, '2024-06-10', 2),
+        (district, '2024-06-17', 1),
+    ]
+    assert rows[0]['avg_severity'] == 30.0
+
+    daily = rollup_service.get_prevalence('', '2024-06-01', '2024-06-30', period='day')
+    assert sum(r['count'] for r in daily) == 4
+    assert len({r['cell'] for r in daily}) == 3
+
+def test_backfill_rebuilds_from_history(store):
+    for day in ('2024-06-10', '2024-06-10', '2024-06-11'):
+        store.execute_insert(collection='diagnosis_history', document=diagnosis(GUNTUR, day))
+    rollup_service.record_diagnosis(diagnosis(HYDERABAD, '2024-06-10'))  # Stale rollup, not in history
+    assert rollup_service.backfill_rollups(batch_size=2) == 2
+    counts = {r['day']: r['count'] for r in store.execute_query(collection='disease_rollups', mongo_query={})}
+    assert counts == {'2024-06-10': 2, '2024-06-11': 1}
+
+def test_prevalence_rejects_bad_input(client):
+    assert client.get('/api/analytics/prevalence?geohash=ai!').status_code == 400
+    assert client.get('/api/analytics/prevalence?from=2024-06-30&to=2024-06-01').status_code == 400
+    assert client.get('/api/analytics/prevalence?from=2020-01-01&to=2024-06-01').status_code == 400
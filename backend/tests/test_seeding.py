@@ -0,0 +1,125 @@
+import json
+import os
+import shutil
+import pytest
+from unittest.mock import patch
+from config.settings import settings
+from database import seeding
+from database.sqlite_backend import SQLiteDatabase
+from services import language_service, pesticide_service, translator_backends
+from services.translation_cache import TranslationCache
+
+@pytest.fixture
+def store(tmp_path):
+    db = SQLiteDatabase(str(tmp_path / 'seed.sqlite3'))
+    yield db
+    db.close()
+
+@pytest.fixture
+def seed_dir(tmp_path):
+    folder = tmp_path / 'seed'
+    shutil.copytree(seeding.SEED_DIR, folder, ignore=shutil.ignore_patterns('*.py'))
+    return str(folder)
+
+def count(store, collection):
+    return len(store.execute_query(collection=collection, mongo_query={}))
+
+def test_reseeding_is_idempotent(store, seed_dir):
+    first = seeding.seed_reference_data(seed_dir, storage=store)
+    assert first['changed']
+    assert first['collections']['pesticides']['inserted'] == 18
+    sizes = {c: count(store, c) for c in seeding.SEED_COLLECTIONS}
+    assert sizes['diseases'] == 25 and sizes['translations'] == 120
+
+    again = seeding.seed_reference_data(seed_dir, storage=store)
+    assert again == {'version': first['version'], 'changed': False}
+    assert {c: count(store, c) for c in seeding.SEED_COLLECTIONS} == sizes
+
+def test_changed_seed_updates_in_place_and_bumps_version(store, seed_dir):
+    first = seeding.seed_reference_data(seed_dir, storage=store)
+    path = os.path.join(seed_dir, 'pesticides.json')
+    with open(path, encoding='utf-8') as f:
+        pesticides = json.load(f)
+    pesticides[0]['cost_per_liter'] = 999
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(pesticides, f)
+
+    second = seeding.seed_reference_data(seed_dir, storage=store)
+    assert second['version'] != first['version']
+    assert second['collections']['pesticides'] == {'inserted': 0, 'updated': 1, 'unchanged': 17}
+    assert seeding.get_seed_version(store) == second['version']
+    rows = store.execute_query(collection='pesticides', mongo_query={'name': pesticides[0]['name']})
+    assert len(rows) == 1 and rows[0]['cost_per_liter'] == 999
+
+def test_pesticide_catalog_reloads_after_reseed(store, seed_dir):
+    seeding.seed_reference_data(seed_dir, storage=store)
+    with patch.object(pesticide_service, 'db', store), patch.object(settings, 'SEED_VERSION_CHECK_SECONDS', 0):
+        pesticide_service.refresh_pesticide_catalog()
+        name = pesticide_service.load_pesticide_catalog()[0]['name']
+        store.execute_update(collection='pesticides', mongo_query={'name': name}, update={'cost_per_liter': 1})
+        # Not re-seeded: the cached catalog is still served
+        assert pesticide_service.get_pesticide_by_name(name)['cost_per_liter'] != 1
+        seeding.set_meta('seed_version', 'new-version', store)
+        assert pesticide_service.get_pesticide_by_name(name)['cost_per_liter'] == 1
+    pesticide_service._catalog = None
+
+def test_migrations_run_once_in_order(store):
+    calls = []
+    migrations = [(2, 'second', lambda: calls.append(2)), (1, 'first', lambda: calls.append(1))]
+    assert seeding.run_migrations(store, migrations) == [1, 2]
+    assert seeding.run_migrations(store, migrations + [(3, 'third', lambda: calls.append(3))]) == [3]
+    assert calls == [1, 2, 3]
+    assert seeding.get_meta('schema_version', store) == 3
+
+class PrefixTranslator:
+    """Stands in for Google: marks each text with the language, counts what it was sent"""
+    sent = []
+
+    def __init__(self, source='en', target='hi'):
+        self.target = target
+
+    def translate_batch(self, texts):
+        PrefixTranslator.sent.extend(texts)
+        return [f'[{self.target}] {t}' for t in texts]
+
+def test_seed_content_is_translated_once_and_used_locally(seed_dir):
+    PrefixTranslator.sent = []
+    with patch.object(translator_backends, 'GoogleTranslator', PrefixTranslator), \
+         patch.object(language_service, 'get_translation_cache', return_value=TranslationCache(max_entries=10)):
+        added = seeding.translate_seed_content(seed_dir, languages=['hi', 'te'])
+        assert added['diseases.json'] > 0 and added['pesticides.json'] > 0
+        sent = len(PrefixTranslator.sent)
+        # Everything is stored now, so a second run has nothing to do
+        assert seeding.translate_seed_content(seed_dir, languages=['hi', 'te']) == {'diseases.json': 0, 'pesticides.json': 0}
+        assert len(PrefixTranslator.sent) == sent
+
+    with open(os.path.join(seed_dir, 'pesticides.json'), encoding='utf-8') as f:
+        pesticide = json.load(f)[0]
+    assert pesticide['i18n']['te']['warnings'] == '[te] ' + pesticide['warnings']
+
+    # At request time these are plain lookups: nothing goes to the translator
+    PrefixTranslator.sent = []
+    lookup = language_service.load_pretranslated(seed_dir)
+    with patch.object(language_service, '_pretranslated', lookup), \
+         patch.object(translator_backends, 'GoogleTranslator', PrefixTranslator):
+        translated = language_service.translate_pesticide_info(pesticide, 'hi')
+    assert translated['dosage_per_acre'] == '[hi] ' + pesticide['dosage_per_acre']
+    assert PrefixTranslator.sent == []
+
+def test_glossary_is_filled_from_seed_names(seed_dir, tmp_path):
+    path = str(tmp_path / 'glossary.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'hi': {'Late blight': 'पछेती झुलसा'}}, f)
+    PrefixTranslator.sent = []
+    with patch.object(translator_backends, 'GoogleTranslator', PrefixTranslator), \
+         patch.object(language_service, 'get_translation_cache', return_value=TranslationCache(max_entries=10)):
+        added = seeding.build_glossary(seed_dir, path, languages=['hi'])
+        assert 'Late blight' not in PrefixTranslator.sent  # Already there, kept as written
+        assert seeding.build_glossary(seed_dir, path, languages=['hi']) == {}
+
+    with open(path, encoding='utf-8') as f:
+        glossary = json.load(f)['hi']
+    terms = seeding.glossary_terms(seed_dir)
+    assert set(glossary) == set(terms) and added['hi'] == len(terms) - 1
+    assert 'Common Rust' in terms and 'Mancozeb' in terms and 'fungicide' in terms
+    assert glossary['Late blight'] == 'पछेती झुलसा' and glossary['Mancozeb'] == '[hi] Mancozeb'
@@ -0,0 +1,82 @@
+import datetime
+import pytest
+from bson.objectid import ObjectId
+from database.sqlite_backend import SQLiteDatabase
+
+@pytest.fixture
+def store(tmp_path):
+    db = SQLiteDatabase(str(tmp_path / 'test.sqlite3'))
+    yield db
+    db.close()
+
+def add_diagnosis(store, user_id, days_ago, **extra):
+    doc = {
+        'user_id': user_id, 'crop': 'tomato', 'disease': 'Early blight',
+        'severity_percent': 30.0,
+        'created_at': datetime.datetime(2024, 6, 30) - datetime.timedelta(days=days_ago)
+    }
+    doc.update(extra)
+    return store.execute_insert(collection='diagnosis_history', document=doc)
+
+def test_insert_and_find_by_object_id(store):
+    diagnosis_id = add_diagnosis(store, 'u1', 0)
+    assert ObjectId.is_valid(diagnosis_id)
+    rows = store.execute_query(collection='diagnosis_history', mongo_query={'_id': ObjectId(diagnosis_id)})
+    assert len(rows) == 1
+    assert rows[0]['_id'] == diagnosis_id
+    # Datetimes come back as datetimes, not strings
+    assert rows[0]['created_at'] == datetime.datetime(2024, 6, 30)
+
+def test_history_is_sorted_and_limited(store):
+    for days_ago in [5, 1, 3, 2, 4]:
+        add_diagnosis(store, 'u1', days_ago)
+    add_diagnosis(store, 'u2', 0)
+    rows = store.execute_query(collection='diagnosis_history', mongo_query={'user_id': 'u1'},
+                               sort=[('created_at', -1)], limit=3)
+    assert [r['created_at'].day for r in rows] == [29, 28, 27]
+
+def test_python_sort_handles_mixed_types(store):
+    for severity in [30.0, 'high', None, 5, True]:
+        add_diagnosis(store, 'u1', 0, severity_percent=severity)
+    store.execute_insert(collection='diagnosis_history', document={'user_id': 'u1', 'disease': 'Early blight'})
+    # A case-insensitive regex is filtered in Python, so the sort is too
+    query = {'disease': {'$regex': 'blight', '$options': 'i'}}
+    rows = store.execute_query(collection='diagnosis_history', mongo_query=query, sort=[('severity_percent', 1)])
+    assert [r.get('severity_percent') for r in rows] == [None, None, 5, 30.0, 'high', True]  # MongoDB's type order
+    rows = store.execute_query(collection='diagnosis_history', mongo_query=query, sort=[('severity_percent', -1)])
+    assert [r.get('severity_percent') for r in rows] == [True, 'high', 30.0, 5, None, None]
+
+def test_range_regex_and_python_fallback(store):
+    add_diagnosis(store, 'u1', 10, severity_percent=10.0)
+    add_diagnosis(store, 'u1', 1, severity_percent=60.0, disease='Late blight')
+    since = datetime.datetime(2024, 6, 25)
+    assert len(store.execute_query(collection='diagnosis_history', mongo_query={'created_at': {'$gte': since}})) == 1
+    assert len(store.execute_query(collection='diagnosis_history', mongo_query={'severity_percent': {'$gt': 50}})) == 1
+    rows = store.execute_query(collection='diagnosis_history',
+                               mongo_query={'disease': {'$regex': 'late', '$options': 'i'}})
+    assert [r['disease'] for r in rows] == ['Late blight']
+    rows = store.execute_query(collection='diagnosis_history',
+                               mongo_query={'$or': [{'severity_percent': 10.0}, {'disease': 'Late blight'}]})
+    assert len(rows) == 2
+
+def test_dotted_set_and_delete(store):
+    diagnosis_id = add_diagnosis(store, 'u1', 0, snapshots={'en': {'stage': 'Moderate'}})
+    assert store.execute_update(collection='diagnosis_history', mongo_query={'_id': ObjectId(diagnosis_id)},
+                                update={'snapshots.hi': {'stage': 'मध्यम'}, 'cost': None})
+    row = store.execute_query(collection='diagnosis_history', mongo_query={'_id': diagnosis_id})[0]
+    assert row['snapshots'] == {'en': {'stage': 'Moderate'}, 'hi': {'stage': 'मध्यम'}}
+    assert 'cost' in row and row['cost'] is None
+    assert store.execute_delete(collection='diagnosis_history', mongo_query={'user_id': 'u1'}) == 1
+    assert store.execute_query(collection='diagnosis_history', mongo_query={}) == []
+
+def test_connection_is_tuned_and_history_query_uses_index(store):
+    conn = store._connection()
+    assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT _id, doc FROM diagnosis_history "
+        f"WHERE {store._field_expr('user_id')} = ? ORDER BY {store._field_expr('created_at')} DESC LIMIT 20",
+        ('u1',)
+    ).fetchall()
+    details = ' '.join(row[-1] for row in plan)
+    assert 'idx_diagnosis_history_user_id_created_at' in details
+    assert 'TEMP B-TREE' not in details
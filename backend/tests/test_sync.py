@@ -0,0 +1,126 @@
+import datetime
+import pytest
+from unittest.mock import patch
+from app import app
+from api import request_context
+from api.routes import diagnosis as diagnosis_routes
+from api.routes import user as user_routes
+from database.sqlite_backend import SQLiteDatabase
+from services import language_service, sync_service, translator_backends
+from services.translation_cache import TranslationCache
+
+USER_ID = '65f000000000000000000001'
+
+@pytest.fixture
+def store(tmp_path):
+    db = SQLiteDatabase(str(tmp_path / 'sync.sqlite3'))
+    with patch.object(sync_service, 'db', db), patch.object(diagnosis_routes, 'db', db):
+        yield db
+    db.close()
+
+class PrefixTranslator:
+    """Stands in for Google; `down` makes every call fail"""
+    down = False
+
+    def __init__(self, source='en', target='hi'):
+        self.target = target
+
+    def translate_batch(self, texts):
+        if PrefixTranslator.down:
+            raise ConnectionError('translator unreachable')
+        return [f'[{self.target}] {t}' for t in texts]
+
+def add_diagnosis(store, when, user_id=USER_ID, disease='Early blight', **extra):
+    doc = {'user_id': user_id, 'crop': 'tomato', 'disease': disease, 'created_at': when, 'updated_at': when}
+    doc.update(extra)
+    return store.execute_insert(collection='diagnosis_history', document=doc)
+
+def pull_all(user_id, since=None, limit=2):
+    """Sync in small batches until caught up, like a phone on a slow connection"""
+    ids = []
+    while True:
+        batch = sync_service.get_changes(user_id, since=since, limit=limit)
+        ids += [str(r['_id']) for r in batch['records']]
+        since = batch['next']
+        if not batch['has_more']:
+            return ids, since
+
+def test_batches_are_ordered_and_complete(store):
+    start = datetime.datetime(2024, 6, 1, 9, 0)
+    same_moment = start + datetime.timedelta(minutes=5)
+    expected = [add_diagnosis(store, start)]
+    # Records sharing a timestamp must not be skipped or repeated across batch boundaries
+    expected += sorted(add_diagnosis(store, same_moment) for _ in range(3))
+    expected.append(add_diagnosis(store, start + datetime.timedelta(minutes=9)))
+    add_diagnosis(store, start, user_id='someone-else')
+
+    ids, token = pull_all(USER_ID)
+    assert ids == expected
+
+    # Caught up: nothing new, same token back
+    again = sync_service.get_changes(USER_ID, since=token)
+    assert again == {'records': [], 'next': token, 'has_more': False}
+
+    # A changed record comes back on its own
+    store.execute_update(collection='diagnosis_history', mongo_query={'_id': expected[1]},
+                         update={'cost': {'total_cost': 500}, 'updated_at': datetime.datetime.utcnow()})
+    delta = sync_service.get_changes(USER_ID, since=token)
+    assert [str(r['_id']) for r in delta['records']] == [expected[1]]
+    assert delta['records'][0]['cost'] == {'total_cost': 500}
+
+def test_bad_token_is_rejected():
+    with pytest.raises(ValueError):
+        sync_service.decode_sync_token('not-a-token')
+    when = datetime.datetime(2024, 6, 1, 9, 0, 0, 123456)
+    assert sync_service.decode_sync_token(sync_service.encode_sync_token(when, 'abc')) == (when, 'abc')
+
+def test_backfill_updated_at(store):
+    created = datetime.datetime(2023, 1, 5)
+    record_id = store.execute_insert(collection='diagnosis_history',
+                                     document={'user_id': USER_ID, 'crop': 'rice', 'created_at': created})
+    assert sync_service.backfill_updated_at() == 1
+    assert sync_service.backfill_updated_at() == 0
+    ids, _ = pull_all(USER_ID)
+    assert ids == [record_id]
+
+def test_sync_route_returns_records_in_users_language(store):
+    snapshots = {
+        'en': {'prediction': {'disease': 'Early blight'}, 'disease_info': {}, 'pesticide_recommendations': {}},
+        'te': {'prediction': {'disease': 'Early blight', 'disease_local': 'ముందస్తు ఆకుమచ్చ'},
+               'disease_info': {}, 'pesticide_recommendations': {}}
+    }
+    add_diagnosis(store, datetime.datetime(2024, 6, 1), snapshots=snapshots)
+    saved_in_english = add_diagnosis(store, datetime.datetime(2024, 6, 2), snapshots={'en': snapshots['en']})
+    offline = add_diagnosis(store, datetime.datetime(2024, 6, 3), disease='Leaf Mold',
+                            snapshots={'en': {'prediction': {'disease': 'Leaf Mold'}}})
+
+    app.config['TESTING'] = True
+    headers = {'Authorization': f'Bearer {user_routes.generate_token(USER_ID)}'}
+    request_context.remember_user_language(USER_ID, 'te')
+    PrefixTranslator.down = False
+    try:
+        with app.test_client() as client, \
+             patch.object(translator_backends, 'GoogleTranslator', PrefixTranslator), \
+             patch.object(language_service, 'get_translation_cache', return_value=TranslationCache(max_entries=10)):
+            data = client.get('/api/diagnosis/sync?limit=1', headers=headers).get_json()
+            assert data['has_more'] is True
+            assert data['records'][0]['prediction']['disease_local'] == 'ముందస్తు ఆకుమచ్చ'
+
+            # Saved before the user picked Telugu: translated now, and remembered
+            rest = client.get(f"/api/diagnosis/sync?since={data['next']}&limit=1", headers=headers).get_json()
+            assert rest['records'][0]['prediction']['disease_local'] == '[te] Early blight'
+            stored = store.execute_query(collection='diagnosis_history', mongo_query={'_id': saved_in_english})[0]
+            assert stored['snapshots']['te']['prediction']['disease_local'] == '[te] Early blight'
+
+            # Translator down: no English view in its place, the app asks /diagnosis/<id> later
+            PrefixTranslator.down = True
+            last = client.get(f"/api/diagnosis/sync?since={rest['next']}", headers=headers).get_json()
+            assert last['has_more'] is False
+            assert last['records'][0]['prediction'] is None
+            stored = store.execute_query(collection='diagnosis_history', mongo_query={'_id': offline})[0]
+            assert 'te' not in stored['snapshots']
+
+            assert client.get('/api/diagnosis/sync?since=garbage', headers=headers).status_code == 400
+            assert client.get('/api/diagnosis/sync').status_code == 401
+    finally:
+        request_context.forget_user_language(USER_ID)
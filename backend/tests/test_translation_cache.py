@@ -0,0 +1,71 @@
+import pytest
+from unittest.mock import patch
+from database.sqlite_backend import SQLiteDatabase
+from services import language_service, translator_backends
+from services.translation_cache import TranslationCache
+
+class FakeTranslator:
+    """Stands in for Google: upper-cases text and counts what it was asked"""
+    calls = []
+
+    def __init__(self, source='en', target='hi'):
+        self.target = target
+
+    def translate(self, text):
+        FakeTranslator.calls.append(text)
+        return f'{self.target}:{text.upper()}'
+
+    def translate_batch(self, texts):
+        FakeTranslator.calls.extend(texts)
+        return [f'{self.target}:{t.upper()}' for t in texts]
+
+@pytest.fixture
+def store(tmp_path):
+    db = SQLiteDatabase(str(tmp_path / 'cache.sqlite3'))
+    yield db
+    db.close()
+
+@pytest.fixture
+def cache(store):
+    cache = TranslationCache(max_entries=100, store=store)
+    FakeTranslator.calls = []
+    with patch.object(language_service, 'get_translation_cache', return_value=cache), \
+         patch.object(translator_backends, 'GoogleTranslator', FakeTranslator):
+        yield cache
+
+def test_memory_tier_is_bounded():
+    cache = TranslationCache(max_entries=2)
+    cache.put_many({'leaf': 'पत्ती', 'rain': 'बारिश', 'soil': 'मिट्टी'}, 'en', 'hi')
+    assert cache.get_many(['leaf', 'rain', 'soil'], 'en', 'hi') == {'rain': 'बारिश', 'soil': 'मिट्टी'}
+    assert cache.get('rain', 'en', 'te') is None  # Different target language, different entry
+    stats = cache.stats()
+    assert stats['entries'] == 2 and stats['evictions'] == 1
+    assert stats['memory_hits'] == 2 and stats['misses'] == 2 and stats['hit_ratio'] == 0.5
+
+def test_persistent_tier_survives_restart(store):
+    TranslationCache(max_entries=10, store=store).put('Early blight', 'अगेती झुलसा', 'en', 'hi')
+
+    restarted = TranslationCache(max_entries=10, store=store)
+    assert restarted.get('Early blight', 'en', 'hi') == 'अगेती झुलसा'
+    assert restarted.get('Early blight', 'en', 'hi') == 'अगेती झुलसा'
+    stats = restarted.stats()
+    assert stats['persistent_hits'] == 1 and stats['memory_hits'] == 1
+
+def test_translate_text_and_batch_share_the_cache(cache):
+    assert language_service.translate_text('Severity', 'hi') == 'hi:SEVERITY'
+    assert language_service.translate_text('Severity', 'hi') == 'hi:SEVERITY'
+    assert FakeTranslator.calls == ['Severity']
+
+    result = language_service.translate_batch({'severity': 'Severity', 'dosage': 'Dosage'}, 'hi')
+    assert result == {'severity': 'hi:SEVERITY', 'dosage': 'hi:DOSAGE'}
+    assert FakeTranslator.calls == ['Severity', 'Dosage']  # Only the new text went out
+
+    cache.clear_memory()
+    assert language_service.translate_batch({'dosage': 'Dosage'}, 'hi') == {'dosage': 'hi:DOSAGE'}
+    assert FakeTranslator.calls == ['Severity', 'Dosage']
+    assert cache.stats()['persistent_hits'] == 1
+
+def test_failed_chunks_are_not_cached(cache):
+    with patch.object(FakeTranslator, 'translate_batch', side_effect=RuntimeError('quota')):
+        assert language_service.translate_batch({'a': 'Symptoms'}, 'te') == {'a': 'Symptoms'}
+    assert cache.get('Symptoms', 'en', 'te') is None
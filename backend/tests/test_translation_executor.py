@@ -0,0 +1,104 @@
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from config.settings import settings
+from services import language_service, translator_backends
+from services.translation_cache import TranslationCache
+from services.translation_executor import TranslationExecutor
+
+class SlowTranslator:
+    """Stands in for Google; anything containing 'slow' waits until the test lets it go"""
+    release = threading.Event()
+
+    def __init__(self, source='en', target='hi'):
+        self.target = target
+
+    def translate_batch(self, texts):
+        if any('slow' in t for t in texts):
+            SlowTranslator.release.wait(5)
+        return [f'[{self.target}] {t}' for t in texts]
+
+@pytest.fixture
+def executor():
+    SlowTranslator.release = threading.Event()
+    executor = TranslationExecutor(max_workers=4, chunk_size=1, max_pending=10)
+    cache = TranslationCache(max_entries=100)
+    with patch.object(language_service, 'get_translation_executor', return_value=executor), \
+         patch.object(language_service, 'get_translation_cache', return_value=cache), \
+         patch.object(translator_backends, 'GoogleTranslator', SlowTranslator), \
+         patch.object(settings, 'TRANSLATION_DEADLINE_SECONDS', 0.2):
+        yield executor
+    SlowTranslator.release.set()
+
+def test_deadline_returns_partial_results(executor):
+    texts = {'a': 'Leaf spot', 'b': 'slow Rust', 'c': 'Blight'}
+    result = language_service.translate_batch(texts, 'hi')
+    assert result == {'a': '[hi] Leaf spot', 'b': 'slow Rust', 'c': '[hi] Blight'}  # Missed one stays English
+    stats = executor.stats()
+    assert stats['timed_out'] == 1 and stats['calls'] == 1 and stats['strings'] == 3
+
+    # The late one finishes in the background and lands in the cache
+    SlowTranslator.release.set()
+    executor._pool.shutdown(wait=True)
+    assert language_service.get_translation_cache().get('slow Rust', 'en', 'hi') == '[hi] slow Rust'
+    assert executor.stats()['late_completed'] == 1
+    assert executor.stats()['latency_ms']['count'] == 3
+
+def test_offline_jobs_wait_for_everything(executor):
+    threading.Timer(0.4, SlowTranslator.release.set).start()
+    result = language_service.translate_batch({'b': 'slow Rust'}, 'te', wait_for_all=True)
+    assert result == {'b': '[te] slow Rust'}
+    assert executor.stats()['timed_out'] == 0
+
+def test_pending_work_is_bounded():
+    executor = TranslationExecutor(max_workers=1, chunk_size=1, max_pending=2)
+    release = threading.Event()
+    try:
+        result = executor.translate(['a', 'b', 'c', 'd'], provider=lambda chunk: release.wait(5) and chunk,
+                                    deadline=0.05)
+        assert result == {}
+        stats = executor.stats()
+        assert stats['rejected'] == 2 and stats['timed_out'] == 2 and stats['pending'] == 2
+    finally:
+        release.set()
+
+def wait_until(condition, timeout=5):
+    end = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < end
+        time.sleep(0.01)
+
+def test_concurrent_requests_share_one_call():
+    executor = TranslationExecutor(max_workers=4, chunk_size=10, max_pending=10)
+    release = threading.Event()
+    sent = []
+
+    def provider(chunk):
+        sent.extend(chunk)
+        release.wait(5)
+        return [f'[hi] {t}' for t in chunk]
+
+    results = {}
+    def request(name, texts):
+        results[name] = executor.translate(texts, provider, key=('en', 'hi'))
+
+    first = threading.Thread(target=request, args=('first', ['Early blight', 'Spray now']))
+    first.start()
+    wait_until(lambda: executor.stats()['in_flight'] == 2)
+    others = [threading.Thread(target=request, args=(n, ['Spray now', 'Early blight'])) for n in ('a', 'b')]
+    for t in others:
+        t.start()
+    wait_until(lambda: executor.stats()['coalesced'] == 4)
+    release.set()
+    for t in [first] + others:
+        t.join(5)
+
+    assert sorted(sent) == ['Early blight', 'Spray now']  # Google was asked once
+    assert results['a'] == results['b'] == {'Early blight': '[hi] Early blight', 'Spray now': '[hi] Spray now'}
+    stats = executor.stats()
+    assert stats['calls_saved'] == 2 and stats['in_flight'] == 0
+
+    # Other language pairs don't share
+    assert executor.translate(['Spray now'], provider, key=('en', 'te')) == {'Spray now': '[hi] Spray now'}
+    assert len(sent) == 3
@@ -0,0 +1,92 @@
+import pytest
+from unittest.mock import patch
+from services import language_service, translator_backends
+from services.language_service import TranslationPlan
+from services.translation_cache import TranslationCache
+
+class CountingTranslator:
+    """Stands in for Google and records every batch it is sent"""
+    batches = []
+
+    def __init__(self, source='en', target='hi'):
+        self.target = target
+
+    def translate(self, text):
+        CountingTranslator.batches.append([text])
+        return f'[{self.target}] {text}'
+
+    def translate_batch(self, texts):
+        CountingTranslator.batches.append(list(texts))
+        return [f'[{self.target}] {t}' for t in texts]
+
+@pytest.fixture
+def cache():
+    cache = TranslationCache(max_entries=500)
+    CountingTranslator.batches = []
+    with patch.object(language_service, 'get_translation_cache', return_value=cache), \
+         patch.object(translator_backends, 'GoogleTranslator', CountingTranslator):
+        yield cache
+
+PREDICTION = {'crop': 'tomato', 'disease': 'Tomato___Early_blight', 'stage': 'Moderate Stage', 'confidence': 91.0}
+DISEASE_INFO = {'description': 'Fungal disease', 'symptoms': 'Dark rings on leaves', 'prevention_steps': 'Rotate crops'}
+RECOMMENDATIONS = {
+    'treatment_approach': 'Spray now',
+    'recommended_pesticides': [
+        {'name': 'Mancozeb', 'type': 'fungicide', 'dosage_per_acre': '600 g', 'frequency': 'Every 7 days', 'warnings': 'Wear gloves'},
+        {'name': 'Neem oil', 'type': 'organic', 'dosage_per_acre': '1 L', 'frequency': 'Every 7 days', 'warnings': 'Wear gloves'},
+    ]
+}
+
+def test_whole_response_is_one_plan(cache):
+    cache.put('Rotate crops', '[hi] cached', 'en', 'hi')
+
+    plan = TranslationPlan('hi')
+    result = plan.diagnosis_result(PREDICTION)
+    info = plan.disease_info(DISEASE_INFO)
+    recommendations = plan.recommendations(RECOMMENDATIONS)
+    assert info['symptoms'] == 'Dark rings on leaves'  # Filled in by run()
+    plan.run()
+
+    sent = [text for batch in CountingTranslator.batches for text in batch]
+    assert len(sent) == len(set(sent))             # Repeated strings sent once
+    assert 'Rotate crops' not in sent              # Cache hits not sent at all
+    assert 'tomato' not in sent                    # Crop names come from our dictionary
+
+    assert result['disease_local'] == '[hi] Tomato - Early blight'
+    assert result['crop_local'] == 'टमाटर' and result['stage_local'] == '[hi] Moderate Stage'
+    assert info == {'description': '[hi] Fungal disease', 'symptoms': '[hi] Dark rings on leaves',
+                    'prevention_steps': '[hi] cached'}
+    pests = recommendations['recommended_pesticides']
+    assert [p['frequency'] for p in pests] == ['[hi] Every 7 days'] * 2
+    assert pests[0]['type_local'] == 'फफूंदनाशक' and pests[1]['name'] == 'Neem oil'
+
+    # The English originals are untouched
+    assert RECOMMENDATIONS['recommended_pesticides'][0]['frequency'] == 'Every 7 days'
+    assert DISEASE_INFO['symptoms'] == 'Dark rings on leaves'
+
+def test_english_plan_sends_nothing(cache):
+    plan = TranslationPlan('en')
+    assert plan.disease_info(DISEASE_INFO) is DISEASE_INFO
+    assert plan.run() == 0
+    assert CountingTranslator.batches == []
+
+def test_plan_says_whether_it_is_safe_to_save(cache):
+    plan = TranslationPlan('hi')
+    info = plan.disease_info(DISEASE_INFO)
+    with patch.object(CountingTranslator, 'translate_batch', side_effect=ConnectionError('down')):
+        plan.run()
+    assert info['symptoms'] == 'Dark rings on leaves'  # Shown in English this time...
+    assert plan.missed == 3 and not plan.complete     # ...but not to be stored
+
+    plan = TranslationPlan('hi')
+    info = plan.disease_info(DISEASE_INFO)
+    plan.run()
+    assert plan.complete and info['symptoms'] == '[hi] Dark rings on leaves'
+
+    # Fake translations from the load-test stub are never worth keeping
+    stub = translator_backends.LatencyStubBackend(latency_ms=0, jitter_ms=0)
+    with patch.object(language_service, 'get_translator_backend', return_value=stub):
+        plan = TranslationPlan('te')
+        plan.disease_info(DISEASE_INFO)
+        plan.run()
+    assert plan.missed == 0 and not plan.complete
@@ -0,0 +1,46 @@
+import json
+import time
+import pytest
+from unittest.mock import patch
+from services import language_service
+from services.translation_cache import TranslationCache
+from services.translator_backends import (DictionaryBackend, GoogleBackend, LatencyStubBackend,
+                                          create_translator_backend)
+
+@pytest.fixture
+def glossary(tmp_path):
+    path = tmp_path / 'glossary.json'
+    path.write_text(json.dumps({'hi': {'Early blight': 'अगेती झुलसा'}}), encoding='utf-8')
+    return str(path)
+
+def test_dictionary_backend_works_offline(glossary):
+    backend = DictionaryBackend(glossary_file=glossary)
+    welcome = language_service.load_base_translations()['hi']['welcome']
+    assert backend.translate_batch(['Welcome', 'tomato', 'FUNGICIDE', 'early blight', 'Something new'], 'en', 'hi') == \
+        [welcome, 'टमाटर', 'फफूंदनाशक', 'अगेती झुलसा', None]
+
+def test_shipped_glossary_covers_the_seed_data():
+    from database.seeding import glossary_terms
+    backend = DictionaryBackend()  # Default settings: the glossary that ships with the backend
+    assert backend.translate_batch(['Late blight', 'EARLY BLIGHT', 'Mancozeb'], 'en', 'hi') == \
+        ['पछेती झुलसा', 'अगेती झुलसा', 'मैंकोजेब']
+    for language in ('hi', 'te', 'ta', 'kn', 'mr', 'ml'):
+        assert None not in backend.translate_batch(glossary_terms(), 'en', language)
+
+def test_backend_is_chosen_by_settings(glossary):
+    assert isinstance(create_translator_backend('dictionary'), DictionaryBackend)
+    assert isinstance(create_translator_backend('stub'), LatencyStubBackend)
+    assert isinstance(create_translator_backend('nonsense'), GoogleBackend)
+
+    cache = TranslationCache(max_entries=10)
+    with patch.object(language_service, 'get_translator_backend', return_value=DictionaryBackend(glossary_file=glossary)), \
+         patch.object(language_service, 'get_translation_cache', return_value=cache):
+        result = language_service.translate_batch({'a': 'Early blight', 'b': 'Something new'}, 'hi')
+    assert result == {'a': 'अगेती झुलसा', 'b': 'Something new'}  # Unknown text stays English
+    assert cache.stats()['entries'] == 0                         # Local lookups aren't cached
+
+def test_stub_backend_adds_latency():
+    backend = LatencyStubBackend(latency_ms=50, jitter_ms=0)
+    start = time.monotonic()
+    assert backend.translate_batch(['Leaf'], 'en', 'te') == ['[te] Leaf']
+    assert time.monotonic() - start >= 0.05
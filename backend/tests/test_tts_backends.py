@@ -0,0 +1,63 @@
+import os
+import pytest
+from unittest.mock import patch
+from services import tts_backends, voice_service
+from services.tts_backends import GTTSBackend, LocalBackend, SilentBackend, create_tts_backend
+from utils import mp3
+
+@pytest.fixture
+def silent():
+    with patch.object(tts_backends, '_backend', SilentBackend()), \
+         patch.object(tts_backends, '_latencies', {}), \
+         patch.object(tts_backends, '_calls', {}), \
+         patch.object(tts_backends, '_errors', {}):
+        yield
+
+def test_backend_is_picked_by_name():
+    assert isinstance(create_tts_backend('silent'), SilentBackend)
+    assert isinstance(create_tts_backend('GTTS'), GTTSBackend)
+    assert isinstance(create_tts_backend('festival'), GTTSBackend)  # Unknown: fall back to gTTS
+    with patch.object(tts_backends.settings, 'TTS_SERVICE', 'silent'):
+        assert isinstance(create_tts_backend(), SilentBackend)
+
+def test_silent_audio_is_playable_and_as_long_as_the_text(tmp_path):
+    backend = SilentBackend()
+    short, long, again = (str(tmp_path / name) for name in ('short.mp3', 'long.mp3', 'again.mp3'))
+    backend.synthesize('Hello', 'en', short)
+    backend.synthesize('Hello there, your tomato has early blight.', 'en', long)
+    backend.synthesize('Hello', 'en', again)
+
+    data = open(short, 'rb').read()
+    assert data == open(again, 'rb').read()  # Same text, same bytes
+    assert len(mp3.frames(data)) * 192 == len(data)  # Nothing but whole frames
+    assert len(mp3.frames(open(long, 'rb').read())) > len(mp3.frames(data))
+
+def test_local_backend_fails_cleanly_without_its_tools(tmp_path):
+    with patch.object(tts_backends.shutil, 'which', return_value=None):
+        backend = LocalBackend()
+    assert not backend.available()
+    with pytest.raises(RuntimeError):
+        backend.synthesize('Hello', 'en', str(tmp_path / 'hello.mp3'))
+
+def test_calls_are_timed_per_backend(tmp_path, silent):
+    for i in range(3):
+        tts_backends.synthesize(f'Message {i}', 'en', str(tmp_path / f'{i}.mp3'))
+    with patch.object(SilentBackend, 'synthesize', side_effect=RuntimeError('disk full')):
+        with pytest.raises(RuntimeError):
+            tts_backends.synthesize('Message', 'en', str(tmp_path / 'x.mp3'))
+
+    stats = tts_backends.tts_stats()
+    assert stats['backend'] == 'silent'
+    assert stats['silent']['calls'] == 4
+    assert stats['silent']['errors'] == 1
+    assert 0 <= stats['silent']['p50_ms'] <= stats['silent']['max_ms']
+
+def test_voice_files_use_the_backend_and_keep_their_own_names(tmp_path, silent):
+    name = voice_service.voice_filename('Hello', 'en')
+    with patch.object(tts_backends, '_backend', GTTSBackend()):
+        assert voice_service.voice_filename('Hello', 'en') != name  # Silence never passes for gTTS audio
+
+    path = str(tmp_path / name)
+    voice_service.synthesize_voice('Hello', 'en', path)
+    assert mp3.frames(open(path, 'rb').read())
+    assert not [f for f in os.listdir(tmp_path) if f.endswith('.tmp')]
@@ -0,0 +1,134 @@
+import json
+import os
+import threading
+import pytest
+from unittest.mock import patch
+from app import app
+from config.settings import settings
+from services import language_service, translator_backends, ui_bundle_service
+from services.translation_cache import TranslationCache
+
+class CountingTranslator:
+    """Stands in for Google and records every batch it is sent"""
+    batches = []
+
+    def __init__(self, source='en', target='hi'):
+        self.target = target
+
+    def translate_batch(self, texts):
+        CountingTranslator.batches.append(list(texts))
+        CountingTranslator.release.wait(5)
+        if CountingTranslator.failing & set(texts):
+            raise ConnectionError('translator unreachable')
+        return [f'[{self.target}] {t}' for t in texts]
+
+def finish_compiles():
+    for thread in list(ui_bundle_service._compiling.values()):
+        thread.join(10)
+
+@pytest.fixture
+def bundles(tmp_path):
+    CountingTranslator.batches = []
+    CountingTranslator.failing = set()
+    CountingTranslator.release = threading.Event()
+    CountingTranslator.release.set()
+    with patch.object(settings, 'UI_BUNDLE_FOLDER', str(tmp_path / 'ui_bundles')), \
+         patch.dict(ui_bundle_service._bundles, clear=True), \
+         patch.dict(ui_bundle_service._retry_at, clear=True), \
+         patch.object(ui_bundle_service, '_outdated', set()), \
+         patch.object(translator_backends, 'GoogleTranslator', CountingTranslator), \
+         patch.object(language_service, 'get_translation_cache', return_value=TranslationCache(max_entries=100)):
+        yield str(tmp_path / 'ui_bundles')
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+def test_compiled_bundle(bundles):
+    versions = ui_bundle_service.compile_bundles(['hi'])
+    sent = [text for batch in CountingTranslator.batches for text in batch]
+    assert len(sent) == len(set(sent))  # Every label asked for once
+
+    with open(os.path.join(bundles, 'hi.json'), encoding='utf-8') as f:
+        bundle = json.load(f)
+    manual = language_service.load_base_translations()['hi']
+    assert bundle['version'] == versions['hi'] and bundle['missing'] == []
+    assert bundle['labels']['welcome'] == manual['welcome']            # Hand-written wins
+    assert bundle['labels']['confidence_score'] == '[hi] Confidence Score'  # The rest is translated
+    assert ui_bundle_service.build_bundle('hi')['version'] == versions['hi']  # Same labels, same version
+
+def test_out_of_date_bundle_is_recompiled(bundles):
+    ui_bundle_service.compile_bundles(['te'])
+    path = os.path.join(bundles, 'te.json')
+    with open(path, encoding='utf-8') as f:
+        bundle = json.load(f)
+    bundle['source_version'] = 'old'
+    bundle['labels'] = {'confidence_score': 'stale'}
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(bundle, f)
+
+    ui_bundle_service._bundles.clear()
+    assert ui_bundle_service.get_bundle('te')['labels']['confidence_score'] == 'stale'  # Served while recompiling
+    finish_compiles()
+    assert ui_bundle_service.get_bundle('te')['labels']['confidence_score'] == '[te] Confidence Score'
+
+def test_requests_never_wait_for_a_compile(bundles):
+    CountingTranslator.release.clear()  # The translator hangs
+    manual = language_service.load_base_translations()['hi']
+    bundle = ui_bundle_service.get_bundle('hi')
+    assert bundle['labels']['welcome'] == manual['welcome']   # Hand-written labels right away
+    assert 'confidence_score' in bundle['missing']
+    assert ui_bundle_service.get_bundle('en')['labels']       # Other languages aren't held up
+    assert len(ui_bundle_service._compiling) == 1             # One compile, however many requests
+
+    CountingTranslator.release.set()
+    finish_compiles()
+    assert ui_bundle_service.get_bundle('hi')['labels']['confidence_score'] == '[hi] Confidence Score'
+
+def test_missing_labels_are_recorded_and_retried(bundles):
+    CountingTranslator.failing = {'Confidence Score'}
+    ui_bundle_service.compile_bundles(['hi'])
+    with open(os.path.join(bundles, 'hi.json'), encoding='utf-8') as f:
+        saved = json.load(f)
+    missing = saved['missing']  # The whole chunk with it failed
+    assert 'confidence_score' in missing and not set(missing) & set(saved['labels'])
+
+    # Served as it is, and tried again later: only the missing label goes out
+    CountingTranslator.failing = set()
+    CountingTranslator.batches = []
+    ui_bundle_service._bundles.clear()
+    with patch.object(settings, 'UI_BUNDLE_RETRY_SECONDS', 0):
+        assert ui_bundle_service.get_bundle('hi')['missing'] == missing
+        finish_compiles()
+    english = ui_bundle_service.english_labels()
+    assert sorted(t for batch in CountingTranslator.batches for t in batch) == sorted(english[k] for k in missing)
+    bundle = ui_bundle_service.get_bundle('hi')
+    assert bundle['missing'] == [] and bundle['labels']['confidence_score'] == '[hi] Confidence Score'
+
+def test_bundle_is_served_with_etag(bundles, client):
+    CountingTranslator.release.clear()
+    first = client.get('/api/translations/?language=hi')
+    assert first.status_code == 200 and first.headers['Cache-Control'] == 'no-cache'
+    assert 'confidence_score' not in first.get_json()  # The app shows English until it's compiled
+    CountingTranslator.release.set()
+    finish_compiles()
+
+    response = client.get('/api/translations/?language=hi')
+    assert response.status_code == 200
+    compiled = len(CountingTranslator.batches)
+    version = response.headers['X-Bundle-Version']
+    assert response.headers['ETag'] == f'"{version}"'
+    assert 'max-age=300' in response.headers['Cache-Control']
+    assert response.get_json()['confidence_score'] == '[hi] Confidence Score'
+
+    # The app already has this version: nothing to download
+    again = client.get('/api/translations/?language=hi', headers={'If-None-Match': f'"{version}"'})
+    assert again.status_code == 304 and again.data == b''
+
+    pinned = client.get(f'/api/translations/?language=hi&version={version}')
+    assert 'immutable' in pinned.headers['Cache-Control']
+
+    assert client.get('/api/translations/?language=xx').status_code == 400
+    assert len(CountingTranslator.batches) == compiled  # Compiled once, then served from memory
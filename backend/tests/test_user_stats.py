@@ -0,0 +1,73 @@
+import datetime
+import pytest
+from unittest.mock import patch
+from app import app
+from api import request_context
+from api.routes import user as user_routes
+from database.sqlite_backend import SQLiteDatabase
+from services import user_stats_service
+
+USER_ID = '65a1b2c3d4e5f6a7b8c9d0e1'
+
+@pytest.fixture
+def store(tmp_path):
+    db = SQLiteDatabase(str(tmp_path / 'stats.sqlite3'))
+    with patch.object(user_stats_service, 'db', db):
+        yield db
+    db.close()
+
+def diagnosis(crop, disease, stage, severity, when, user_id=USER_ID):
+    return {'user_id': user_id, 'crop': crop, 'disease': disease, 'stage': stage,
+            'severity_percent': severity, 'created_at': when}
+
+def test_seasons():
+    assert user_stats_service.get_season(datetime.datetime(2024, 7, 1)) == 'kharif_2024'
+    assert user_stats_service.get_season(datetime.datetime(2024, 12, 1)) == 'rabi_2024-25'
+    assert user_stats_service.get_season(datetime.datetime(2025, 1, 15)) == 'rabi_2024-25'
+    assert user_stats_service.get_season(datetime.datetime(2025, 4, 1)) == 'zaid_2025'
+
+def test_stats_are_updated_per_diagnosis(store):
+    records = [
+        diagnosis('tomato', 'Early blight', 'Early Stage', 10.0, datetime.datetime(2024, 7, 1)),
+        diagnosis('tomato', 'Early blight', 'Moderate Stage', 30.0, datetime.datetime(2024, 7, 9)),
+        diagnosis('rice', 'Blast', 'Severe Stage', 65.0, datetime.datetime(2024, 12, 2)),
+    ]
+    for record in records:
+        user_stats_service.record_user_diagnosis(record)
+
+    stats = user_stats_service.get_user_stats(USER_ID, season='kharif_2024')
+    assert stats['total_diagnoses'] == 3
+    assert stats['by_crop'] == {'tomato': 2, 'rice': 1}
+    assert stats['by_disease'] == {'Early blight': 2, 'Blast': 1}
+    assert stats['by_stage']['Severe Stage'] == 1
+    assert stats['average_severity'] == 35.0
+    assert stats['last_diagnosis_at'] == datetime.datetime(2024, 12, 2)
+    assert stats['season'] == {'name': 'kharif_2024', 'total_diagnoses': 2,
+                               'by_crop': {'tomato': 2}, 'by_disease': {'Early blight': 2}}
+    assert len(store.execute_query(collection='user_stats', mongo_query={})) == 1
+
+def test_rebuild_matches_incremental(store):
+    when = datetime.datetime(2024, 8, 1)
+    for record in [diagnosis('maize', 'Rust', 'Early Stage', 12.0, when),
+                   diagnosis('maize', 'Rust', 'Early Stage', 18.0, when + datetime.timedelta(days=1)),
+                   diagnosis('potato', 'Late blight', 'Moderate Stage', 40.0, when, user_id='other')]:
+        store.execute_insert(collection='diagnosis_history', document=dict(record))
+        user_stats_service.record_user_diagnosis(record)
+    before = user_stats_service.get_user_stats(USER_ID)
+
+    assert user_stats_service.rebuild_user_stats() == 2
+    assert user_stats_service.get_user_stats(USER_ID) == before
+    assert user_stats_service.get_user_stats('other')['total_diagnoses'] == 1
+    assert user_stats_service.get_user_stats('nobody')['total_diagnoses'] == 0
+
+def test_profile_includes_stats(store):
+    user_stats_service.record_user_diagnosis(
+        diagnosis('grape', 'Black rot', 'Early Stage', 8.0, datetime.datetime.utcnow()))
+    app.config['TESTING'] = True
+    headers = {'Authorization': f'Bearer {user_routes.generate_token(USER_ID)}'}
+    with patch.object(user_routes, 'db') as users_db, patch.object(request_context, 'db', users_db), \
+         app.test_client() as client:
+        users_db.execute_query.return_value = [{'_id': USER_ID, 'email': 'a@b.com', 'name': 'Ravi'}]
+        data = client.get('/api/user/profile', headers=headers).get_json()
+    assert data['stats']['total_diagnoses'] == 1
+    assert data['stats']['season']['by_crop'] == {'grape': 1}
@@ -0,0 +1,125 @@
+import os
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from app import app
+from config.settings import settings
+from services import tts_backends, voice_service
+from database.sqlite_backend import SQLiteDatabase
+from services.voice_service import VoiceJobQueue
+from services.voice_store import VoiceStore
+from utils import mp3
+
+def fake_mp3(text):
+    """One 192-byte MPEG-2 Layer III frame (what gTTS sends) carrying the text as its 'audio'"""
+    return b'\xff\xf3\x84\xc4' + text.encode('utf-8')[:188].ljust(188, b'\0')
+
+class FakeTTS:
+    """Stands in for gTTS: waits for the test to let it go, then writes a one-frame 'MP3'"""
+    release = threading.Event()
+    made = []
+
+    def __init__(self, text, lang='en', slow=False, timeout=None):
+        self.text = text
+
+    def save(self, path):
+        FakeTTS.release.wait(5)
+        if 'broken' in self.text:
+            raise RuntimeError('TTS is down')
+        FakeTTS.made.append(self.text)
+        with open(path, 'wb') as f:
+            f.write(fake_mp3(self.text))
+
+@pytest.fixture
+def jobs(tmp_path):
+    FakeTTS.release = threading.Event()
+    FakeTTS.made = []
+    queue = VoiceJobQueue(workers=2, max_queued=2)
+    store = VoiceStore(str(tmp_path), SQLiteDatabase(str(tmp_path / 'index.sqlite3')), max_bytes=10 ** 6)
+    with patch.object(settings, 'VOICE_OUTPUT_FOLDER', str(tmp_path)), \
+         patch.object(settings, 'VOICE_SEGMENT_FOLDER', str(tmp_path / 'segments')), \
+         patch.object(tts_backends, 'gTTS', FakeTTS), \
+         patch.object(voice_service, 'get_voice_jobs', return_value=queue), \
+         patch.object(voice_service, 'get_voice_store', return_value=store), \
+         patch.object(voice_service, 'segment_hits', 0), patch.object(voice_service, 'segment_misses', 0):
+        yield queue
+    FakeTTS.release.set()
+    queue._pool.shutdown(wait=True)
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+def test_voice_is_queued_not_waited_for(jobs, client):
+    path = voice_service.generate_voice('Spray in the evening', 'en')
+    filename = os.path.basename(path)
+    assert filename == voice_service.voice_filename('Spray in the evening', 'en')  # Same message, same file
+    assert not os.path.exists(path)
+
+    pending = client.get(f'/api/diagnosis/voice/{filename}')
+    assert pending.status_code == 202 and pending.headers['Retry-After'] == '1'
+    assert voice_service.generate_voice('Spray in the evening', 'en') == path
+
+    FakeTTS.release.set()
+    jobs._pool.shutdown(wait=True)
+    ready = client.get(f'/api/diagnosis/voice/{filename}')
+    assert ready.status_code == 200 and ready.data == fake_mp3('Spray in the evening')
+    assert len(FakeTTS.made) == 1  # Asked twice, made once
+    assert jobs.stats()['completed'] == 1
+
+def test_queue_is_bounded_and_failures_are_reported(jobs, client):
+    assert voice_service.generate_voice('one') and voice_service.generate_voice('broken two')
+    assert voice_service.generate_voice('three') is None  # Full: no voice this time
+    assert jobs.stats()['rejected'] == 1
+
+    FakeTTS.release.set()
+    jobs._pool.shutdown(wait=True)
+    failed = client.get(f"/api/diagnosis/voice/{voice_service.voice_filename('broken two', 'en')}")
+    assert failed.status_code == 404 and failed.get_json()['status'] == 'failed'
+    assert client.get('/api/diagnosis/voice/..%2Fapp.py').status_code == 404
+    assert client.get(f"/api/diagnosis/voice/{voice_service.voice_filename('never asked', 'en')}").status_code == 404
+
+def test_failures_are_forgotten_in_time(jobs):
+    FakeTTS.release.set()
+    jobs.max_failed = 2
+    for i in range(3):
+        voice_service.generate_voice(f'broken {i}')
+        end = time.monotonic() + 5
+        while jobs.stats()['failed'] <= i and time.monotonic() < end:
+            time.sleep(0.01)
+
+    assert [voice_service.voice_status(voice_service.voice_filename(f'broken {i}', 'en')) for i in range(3)] == \
+        [None, 'failed', 'failed']  # Only the newest two are remembered
+    assert jobs._jobs == {}  # Failed jobs leave the queue: it has room for two more
+    assert voice_service.generate_voice('four') and voice_service.generate_voice('five')
+
+def test_diagnosis_voice_is_joined_from_segments(jobs):
+    FakeTTS.release.set()
+    first = {'crop': 'tomato', 'disease': 'Early blight', 'confidence': 91.37, 'severity_percent': 24.6, 'stage': 'Early Stage'}
+    assert voice_service.diagnosis_voice_segments(first, 'en') == [
+        'Disease detected in your', 'tomato', 'plant. Disease name:', 'Early blight.', 'Confidence:',
+        '91 percent.', 'Severity:', '25 percent.', 'Stage:', 'Early Stage.']
+    path = voice_service.generate_diagnosis_voice(first, 'en')
+    end = time.monotonic() + 5
+    while voice_service.voice_status(os.path.basename(path)) != 'ready' and time.monotonic() < end:
+        time.sleep(0.01)
+
+    # Another tomato with early blight: only the new number is spoken by gTTS
+    second = dict(first, confidence=87.9, severity_percent=91.2)
+    second_path = voice_service.generate_diagnosis_voice(second, 'en')
+    jobs._pool.shutdown(wait=True)
+
+    with open(path, 'rb') as f:
+        assert f.read() == b''.join(fake_mp3(s) for s in voice_service.diagnosis_voice_segments(first, 'en'))
+    assert os.path.exists(second_path)
+    assert len(FakeTTS.made) == 11 and FakeTTS.made[10] == '88 percent.'  # 10 pieces, then 1 new number
+    assert jobs.stats()['segments'] == {'hits': 9, 'misses': 11, 'hit_ratio': 0.45}
+
+def test_joined_mp3_drops_tags_and_info_frame():
+    info = b'\xff\xf3\x84\xc4' + (b'\0' * 9 + b'Info').ljust(188, b'\0')  # Length header of one clip
+    id3 = b'ID3\x04\x00\x00\x00\x00\x00\x05' + b'title'
+    clip = id3 + info + fake_mp3('Severity:') + b'TAG'.ljust(128, b'\0')
+    assert mp3.join([clip, fake_mp3('25 percent.')]) == fake_mp3('Severity:') + fake_mp3('25 percent.')
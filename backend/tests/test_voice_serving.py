@@ -0,0 +1,57 @@
+import pytest
+from unittest.mock import patch
+from app import app
+from config.settings import settings
+from database.sqlite_backend import SQLiteDatabase
+from services import voice_service
+from services.voice_store import VoiceStore
+
+HASH = voice_service.voice_filename('Spray in the evening', 'en')[len('voice_'):-len('.mp3')]
+NAME = f'voice_{HASH}.mp3'
+AUDIO = bytes(range(256)) * 4
+
+@pytest.fixture
+def stored(tmp_path):
+    db = SQLiteDatabase(str(tmp_path / 'index.sqlite3'))
+    store = VoiceStore(str(tmp_path), db, max_bytes=10 ** 6)
+    source = tmp_path / 'new.mp3'
+    source.write_bytes(AUDIO)
+    path = store.add(NAME, str(source))
+    with patch.object(settings, 'VOICE_OUTPUT_FOLDER', str(tmp_path)), \
+         patch.object(voice_service, 'get_voice_store', return_value=store):
+        yield path
+    db.close()
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+def test_voice_is_immutable_and_conditional(stored, client):
+    response = client.get(f'/api/diagnosis/voice/{NAME}')
+    assert response.status_code == 200 and response.data == AUDIO
+    assert response.headers['ETag'] == f'"{HASH}"'  # Strong: the name is the content
+    assert response.headers['Cache-Control'] == 'public, max-age=31536000, immutable'
+    assert response.headers['Accept-Ranges'] == 'bytes' and 'Last-Modified' in response.headers
+
+    again = client.get(f'/api/diagnosis/voice/{NAME}', headers={'If-None-Match': f'"{HASH}"'})
+    assert again.status_code == 304 and again.data == b''
+
+    part = client.get(f'/api/diagnosis/voice/{NAME}', headers={'Range': 'bytes=256-511'})
+    assert part.status_code == 206 and part.data == AUDIO[256:512]
+    assert part.headers['Content-Range'] == f'bytes 256-511/{len(AUDIO)}'
+
+def test_front_proxy_sends_the_bytes(stored, client):
+    with patch.object(settings, 'VOICE_SENDFILE_MODE', 'x-accel'):
+        response = client.get(f'/api/diagnosis/voice/{NAME}')
+        assert response.data == b''
+        assert response.headers['X-Accel-Redirect'].startswith('/protected-voice/')
+        assert response.headers['X-Accel-Redirect'].endswith(f'/{NAME}')
+        assert response.headers['X-Accel-Redirect'].count('/') == 4  # /protected-voice/3f/a2/<name>
+        assert 'immutable' in response.headers['Cache-Control']
+        cached = client.get(f'/api/diagnosis/voice/{NAME}', headers={'If-None-Match': f'"{HASH}"'})
+        assert cached.status_code == 304
+
+    with patch.object(settings, 'VOICE_SENDFILE_MODE', 'x-sendfile'):
+        assert client.get(f'/api/diagnosis/voice/{NAME}').headers['X-Sendfile'] == stored
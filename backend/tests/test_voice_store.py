@@ -0,0 +1,78 @@
+import os
+import pytest
+from unittest.mock import patch
+from database.sqlite_backend import SQLiteDatabase
+from services.voice_store import VoiceStore
+
+@pytest.fixture
+def index(tmp_path):
+    db = SQLiteDatabase(str(tmp_path / 'index.sqlite3'))
+    yield db
+    db.close()
+
+def add_file(store, tmp_path, name, size):
+    source = tmp_path / f'{name}.new'
+    source.write_bytes(b'x' * size)
+    return store.add(name, str(source))
+
+def test_files_are_sharded_and_found_through_the_index(tmp_path, index):
+    store = VoiceStore(str(tmp_path / 'voice'), index, max_bytes=1000)
+    path = add_file(store, tmp_path, 'voice_a.mp3', 100)
+    assert os.path.relpath(path, store.folder).count(os.sep) == 2  # voice/3f/a2/voice_a.mp3
+    assert open(path, 'rb').read() == b'x' * 100
+
+    with patch('os.listdir', side_effect=AssertionError('no directory listing')):
+        assert store.lookup('voice_a.mp3') == path
+        assert store.lookup('voice_b.mp3') is None
+    assert store.stats()['hits'] == 1 and store.stats()['bytes'] == 100
+
+def test_file_deleted_on_disk_is_forgotten(tmp_path, index):
+    store = VoiceStore(str(tmp_path / 'voice'), index, max_bytes=1000)
+    os.remove(add_file(store, tmp_path, 'voice_a.mp3', 100))
+    assert store.lookup('voice_a.mp3') is None
+    assert not store.contains('voice_a.mp3')  # So the next submit makes it again
+    assert store.stats()['misses'] == 1 and store.stats()['bytes'] == 0
+
+def test_least_recently_played_files_go_first(tmp_path, index):
+    store = VoiceStore(str(tmp_path / 'voice'), index, max_bytes=250, touch_interval=0)
+    old = add_file(store, tmp_path, 'voice_old.mp3', 100)
+    add_file(store, tmp_path, 'voice_played.mp3', 100)
+    index.execute_update(collection='voice_assets', mongo_query={'name': 'voice_old.mp3'},
+                         update={'last_access': 1})
+    index.execute_update(collection='voice_assets', mongo_query={'name': 'voice_played.mp3'},
+                         update={'last_access': 2})
+    store.lookup('voice_played.mp3')  # Played just now
+
+    add_file(store, tmp_path, 'voice_new.mp3', 100)  # 300 bytes > 250: one has to go
+    assert not os.path.exists(old) and not store.contains('voice_old.mp3')
+    assert store.contains('voice_played.mp3') and store.contains('voice_new.mp3')
+    assert store.stats()['evictions'] == 1 and store.total_bytes() == 200
+
+    # A fresh process counts the total from the index
+    assert VoiceStore(store.folder, index, max_bytes=250).total_bytes() == 200
+
+def test_playing_a_file_keeps_it_over_newer_ones(tmp_path, index):
+    store = VoiceStore(str(tmp_path / 'voice'), index, max_bytes=250, touch_interval=0)
+    first = add_file(store, tmp_path, 'voice_first.mp3', 100)
+    second = add_file(store, tmp_path, 'voice_second.mp3', 100)
+    index.execute_update(collection='voice_assets', mongo_query={'name': 'voice_first.mp3'}, update={'last_access': 1})
+    index.execute_update(collection='voice_assets', mongo_query={'name': 'voice_second.mp3'}, update={'last_access': 2})
+
+    store.lookup('voice_first.mp3')  # Added first, but played just now
+    row = index.execute_query(collection='voice_assets', mongo_query={'name': 'voice_first.mp3'})[0]
+    assert row['last_access'] > 2 and '$set' not in row
+
+    add_file(store, tmp_path, 'voice_third.mp3', 100)
+    assert os.path.exists(first) and store.contains('voice_first.mp3')
+    assert not os.path.exists(second) and not store.contains('voice_second.mp3')
+
+def test_old_flat_folder_is_imported(tmp_path, index):
+    folder = tmp_path / 'voice'
+    folder.mkdir()
+    (folder / 'voice_legacy.mp3').write_bytes(b'abc')
+    (folder / 'notes.txt').write_text('not audio')
+    store = VoiceStore(str(folder), index, max_bytes=1000)
+    assert store.import_flat_files() == 1
+    assert not (folder / 'voice_legacy.mp3').exists()
+    assert open(store.lookup('voice_legacy.mp3'), 'rb').read() == b'abc'
+    assert store.remove_unused_since(float('inf')) == 1 and store.total_bytes() == 0
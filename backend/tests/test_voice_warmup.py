@@ -0,0 +1,59 @@
+import os
+import pytest
+from unittest.mock import patch
+from config.settings import settings
+from database.sqlite_backend import SQLiteDatabase
+from services import pesticide_service, tts_backends, voice_service, voice_warmup
+from services.voice_service import VoiceJobQueue
+from services.voice_store import VoiceStore
+
+class FakeTTS:
+    """Stands in for gTTS: one 192-byte MP3 frame per text"""
+    made = []
+
+    def __init__(self, text, lang='en', slow=False, timeout=None):
+        self.text = text
+
+    def save(self, path):
+        FakeTTS.made.append(self.text)
+        with open(path, 'wb') as f:
+            f.write(b'\xff\xf3\x84\xc4' + self.text.encode('utf-8')[:188].ljust(188, b'\0'))
+
+PESTICIDE = {'name': 'Mancozeb', 'dosage_per_acre': '600 g', 'frequency': 'Every 7 days', 'warnings': 'Wear gloves'}
+
+@pytest.fixture
+def voice(tmp_path):
+    FakeTTS.made = []
+    db = SQLiteDatabase(str(tmp_path / 'index.sqlite3'))
+    store = VoiceStore(str(tmp_path), db, max_bytes=10 ** 7)
+    queue = VoiceJobQueue(workers=1, max_queued=10)
+    with patch.object(settings, 'VOICE_OUTPUT_FOLDER', str(tmp_path)), \
+         patch.object(settings, 'VOICE_SEGMENT_FOLDER', str(tmp_path / 'segments')), \
+         patch.object(tts_backends, 'gTTS', FakeTTS), \
+         patch.object(voice_service, 'get_voice_jobs', return_value=queue), \
+         patch.object(voice_service, 'get_voice_store', return_value=store), \
+         patch.object(voice_warmup, 'get_voice_store', return_value=store), \
+         patch.object(pesticide_service, 'get_pesticides_for_disease', return_value=[PESTICIDE]):
+        yield queue, store
+    queue._pool.shutdown(wait=True)
+    db.close()
+
+def test_warm_up_covers_every_message_and_resumes(voice):
+    queue, store = voice
+    classes = {'tomato': ['Healthy', 'Early blight']}
+    first = voice_warmup.warm_up(['en'], workers=4, class_names=classes)
+    assert first['failed'] == 0 and first['made'] == len(FakeTTS.made)
+    assert '57 percent.' in FakeTTS.made and 'Early blight.' in FakeTTS.made and 'Severe Stage.' in FakeTTS.made
+    assert store.contains(voice_service.voice_filename(voice_service.pesticide_voice_message(PESTICIDE, 'en'), 'en'))
+
+    # Run again: nothing left to make
+    assert voice_warmup.warm_up(['en'], workers=4, class_names=classes) == \
+        {'made': 0, 'failed': 0, 'skipped': first['made']}
+
+    # A real diagnosis is now joined on the spot: no gTTS, no waiting
+    made = len(FakeTTS.made)
+    path = voice_service.generate_diagnosis_voice(
+        {'crop': 'tomato', 'disease': 'Early blight', 'confidence': 73.4, 'severity_percent': 41.8,
+         'stage': 'Moderate Stage'}, 'en')
+    assert os.path.exists(path) and voice_service.voice_status(os.path.basename(path)) == 'ready'
+    assert len(FakeTTS.made) == made and queue.stats()['assembled'] == 1
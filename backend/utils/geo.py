@@ -0,0 +1,40 @@
+import math
+from typing import Optional, Dict, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+
+def make_point(latitude: Optional[float], longitude: Optional[float]) -> Optional[Dict]:
+    """
+    GPS coordinates as a GeoJSON point (what MongoDB's 2dsphere index expects).
+    Note the order: GeoJSON is [longitude, latitude].
+    """
+    if latitude is None or longitude is None:
+        return None
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        return None
+    return {'type': 'Point', 'coordinates': [float(longitude), float(latitude)]}
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Distance between two GPS points along the Earth's surface, in km"""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = math.radians(lat2 - lat1)
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+def bounding_box(latitude: float, longitude: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """
+    A lat/lon box that surely contains the circle (min_lat, max_lat, min_lon, max_lon).
+    Cheap to check with a plain index; exact distances are checked afterwards.
+    If the box crosses the poles or the 180° line, the longitude range is the whole world.
+    """
+    d_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = latitude - d_lat, latitude + d_lat
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90.0), min(max_lat, 90.0), -180.0, 180.0
+
+    d_lon = math.degrees(radius_km / (EARTH_RADIUS_KM * math.cos(math.radians(latitude))))
+    min_lon, max_lon = longitude - d_lon, longitude + d_lon
+    if min_lon < -180 or max_lon > 180:
+        return min_lat, max_lat, -180.0, 180.0
+    return min_lat, max_lat, min_lon, max_lon
@@ -0,0 +1,57 @@
+from typing import Tuple
+
+# Geohash: a short string naming a rectangle on the map ('tfchy' ~ 5 x 5 km around Guntur).
+# Cutting characters off the end gives the bigger rectangle that contains it, so
+# 'tfchy' rolls up into 'tfch' (~40 x 20 km, about a district) and 'tfc'.
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+_DECODE_MAP = {c: i for i, c in enumerate(_BASE32)}
+
+def encode(latitude: float, longitude: float, precision: int = 5) -> str:
+    """GPS point -> geohash with `precision` characters"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True  # Bits alternate: longitude, latitude, longitude...
+    while len(chars) < precision:
+        rng, point = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        if point >= mid:
+            value = (value << 1) | 1
+            rng[0] = mid
+        else:
+            value <<= 1
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = 0
+            value = 0
+    return ''.join(chars)
+
+def bounds(geohash: str) -> Tuple[float, float, float, float]:
+    """The rectangle a geohash names: (min_lat, max_lat, min_lon, max_lon)"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+    for char in geohash.lower():
+        value = _DECODE_MAP[char]
+        for shift in range(4, -1, -1):
+            rng = lon_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (value >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return lat_range[0], lat_range[1], lon_range[0], lon_range[1]
+
+def decode(geohash: str) -> Tuple[float, float]:
+    """The centre of a geohash cell as (latitude, longitude)"""
+    min_lat, max_lat, min_lon, max_lon = bounds(geohash)
+    return (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+
+def is_valid(geohash: str) -> bool:
+    return bool(geohash) and all(c in _DECODE_MAP for c in geohash.lower())
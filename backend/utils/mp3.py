@@ -0,0 +1,73 @@
+from typing import List, Optional, Tuple
+
+# Just enough MP3 to glue clips together. An MP3 file is a run of independent frames, each
+# starting with a 4-byte header that says how long the frame is, so two clips can be joined
+# by putting their frames one after the other. Things that would confuse a player are left out:
+# ID3 tags at the start/end and the Xing/Info frame (it states the length of *one* clip).
+
+# Bitrates in kbps by header index: MPEG-1 Layer III and MPEG-2/2.5 Layer III (what gTTS sends)
+_BITRATES = {
+    1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 0],
+    2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160, 0],
+}
+_SAMPLE_RATES = {
+    3: [44100, 48000, 32000],  # MPEG-1
+    2: [22050, 24000, 16000],  # MPEG-2
+    0: [11025, 12000, 8000],   # MPEG-2.5
+}
+
+def frame_length(header: bytes) -> Optional[int]:
+    """Length in bytes of the Layer III frame starting with `header` (None if it isn't one)"""
+    if len(header) < 4 or header[0] != 0xFF or (header[1] & 0xE0) != 0xE0:
+        return None
+    version = (header[1] >> 3) & 0x03
+    layer = (header[1] >> 1) & 0x03
+    bitrate_index = header[2] >> 4
+    rate_index = (header[2] >> 2) & 0x03
+    padding = (header[2] >> 1) & 0x01
+    if version == 1 or layer != 1 or rate_index == 3:  # Reserved version / not Layer III
+        return None
+    bitrate = _BITRATES[1 if version == 3 else 2][bitrate_index] * 1000
+    if not bitrate:
+        return None
+    sample_rate = _SAMPLE_RATES[version][rate_index]
+    return (144 if version == 3 else 72) * bitrate // sample_rate + padding
+
+def _skip_id3(data: bytes) -> int:
+    """Where the audio starts, after an ID3v2 tag if there is one"""
+    if data[:3] == b'ID3' and len(data) >= 10:
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]  # "Syncsafe", 7 bits a byte
+        return 10 + size + (10 if data[5] & 0x10 else 0)  # Footer flag
+    return 0
+
+def _is_info_frame(data: bytes, start: int) -> bool:
+    """Xing/Info sits right after the side info (9, 17 or 32 bytes long), VBRI at a fixed place"""
+    for side_info in (9, 17, 32):
+        if data[start + 4 + side_info:start + 8 + side_info] in (b'Xing', b'Info'):
+            return True
+    return data[start + 36:start + 40] == b'VBRI'
+
+def frames(data: bytes) -> List[Tuple[int, int]]:
+    """(start, end) of every audio frame in an MP3 file, tags and the Xing/Info frame left out"""
+    end = len(data) - 128 if data[-128:-125] == b'TAG' else len(data)  # ID3v1 tag at the end
+    position = _skip_id3(data)
+    found = []
+    while position + 4 <= end:
+        length = frame_length(data[position:position + 4])
+        if length is None:
+            position += 1  # Junk between frames: look for the next header
+            continue
+        if position + length > end:
+            break  # A cut-off last frame would click
+        found.append((position, position + length))
+        position += length
+    if found and _is_info_frame(data, found[0][0]):
+        found = found[1:]
+    return found
+
+def join(clips: List[bytes]) -> bytes:
+    """One MP3 made of the audio frames of every clip, in order"""
+    parts = []
+    for clip in clips:
+        parts.extend(clip[start:stop] for start, stop in frames(clip))
+    return b''.join(parts)
@@ -9,7 +9,7 @@ import { useAppTheme } from '../../context/ThemeContext';
 import { Colors } from '../../constants/theme';
 
 import api from '../../services/api';
-import { getLocalHistory } from '../../services/localHistory';
+import { getLocalHistory, syncServerHistory } from '../../services/localHistory';
 
 interface HistoryItem {
     id: string | number;
@@ -46,9 +46,8 @@ export default function HistoryScreen() {
                 const localData = await getLocalHistory();
                 setHistory(localData);
             } else if (user) {
-                // Logged-in users pull from the server
-                const response = await api.get('diagnosis/history');
-                setHistory(response.data.history || []);
+                // Logged-in users pull only what changed on the server since last time
+                setHistory(await syncServerHistory(String(user.id), user.preferred_language || 'en'));
             }
         } catch (error) {
             console.error('Failed to fetch history', error);
@@ -75,6 +74,16 @@ export default function HistoryScreen() {
             return;
         }
 
+        // Synced records already carry the full results screen
+        const synced = history.find((h) => h.id === id);
+        if (synced && synced.fullData) {
+            router.push({
+                pathname: '/results',
+                params: { data: JSON.stringify(synced.fullData) }
+            });
+            return;
+        }
+
         setLoading(true);
         try {
             const response = await api.get(`diagnosis/${id}`);
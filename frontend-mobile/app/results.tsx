@@ -18,7 +18,7 @@ export default function ResultsScreen() {
     const [sound, setSound] = useState<Audio.Sound | null>(null);
     const [isPlaying, setIsPlaying] = useState(false);
     const router = useRouter();
-    const { t, language } = useLanguage();
+    const { t, language, uiLabels, ensureUiBundle } = useLanguage();
     const { isDarkMode, colorScheme } = useAppTheme();
     const themeParams = Colors[colorScheme];
 
@@ -34,6 +34,13 @@ export default function ResultsScreen() {
         };
     }, [data]);
 
+    // If the server's labels changed since we downloaded them, pick up the new bundle
+    useEffect(() => {
+        if (result?.ui_bundle_version && result.language === language) {
+            ensureUiBundle(result.ui_bundle_version);
+        }
+    }, [result?.ui_bundle_version]);
+
     // This function plays the "AI Doctor's" voice explanation
     const playVoice = async () => {
         if (!result?.voice_file) {
@@ -58,6 +65,14 @@ export default function ResultsScreen() {
             const audioUrl = `${baseUrl}${result.voice_file}`;
             console.log('Playing audio from:', audioUrl);
 
+            // The server makes the audio in the background: 202 means "not yet, ask again shortly"
+            for (let attempt = 0; attempt < 15; attempt++) {
+                const check = await fetch(audioUrl, { method: 'HEAD' });
+                if (check.status !== 202) break;
+                const retryAfter = Number(check.headers.get('Retry-After')) || 1;
+                await new Promise(resolve => setTimeout(resolve, retryAfter * 1000));
+            }
+
             const { sound: newSound } = await Audio.Sound.createAsync(
                 { uri: audioUrl },
                 { shouldPlay: true }
@@ -83,7 +98,7 @@ export default function ResultsScreen() {
         if (!result) return;
 
         const { prediction, disease_info, pesticide_recommendations } = result;
-        const labels = result.ui_translations || {};
+        const labels = result.ui_translations || uiLabels;
 
         let displayDisease = prediction.disease_local || prediction.disease.replace(/___/g, ': ').replace(/_/g, ' ');
         if (prediction.disease === 'Healthy' && !prediction.disease_local) {
@@ -136,9 +151,8 @@ export default function ResultsScreen() {
     if (!result) return <View style={styles.container} />;
 
     const { prediction, disease_info, pesticide_recommendations, weather_advice } = result;
-    // We use the translations returned by the server. 
-    // They are already tailored to the requested language.
-    const labels = result.ui_translations || {};
+    // Labels come from the language bundle the app keeps (older saved results carry their own).
+    const labels = result.ui_translations || uiLabels;
 
     // Make the disease name look nice (remove underscores)
     let displayDisease = prediction.disease_local || (prediction.disease ? prediction.disease.replace(/___/g, ': ').replace(/_/g, ' ') : 'Unknown Disease');
@@ -1,6 +1,7 @@
 import React, { createContext, useState, useEffect, useContext } from 'react';
 import { saveItem, getItem, deleteItem } from '../services/storage';
 import api from '../services/api';
+import { clearSyncedHistory } from '../services/localHistory';
 
 interface User {
     id: number;
@@ -81,6 +82,7 @@ export const AuthProvider: React.FC<{ children: React.ReactNode }> = ({ children
             await deleteItem('userToken');
             await deleteItem('userData');
             await deleteItem('isGuest');
+            clearSyncedHistory();
             console.log('AuthContext: Stored items deleted.');
         } catch (e) {
             console.error('AuthContext: Error removing auth data:', e);
@@ -8,8 +8,15 @@ interface LanguageContextType {
     setLanguage: (lang: LanguageCode) => void;
     t: (key: keyof typeof Translations['en']) => string;
     translations: typeof Translations['en'];
+    uiLabels: Record<string, string>;
+    uiBundleVersion: string | null;
+    ensureUiBundle: (version?: string | null) => Promise<void>;
 }
 
+// Label bundles we already downloaded: language -> { version, labels }
+// The server sends each bundle with its version as an ETag, so re-checking one costs an empty 304.
+const bundleCache: Record<string, { version: string; labels: Record<string, string> }> = {};
+
 const LanguageContext = createContext<LanguageContextType | undefined>(undefined);
 
 /**
@@ -21,6 +28,7 @@ export const LanguageProvider: React.FC<{ children: ReactNode }> = ({ children }
     const { user } = useAuth();
     const [language, setLanguageState] = useState<LanguageCode>('en');
     const [dynamicTranslations, setDynamicTranslations] = useState<Record<string, string>>({});
+    const [uiBundleVersion, setUiBundleVersion] = useState<string | null>(null);
 
     // If the user logs in and has a preferred language, switch to it automatically
     useEffect(() => {
@@ -30,29 +38,48 @@ export const LanguageProvider: React.FC<{ children: ReactNode }> = ({ children }
         }
     }, [user?.preferred_language]);
 
-    // Fetch new translations whenever the language changes
-    // (We don't ship all languages in the app bundle to keep it small)
-    useEffect(() => {
-        const fetchDynamicTranslations = async () => {
-            try {
-                // English is the default, no need to fetch
-                if (language === 'en') {
-                    setDynamicTranslations({});
-                    return;
-                }
+    /**
+     * Make sure we have the server's label bundle for the current language.
+     * Pass the version a diagnosis response mentions: if we already have it, nothing is fetched.
+     */
+    const ensureUiBundle = async (version?: string | null) => {
+        // English is the default, no need to fetch
+        if (language === 'en') {
+            setDynamicTranslations({});
+            setUiBundleVersion(null);
+            return;
+        }
 
-                console.log('Fetching dynamic translations for:', language);
-                const response = await api.get(`user/translations?lang=${language}`);
-                if (response.data) {
-                    // Update our dictionary with new words
-                    setDynamicTranslations(response.data);
-                }
-            } catch (error) {
-                console.error('Failed to fetch translations:', error);
+        const cached = bundleCache[language];
+        if (cached && (!version || cached.version === version)) {
+            setDynamicTranslations(cached.labels);
+            setUiBundleVersion(cached.version);
+            if (version) return;
+        }
+
+        try {
+            console.log('Fetching label bundle for:', language);
+            const response = await api.get('translations/', {
+                params: { language },
+                headers: cached ? { 'If-None-Match': `"${cached.version}"` } : {},
+                validateStatus: (status) => status === 200 || status === 304,
+            });
+            if (response.status === 200 && response.data) {
+                const newVersion = response.headers['x-bundle-version'] || '';
+                bundleCache[language] = { version: newVersion, labels: response.data };
+                // Update our dictionary with new words
+                setDynamicTranslations(response.data);
+                setUiBundleVersion(newVersion);
             }
-        };
+        } catch (error) {
+            console.error('Failed to fetch translations:', error);
+        }
+    };
 
-        fetchDynamicTranslations();
+    // Fetch new translations whenever the language changes
+    // (We don't ship all languages in the app bundle to keep it small)
+    useEffect(() => {
+        ensureUiBundle();
     }, [language]);
 
     const setLanguage = (lang: LanguageCode) => {
@@ -84,6 +111,9 @@ export const LanguageProvider: React.FC<{ children: ReactNode }> = ({ children }
         setLanguage,
         t,
         translations: { ...Translations['en'], ...Translations[language] },
+        uiLabels: dynamicTranslations,
+        uiBundleVersion,
+        ensureUiBundle,
     };
 
     return (
@@ -1,5 +1,6 @@
 
 import { Platform } from 'react-native';
+import api from './api';
 
 // For guest users, we just save their history on their own device.
 // We use a temporary variable for mobile (simple session) or SessionStorage for web.
@@ -95,3 +96,68 @@ export const clearLocalHistory = async () => {
         tempHistoryStore = null;
     }
 };
+
+// --- Logged-in users: a synced copy of their server history ---
+// Instead of paging through /history and opening each record, we ask the server for
+// "everything that changed since last time" (/diagnosis/sync) and merge it in.
+// On a slow connection a refresh then only downloads the new or edited checkups.
+let syncedHistory: LocalHistoryItem[] = [];
+let syncToken: string | null = null;
+let syncedFor: string | null = null;  // Which user + language the copy belongs to
+
+const toHistoryItem = (record: any): LocalHistoryItem => ({
+    id: record.id,
+    crop: record.prediction?.crop_local || record.crop,
+    disease: record.prediction?.disease_local || record.disease,
+    confidence: record.confidence,
+    severity_percent: record.severity_percent,
+    stage: record.prediction?.stage_local || record.stage,
+    created_at: record.created_at,
+    // Same shape as the /diagnosis/<id> response, so the results screen can open it directly
+    fullData: record.prediction ? {
+        diagnosis_id: record.id,
+        prediction: record.prediction,
+        disease_info: record.disease_info || {},
+        pesticide_recommendations: record.pesticide_recommendations || {},
+        weather_advice: null,
+        cost: record.cost
+    } : undefined
+});
+
+/**
+ * Bring the synced history up to date and return it (newest first).
+ */
+export const syncServerHistory = async (userId: string, language: string): Promise<LocalHistoryItem[]> => {
+    const owner = `${userId}:${language}`;
+    if (syncedFor !== owner) {
+        // Someone else logged in, or the language changed: start over
+        syncedHistory = [];
+        syncToken = null;
+        syncedFor = owner;
+    }
+
+    const byId = new Map(syncedHistory.map((item) => [String(item.id), item]));
+    let hasMore = true;
+    while (hasMore) {
+        const response = await api.get('diagnosis/sync', { params: syncToken ? { since: syncToken } : {} });
+        for (const record of response.data.records || []) {
+            byId.set(String(record.id), toHistoryItem(record));
+        }
+        syncToken = response.data.next || syncToken;
+        hasMore = !!response.data.has_more;
+    }
+
+    syncedHistory = Array.from(byId.values()).sort(
+        (a, b) => new Date(b.created_at).getTime() - new Date(a.created_at).getTime()
+    );
+    return syncedHistory;
+};
+
+/**
+ * Forget the synced history (on logout).
+ */
+export const clearSyncedHistory = () => {
+    syncedHistory = [];
+    syncToken = null;
+    syncedFor = null;
+};